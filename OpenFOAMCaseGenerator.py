@@ -1,120 +1,251 @@
+import sys
+import time
+import_start_time = time.perf_counter()
+
 import input.CaseProperties as CaseProperties
 import input.GlobalVariables as Parameters
 
-import src.FileDirectoryIO as FileIO
+from src.FileDirectoryIO.Profiler import Profiler
 import src.Checker as Checker
-import src.WriteSystemDirectoryFiles as SystemDir
-import src.WriteConstantDirectoryFiles as ConstantDir
-import src.WriteZeroDirectoryFiles as ZeroDir
+
+# the writers, the file manager and output backends (and the parameter sweep) are only imported once they are needed,
+# so that runs which exit early (e.g. with --write-json-only or --help) start up as fast as possible
 
 
 def main():
+    # time spent in each stage of the case generation, reported with the --profile command line argument
+    profiler = Profiler(import_start_time)
+
     # process command line arguments first
-    command_line_arguments = Checker.CheckCommandLineArguments()
+    with profiler.stage('command line arguments'):
+        command_line_arguments = Checker.CheckCommandLineArguments()
+
+    # an archive streamed to the standard output must not be mixed with any other output, which goes to stderr instead
+    archive_stream = None
+    if command_line_arguments.option_exists('archive') and command_line_arguments['archive'] == '-':
+        archive_stream = sys.stdout.buffer
+        sys.stdout = sys.stderr
+
+    # serve case generation requests until stopped instead of generating a single case
+    if command_line_arguments.option_exists('serve'):
+        import src.CaseServer as CaseServer
+        number_of_workers = None
+        if command_line_arguments.option_exists('workers'):
+            number_of_workers = command_line_arguments['workers']
+        case_server = CaseServer.CaseServer(command_line_arguments['serve'], number_of_workers, generate_case,
+                                            command_line_arguments.option_exists('allow-remote'))
+        case_server.serve()
+        exit(0)
+
+    # generate all cases of a parameter sweep in parallel instead of a single case
+    if command_line_arguments.option_exists('sweep'):
+        import src.ParameterSweep as ParameterSweep
+        number_of_workers = None
+        if command_line_arguments.option_exists('workers'):
+            number_of_workers = command_line_arguments['workers']
+        parameter_sweep = ParameterSweep.ParameterSweep(command_line_arguments['sweep'], number_of_workers)
+        if command_line_arguments.option_exists('profile'):
+            success = parameter_sweep.run(generate_case, profiler)
+            write_profile(profiler, command_line_arguments['profile'])
+        else:
+            success = parameter_sweep.run(generate_case)
+        exit(0 if success else 1)
 
     # get case specific dictionaries to set up case and write input files
-    case_properties_handler = CaseProperties.CaseProperties()
-    properties = case_properties_handler.get_case_properties(command_line_arguments)
+    with profiler.stage('case properties'):
+        case_properties_handler = CaseProperties.CaseProperties()
+        properties = case_properties_handler.get_case_properties(command_line_arguments)
 
     # check case (make sure that current set up will not produce any problem)
-    check_case = Checker.CheckCase(properties)
-    check_case.run_all_checks()
+    with profiler.stage('checks'):
+        check_case = Checker.CheckCase(properties)
+        check_case.run_all_checks()
+
+    # write all case files, either into the run directory or streamed into an archive
+    backend = None
+    if command_line_arguments.option_exists('archive'):
+        from src.FileDirectoryIO.OutputBackend import ArchiveBackend
+        path_to_archive = command_line_arguments['archive']
+        backend = ArchiveBackend(archive_stream if archive_stream is not None else path_to_archive,
+                                 properties['file_properties']['case_name'],
+                                 ArchiveBackend.get_compression(path_to_archive))
+    file_manager = generate_case(properties, profiler, backend)
+
+    # output diagnostics
+    with profiler.stage('screen output'):
+        from src.FileDirectoryIO.ScreenOutput import ScreenOutput
+        screen_output = ScreenOutput(properties)
+        screen_output.print_summary()
+        if properties['file_properties']['mesh_treatment'] == Parameters.POLY_MESH:
+            from src.FileDirectoryIO.PolyMeshReader import PolyMeshReader
+            poly_mesh_reader = PolyMeshReader(properties['file_properties']['polymesh_directory'])
+            screen_output.print_mesh_summary(poly_mesh_reader.get_summary())
+        if file_manager.get_incremental_generation_report() is not None:
+            screen_output.print_incremental_generation_summary(file_manager.get_incremental_generation_report())
+        if backend is not None:
+            print('Case streamed into archive ' + ('(standard output)' if archive_stream is not None else
+                                                   command_line_arguments['archive']) + '\n')
+
+    if command_line_arguments.option_exists('profile'):
+        write_profile(profiler, command_line_arguments['profile'])
+
+
+def write_profile(profiler, path_to_trace):
+    profiler.print_summary()
+    if path_to_trace != '':
+        profiler.write_trace(path_to_trace)
+        print('\nWritten timeline of case generation to ' + path_to_trace)
+
+
+def generate_case(properties, profiler=None, backend=None):
+    # writes all files of the case described by properties (as returned by CaseProperties.get_case_properties) and
+    # returns the file manager used to write them. By default, the case is written to disk into the path given in the
+    # file_properties, passing backend=MemoryBackend() (see src/FileDirectoryIO/OutputBackend.py) keeps the case in
+    # memory instead, where it can be retrieved as a dictionary of relative paths to file contents through
+    # file_manager.get_backend().get_files()
+    import src.WriteSystemDirectoryFiles as SystemDir
+    import src.WriteConstantDirectoryFiles as ConstantDir
+    import src.WriteZeroDirectoryFiles as ZeroDir
+    from src.FileDirectoryIO.FileManager import FileManager
+    from src.FileDirectoryIO.WriteUtilityScripts import WriteUtilityScripts
+
+    if profiler is None:
+        profiler = Profiler()
 
     # create the initial data structure for the case set-up
-    file_manager = FileIO.FileManager(properties)
-    file_manager.create_directory_structure()
-    file_manager.copy_mesh_to_destination()
+    file_manager = FileManager(properties, backend)
+    with profiler.stage('directory structure', file_manager):
+        file_manager.create_directory_structure()
+    with profiler.stage('mesh', file_manager):
+        file_manager.copy_mesh_to_destination()
+
+    # determine the domain decomposition first, as the Allrun script depends on the number of processors as well
+    if properties['parallel_properties']['run_in_parallel']:
+        with profiler.stage('domain decomposition', file_manager):
+            decompose_par_dict = SystemDir.WriteDecomposeParDictionary(properties, file_manager)
+            decompose_par_dict.resolve_decomposition()
 
     # write out boundary conditions for all relevant flow properties
-    boundary_conditions = ZeroDir.WriteBoundaryConditions(properties, file_manager)
-    boundary_conditions.write_all_boundary_conditions()
+    with profiler.stage('boundary conditions', file_manager):
+        boundary_conditions = ZeroDir.WriteBoundaryConditions(properties, file_manager)
+        boundary_conditions.write_all_boundary_conditions()
 
     # write transport or thermo-physical properties depending on flow type
     if properties['flow_properties']['flow_type'] == Parameters.incompressible:
-        transport_dict = ConstantDir.TransportPropertiesFile(properties, file_manager)
-        transport_dict.write_input_file()
+        with profiler.stage('transportProperties', file_manager):
+            transport_dict = ConstantDir.TransportPropertiesFile(properties, file_manager)
+            transport_dict.write_input_file()
     elif properties['flow_properties']['flow_type'] == Parameters.compressible:
-        thermo_dict = ConstantDir.ThermophysicalProperties(properties, file_manager)
-        thermo_dict.write_input_file()
+        with profiler.stage('thermophysicalProperties', file_manager):
+            thermo_dict = ConstantDir.ThermophysicalProperties(properties, file_manager)
+            thermo_dict.write_input_file()
 
     # write turbulence properties to file
-    turbulence_dict = ConstantDir.TurbulencePropertiesFile(properties, file_manager)
-    turbulence_dict.write_input_file()
+    with profiler.stage('turbulenceProperties', file_manager):
+        turbulence_dict = ConstantDir.TurbulencePropertiesFile(properties, file_manager)
+        turbulence_dict.write_input_file()
 
     # write control dict file out
-    control_dict = SystemDir.ControlDictFile(properties, file_manager)
-    control_dict.write_input_file()
+    with profiler.stage('controlDict', file_manager):
+        control_dict = SystemDir.ControlDictFile(properties, file_manager)
+        control_dict.write_input_file()
 
     # write fvSolution file out
-    fv_solution = SystemDir.fvSolutionFile(properties, file_manager)
-    fv_solution.write_input_file()
+    with profiler.stage('fvSolution', file_manager):
+        fv_solution = SystemDir.fvSolutionFile(properties, file_manager)
+        fv_solution.write_input_file()
 
     # write fvSchemes
-    fv_schemes = SystemDir.fvSchemesFile(properties, file_manager)
-    fv_schemes.write_input_file()
+    with profiler.stage('fvSchemes', file_manager):
+        fv_schemes = SystemDir.fvSchemesFile(properties, file_manager)
+        fv_schemes.write_input_file()
 
     # write additional files if required for on-the-fly post-processing
     if properties['dimensionless_coefficients']['write_force_coefficients']:
-        force_coefficients = SystemDir.WriteForceCoefficients(properties, file_manager)
-        force_coefficients.write_force_coefficients()
+        with profiler.stage('force coefficients', file_manager):
+            force_coefficients = SystemDir.WriteForceCoefficients(properties, file_manager)
+            force_coefficients.write_force_coefficients()
 
     if Parameters.NONE not in properties['convergence_control']['integral_convergence_criterion']:
-        force_coefficient_trigger = SystemDir.WriteForceCoefficientConvergence(properties, file_manager)
-        force_coefficient_trigger.write_triggers()
+        with profiler.stage('force coefficient trigger', file_manager):
+            force_coefficient_trigger = SystemDir.WriteForceCoefficientConvergence(properties, file_manager)
+            force_coefficient_trigger.write_triggers()
 
     if properties['dimensionless_coefficients']['write_pressure_coefficient']:
-        pressure_coefficient = SystemDir.WritePressureCoefficient(properties, file_manager)
-        pressure_coefficient.write_force_coefficients()
+        with profiler.stage('pressure coefficient', file_manager):
+            pressure_coefficient = SystemDir.WritePressureCoefficient(properties, file_manager)
+            pressure_coefficient.write_force_coefficients()
 
     if properties['point_probes']['write_point_probes']:
-        point_probes = SystemDir.WritePointProbes(properties, file_manager)
-        point_probes.write_point_probes()
+        with profiler.stage('point probes', file_manager):
+            point_probes = SystemDir.WritePointProbes(properties, file_manager)
+            point_probes.write_point_probes()
 
     if properties['line_probes']['write_line_probes']:
-        line_probes = SystemDir.WriteLineProbes(properties, file_manager)
-        line_probes.write_line_probes()
-
-    if properties['cutting_planes']['write_cutting_planes']:
-        cutting_planes = SystemDir.WriteCuttingPlanes(properties, file_manager)
-        cutting_planes.write_cutting_planes()
-
-    if properties['iso_surfaces']['write_iso_surfaces']:
-        iso_surfaces = SystemDir.WriteIsoSurfaces(properties, file_manager)
-        iso_surfaces.write_iso_surfaces()
+        with profiler.stage('line probes', file_manager):
+            line_probes = SystemDir.WriteLineProbes(properties, file_manager)
+            line_probes.write_line_probes()
+
+    if properties['cutting_planes'].get('group_surfaces', False):
+        if properties['cutting_planes']['write_cutting_planes'] or properties['iso_surfaces']['write_iso_surfaces']:
+            with profiler.stage('surfaces', file_manager):
+                surfaces = SystemDir.WriteSurfaces(properties, file_manager)
+                surfaces.write_surfaces()
+    else:
+        if properties['cutting_planes']['write_cutting_planes']:
+            with profiler.stage('cutting planes', file_manager):
+                cutting_planes = SystemDir.WriteCuttingPlanes(properties, file_manager)
+                cutting_planes.write_cutting_planes()
+
+        if properties['iso_surfaces']['write_iso_surfaces']:
+            with profiler.stage('iso surfaces', file_manager):
+                iso_surfaces = SystemDir.WriteIsoSurfaces(properties, file_manager)
+                iso_surfaces.write_iso_surfaces()
 
     if properties['additional_fields']['write_additional_fields'] or properties['iso_surfaces']['write_iso_surfaces']:
-        fields = SystemDir.WriteFields(properties, file_manager)
-        fields.write_field()
+        with profiler.stage('additional fields', file_manager):
+            fields = SystemDir.WriteFields(properties, file_manager)
+            fields.write_field()
 
     if properties['parallel_properties']['run_in_parallel']:
-        decompose_par_dict = SystemDir.WriteDecomposeParDictionary(properties, file_manager)
-        decompose_par_dict.write_decompose_par_dict()
+        with profiler.stage('decomposeParDict', file_manager):
+            decompose_par_dict.write_decompose_par_dict()
 
-    y_plus = SystemDir.WriteYPlus(properties, file_manager)
-    y_plus.write_y_plus()
+    with profiler.stage('yPlus', file_manager):
+        y_plus = SystemDir.WriteYPlus(properties, file_manager)
+        y_plus.write_y_plus()
 
-    residuals = SystemDir.WriteResiduals(file_manager)
-    residuals.write_residuals()
+    with profiler.stage('residuals', file_manager):
+        residuals = SystemDir.WriteResiduals(properties, file_manager)
+        residuals.write_residuals()
 
     if properties['flow_properties']['flow_type'] == Parameters.compressible:
-        mach_number = SystemDir.WriteMachNumber(properties, file_manager)
-        mach_number.write_mach_number()
+        with profiler.stage('Mach number', file_manager):
+            mach_number = SystemDir.WriteMachNumber(properties, file_manager)
+            mach_number.write_mach_number()
 
     # generate utility script class that produces useful scripts to run the simulation
-    utility_scripts = FileIO.WriteUtilityScripts(properties, file_manager)
+    utility_scripts = WriteUtilityScripts(properties, file_manager)
 
     # write Allrun file to execute case automatically
-    utility_scripts.write_all_run_file()
+    with profiler.stage('Allrun', file_manager):
+        utility_scripts.write_all_run_file()
 
     # write Allclean file to clean up case directory
-    utility_scripts.write_all_clean_file()
-
-    # copy residual plotting script over to case directory
-    utility_scripts.copy_residual_plotting_script()
-
-    # output diagnostics
-    screen_output = FileIO.ScreenOutput(properties)
-    screen_output.print_summary()
+    with profiler.stage('Allclean', file_manager):
+        utility_scripts.write_all_clean_file()
+
+    # copy residual plotting, monitoring, results loading and probe packing scripts over to case directory
+    with profiler.stage('post-processing scripts', file_manager):
+        utility_scripts.copy_residual_plotting_script()
+        utility_scripts.copy_monitoring_script()
+        utility_scripts.copy_results_loader_script()
+        utility_scripts.copy_probe_packing_script()
+
+    # commit any file that is still held in memory by the file manager
+    with profiler.stage('commit remaining files', file_manager):
+        file_manager.close_all_files()
+    return file_manager
 
 
 if __name__ == '__main__':
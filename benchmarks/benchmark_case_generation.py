@@ -0,0 +1,390 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import platform
+import datetime
+import tempfile
+import statistics
+import subprocess
+
+from synthetic_poly_mesh import write_box_mesh
+
+# end-to-end benchmark of the case generation. Each scenario runs the case generator in a new python process, once
+# cold (no previous output, no caches written by the case generator and no compiled byte code) and several times warm
+# (output, caches and byte code of the previous run in place). The output of each scenario is hashed and compared
+# against the golden output in benchmarks/golden, so that optimisations can be shown not to change the generated cases.
+#
+# Scenarios:
+#   airfoil_incompressible      examples/settings/incompressible/airfoil.json
+#   airfoil_compressible        examples/settings/compressible/airfoil.json
+#   taylor_green_vortex         default properties of input/CaseProperties.py
+#   poly_mesh_<cells>           airfoil_incompressible on a synthetic box polyMesh with the given number of cells
+#   sweep_<cases>               parameter sweep of the taylor_green_vortex case over the given number of viscosities
+#   probes_and_planes_<n>       taylor_green_vortex case with n point probes, line probes and cutting planes each
+#
+# Before the scenarios, the start-up time of the case generator is measured (the wall time of --write-json-only, which
+# only imports the case properties and exits) next to the start-up time of the bare python interpreter, and compared
+# against the start-up target (--startup-target).
+#
+# usage (from the root directory of the case generator):
+#   python3 benchmarks/benchmark_case_generation.py [--scenarios=name,...] [--repeat=3] [--output=results.json]
+#                                                   [--compare=previous_results.json] [--update-golden]
+#                                                   [--startup-runs=20] [--startup-target=0.1]
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN_DIRECTORY = os.path.join(ROOT_DIRECTORY, 'benchmarks', 'golden')
+
+# files written next to the generated cases which are not part of the case setup (and not deterministic)
+EXCLUDED_FILES = ['sweep_summary.json']
+
+# golden outputs with more files than this only store the combined digest instead of the digest of each file
+MAX_GOLDEN_FILES = 1000
+
+
+def main():
+    arguments = parse_command_line_arguments()
+    work_directory = arguments.work_directory
+    if work_directory is None:
+        work_directory = tempfile.mkdtemp(prefix='benchmark-')
+    os.makedirs(work_directory, exist_ok=True)
+
+    scenarios = get_scenarios(arguments)
+    if arguments.scenarios is not None:
+        selected = arguments.scenarios.split(',')
+        scenarios = [scenario for scenario in scenarios if scenario['name'] in selected or
+                     scenario['name'].rsplit('_', 1)[0] in selected]
+
+    results = {
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': {
+            'repeat': arguments.repeat,
+            'mesh_cells': arguments.mesh_cells,
+            'sweep_cases': arguments.sweep_cases,
+            'probes': arguments.probes,
+            'startup_runs': arguments.startup_runs,
+        },
+        'startup': {},
+        'scenarios': {},
+    }
+
+    success = True
+    try:
+        if arguments.startup_runs > 0:
+            print('>>> startup')
+            results['startup'] = measure_startup(work_directory, arguments.startup_runs, arguments.startup_target)
+            print('    interpreter: ' + '{:.3f}'.format(results['startup']['interpreter']['median']) +
+                  ' s, case generator: ' + '{:.3f}'.format(results['startup']['case_generator']['median']) +
+                  ' s (median of ' + str(arguments.startup_runs) + '), target of ' +
+                  '{:.3f}'.format(arguments.startup_target) + ' s ' +
+                  ('met' if results['startup']['target_met'] else 'missed'))
+
+        for scenario in scenarios:
+            print('>>> ' + scenario['name'])
+            result = run_scenario(scenario, work_directory, arguments.repeat, arguments.update_golden)
+            results['scenarios'][scenario['name']] = result
+            success = success and result['success'] and result['golden'] != 'different'
+            print('    cold: ' + '{:.3f}'.format(result['cold']) + ' s, warm: ' +
+                  '{:.3f}'.format(result['warm_median']) + ' s (median of ' + str(len(result['warm'])) +
+                  '), golden output: ' + result['golden'])
+    finally:
+        if arguments.work_directory is None and not arguments.keep:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+    output = arguments.output
+    if output is None:
+        output = os.path.join(ROOT_DIRECTORY, 'benchmarks', 'results',
+                              'benchmark_' + datetime.datetime.now().strftime('%Y%m%d_%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as json_file:
+        json.dump(results, json_file, indent=4)
+    print('\nWritten results to ' + output)
+
+    if arguments.compare is not None:
+        with open(arguments.compare, 'r') as json_file:
+            print_comparison(json.load(json_file), results)
+
+    exit(0 if success else 1)
+
+
+def parse_command_line_arguments():
+    parser = argparse.ArgumentParser(description='end-to-end benchmark of the case generation')
+    parser.add_argument('--scenarios', help='comma separated list of scenarios to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='number of warm runs per scenario')
+    parser.add_argument('--mesh-cells', type=int, default=10000000, help='number of cells of the synthetic mesh')
+    parser.add_argument('--sweep-cases', type=int, default=1000, help='number of cases of the parameter sweep')
+    parser.add_argument('--probes', type=int, default=500, help='number of probes and cutting planes')
+    parser.add_argument('--output', help='json file to write the results to (default: benchmarks/results)')
+    parser.add_argument('--compare', help='json file of a previous benchmark run to compare the results with')
+    parser.add_argument('--update-golden', action='store_true', help='store the generated output as golden output')
+    parser.add_argument('--startup-runs', type=int, default=20,
+                        help='number of runs to measure the start-up time with (0 to skip the measurement)')
+    parser.add_argument('--startup-target', type=float, default=0.1,
+                        help='target for the median start-up time of the case generator in seconds')
+    parser.add_argument('--work-directory', help='directory to generate the cases in (default: temporary)')
+    parser.add_argument('--keep', action='store_true', help='keep the temporary work directory')
+    return parser.parse_args()
+
+
+def get_scenarios(arguments):
+    return [
+        {'name': 'airfoil_incompressible', 'prepare': prepare_example,
+         'settings': os.path.join('examples', 'settings', 'incompressible', 'airfoil.json')},
+        {'name': 'airfoil_compressible', 'prepare': prepare_example,
+         'settings': os.path.join('examples', 'settings', 'compressible', 'airfoil.json')},
+        {'name': 'taylor_green_vortex', 'prepare': prepare_taylor_green_vortex},
+        {'name': 'poly_mesh_' + str(arguments.mesh_cells), 'prepare': prepare_poly_mesh,
+         'cells': arguments.mesh_cells},
+        {'name': 'sweep_' + str(arguments.sweep_cases), 'prepare': prepare_sweep, 'cases': arguments.sweep_cases},
+        {'name': 'probes_and_planes_' + str(arguments.probes), 'prepare': prepare_probes_and_planes,
+         'probes': arguments.probes},
+    ]
+
+
+def measure_startup(work_directory, runs, target):
+    path_to_properties = os.path.join(work_directory, 'startup_properties.json')
+    commands = {
+        'interpreter': [sys.executable, '-c', 'pass'],
+        'case_generator': [sys.executable, 'OpenFOAMCaseGenerator.py', '--write-json-only=' + path_to_properties],
+    }
+    result = {}
+    for name, command in commands.items():
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=ROOT_DIRECTORY, check=True, stdout=subprocess.DEVNULL)
+            times.append(time.perf_counter() - start)
+        result[name] = {'min': min(times), 'median': statistics.median(times)}
+    result['target'] = target
+    result['target_met'] = result['case_generator']['median'] <= target
+    return result
+
+
+def run_scenario(scenario, work_directory, repeat, update_golden):
+    scenario_directory = os.path.join(work_directory, scenario['name'])
+    run_directory = os.path.join(scenario_directory, 'run')
+    setup_start = time.perf_counter()
+    run = scenario['prepare'](scenario, scenario_directory, run_directory)
+    setup_time = time.perf_counter() - setup_start
+
+    # cold run: no previous output, caches or byte code
+    shutil.rmtree(run_directory, ignore_errors=True)
+    for cache in run.get('caches', []):
+        if os.path.exists(cache):
+            os.remove(cache)
+    python_cache = os.path.join(scenario_directory, 'pycache')
+    shutil.rmtree(python_cache, ignore_errors=True)
+    cold_time, success, output = run_case_generator(run['arguments'], python_cache)
+
+    # warm runs: everything written by the previous run is kept
+    warm_times = []
+    for _ in range(repeat):
+        warm_time, warm_success, warm_output = run_case_generator(run['arguments'], python_cache)
+        warm_times.append(warm_time)
+        if not warm_success:
+            success, output = False, warm_output
+    if not success:
+        print('    FAILED:\n      ' + '\n      '.join(output.strip().splitlines()[-10:]))
+
+    digests = hash_directory(run_directory)
+    result = {
+        'success': success,
+        'setup': setup_time,
+        'cold': cold_time,
+        'warm': warm_times,
+        'warm_min': min(warm_times) if len(warm_times) > 0 else cold_time,
+        'warm_median': statistics.median(warm_times) if len(warm_times) > 0 else cold_time,
+        'number_of_files': len(digests),
+        'bytes': sum(os.path.getsize(os.path.join(run_directory, path)) for path in digests),
+        'golden': compare_with_golden(scenario['name'], digests, update_golden) if success else 'not checked',
+    }
+    return result
+
+
+def run_case_generator(arguments, python_cache):
+    environment = dict(os.environ)
+    environment['PYTHONPYCACHEPREFIX'] = python_cache
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, 'OpenFOAMCaseGenerator.py'] + arguments, cwd=ROOT_DIRECTORY,
+                             env=environment, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    elapsed = time.perf_counter() - start
+    output = process.stdout.decode('utf-8', errors='replace')
+    if process.returncode != 0:
+        # a negative return code is the signal that killed the process (e.g. -9 if it ran out of memory)
+        output += '\n(exit status ' + str(process.returncode) + ')'
+    return elapsed, process.returncode == 0, output
+
+
+def prepare_example(scenario, scenario_directory, run_directory):
+    with open(os.path.join(ROOT_DIRECTORY, scenario['settings']), 'r') as json_file:
+        properties = json.load(json_file)
+    return {'arguments': ['--input=' + write_properties(properties, scenario_directory, run_directory)],
+            'caches': [os.path.join(ROOT_DIRECTORY, properties['file_properties']['polymesh_directory'],
+                                    '.polyMeshSummary.npz')]}
+
+
+def prepare_taylor_green_vortex(scenario, scenario_directory, run_directory):
+    properties = get_default_properties(scenario_directory)
+    return {'arguments': ['--input=' + write_properties(properties, scenario_directory, run_directory)]}
+
+
+def prepare_poly_mesh(scenario, scenario_directory, run_directory):
+    # the mesh is written only once and reused by later benchmark runs using the same work directory
+    n = max(2, int(round(scenario['cells'] ** (1.0 / 3.0))))
+    mesh_directory = os.path.join(scenario_directory, 'mesh_' + str(n))
+    if not os.path.exists(os.path.join(mesh_directory, 'polyMesh', 'boundary')):
+        write_box_mesh(mesh_directory, n, n, n)
+
+    with open(os.path.join(ROOT_DIRECTORY, 'examples', 'settings', 'incompressible', 'airfoil.json'), 'r') as json_file:
+        properties = json.load(json_file)
+    properties['file_properties']['case_name'] = 'poly_mesh'
+    properties['file_properties']['polymesh_directory'] = mesh_directory
+    properties['boundary_properties']['boundary_conditions'] = {
+        'xmin': 2, 'xmax': 2, 'ymin': 2, 'ymax': 2, 'zmin': 8, 'zmax': 8,
+    }
+    properties['parallel_properties']['run_in_parallel'] = True
+    properties['parallel_properties']['number_of_processors'] = -2
+    return {'arguments': ['--input=' + write_properties(properties, scenario_directory, run_directory)],
+            'caches': [os.path.join(mesh_directory, '.polyMeshSummary.npz')]}
+
+
+def prepare_sweep(scenario, scenario_directory, run_directory):
+    base_case = write_properties(get_default_properties(scenario_directory), scenario_directory, run_directory)
+    sweep = {
+        'base_case': base_case,
+        'run_directory': run_directory,
+        'case_name': 'taylor_green_vortex_{index:05d}',
+        'type': 'cartesian',
+        'axes': [
+            {'name': 'nu', 'path': 'flow_properties/dimensional_properties/nu',
+             'linspace': [1e-3, 2e-3, scenario['cases']]},
+        ],
+    }
+    path_to_sweep = os.path.join(scenario_directory, 'sweep.json')
+    with open(path_to_sweep, 'w') as json_file:
+        json.dump(sweep, json_file, indent=4)
+    return {'arguments': ['--sweep=' + path_to_sweep]}
+
+
+def prepare_probes_and_planes(scenario, scenario_directory, run_directory):
+    properties = get_default_properties(scenario_directory)
+    n = scenario['probes']
+    coordinates = [-3.0 + 6.0 * (i + 0.5) / n for i in range(n)]
+    properties['point_probes']['write_point_probes'] = True
+    properties['point_probes']['location'] = [[x, 0.1, -0.1] for x in coordinates]
+    properties['line_probes']['write_line_probes'] = True
+    properties['line_probes']['location'] = [
+        {'name': 'line_' + str(i), 'start': [x, -3.0, 0.0], 'end': [x, 3.0, 0.0]} for i, x in enumerate(coordinates)]
+    properties['cutting_planes']['write_cutting_planes'] = True
+    properties['cutting_planes']['location'] = [
+        {'name': 'plane_' + str(i), 'origin': [x, 0.0, 0.0], 'normal': [1, 0, 0]} for i, x in enumerate(coordinates)]
+    return {'arguments': ['--input=' + write_properties(properties, scenario_directory, run_directory)]}
+
+
+def get_default_properties(scenario_directory):
+    # properties of input/CaseProperties.py, as written by the case generator itself
+    path_to_properties = os.path.join(scenario_directory, 'default_properties.json')
+    os.makedirs(scenario_directory, exist_ok=True)
+    subprocess.run([sys.executable, 'OpenFOAMCaseGenerator.py', '--write-json-only=' + path_to_properties],
+                   cwd=ROOT_DIRECTORY, check=True, stdout=subprocess.DEVNULL)
+    with open(path_to_properties, 'r') as json_file:
+        return json.load(json_file)
+
+
+def write_properties(properties, scenario_directory, run_directory):
+    properties['file_properties']['run_directory'] = run_directory
+    properties['file_properties']['path'] = os.path.join(run_directory, properties['file_properties']['case_name'])
+    path_to_properties = os.path.join(scenario_directory, 'properties.json')
+    os.makedirs(scenario_directory, exist_ok=True)
+    with open(path_to_properties, 'w') as json_file:
+        json.dump(properties, json_file, indent=4)
+    return path_to_properties
+
+
+def hash_directory(directory):
+    # sha256 of every file below directory, keyed by its path relative to directory
+    digests = {}
+    for root, _, files in os.walk(directory):
+        for file_name in files:
+            if file_name in EXCLUDED_FILES:
+                continue
+            path = os.path.join(root, file_name)
+            digest = hashlib.sha256()
+            with open(path, 'rb') as file:
+                for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            digests[os.path.relpath(path, directory).replace(os.sep, '/')] = digest.hexdigest()
+    return digests
+
+
+def combine_digests(digests):
+    digest = hashlib.sha256()
+    for path in sorted(digests):
+        digest.update(path.encode('utf-8') + b'\0' + digests[path].encode('utf-8') + b'\0')
+    return digest.hexdigest()
+
+
+def compare_with_golden(name, digests, update_golden):
+    path_to_golden = os.path.join(GOLDEN_DIRECTORY, name + '.json')
+    golden = {'digest': combine_digests(digests), 'number_of_files': len(digests)}
+    if len(digests) <= MAX_GOLDEN_FILES:
+        golden['files'] = dict(sorted(digests.items()))
+
+    if update_golden:
+        os.makedirs(GOLDEN_DIRECTORY, exist_ok=True)
+        with open(path_to_golden, 'w') as json_file:
+            json.dump(golden, json_file, indent=4)
+        return 'updated'
+
+    if not os.path.exists(path_to_golden):
+        return 'missing'
+    with open(path_to_golden, 'r') as json_file:
+        expected = json.load(json_file)
+    if expected['digest'] == golden['digest']:
+        return 'identical'
+
+    if 'files' in expected and 'files' in golden:
+        for path in sorted(set(expected['files']) | set(golden['files'])):
+            if expected['files'].get(path) != golden['files'].get(path):
+                status = 'missing' if path not in golden['files'] else 'added' if path not in expected['files'] \
+                    else 'changed'
+                print('    ' + status.ljust(8) + path)
+    return 'different'
+
+
+def print_comparison(previous, current):
+    print('\nComparison with ' + previous['date'] + ' (' + str(previous.get('commit')) + '):')
+    print('  ' + 'scenario'.ljust(32) + '  cold [s]   before      warm [s]   before')
+    if 'case_generator' in previous.get('startup', {}) and 'case_generator' in current['startup']:
+        before = previous['startup']['case_generator']['median']
+        after = current['startup']['case_generator']['median']
+        print('  ' + 'startup'.ljust(32) + '  ' + '{:8.3f}'.format(after) + ' ' + '{:8.3f}'.format(before) + ' (' +
+              '{:5.2f}'.format(before / after) + 'x)')
+    for name, result in current['scenarios'].items():
+        if name not in previous['scenarios']:
+            continue
+        before = previous['scenarios'][name]
+        print('  ' + name.ljust(32) + '  ' + '{:8.3f}'.format(result['cold']) + ' ' +
+              '{:8.3f}'.format(before['cold']) + ' (' + '{:5.2f}'.format(before['cold'] / result['cold']) + 'x)  ' +
+              '{:8.3f}'.format(result['warm_median']) + ' ' + '{:8.3f}'.format(before['warm_median']) + ' (' +
+              '{:5.2f}'.format(before['warm_median'] / result['warm_median']) + 'x)')
+
+
+def get_commit():
+    try:
+        process = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIRECTORY, stdout=subprocess.PIPE,
+                                 stderr=subprocess.DEVNULL)
+        return process.stdout.decode('utf-8').strip() or None
+    except OSError:
+        return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import shlex
+import hashlib
+import tempfile
+import subprocess
+
+# checks the dynamic code cache (file_properties.dynamic_code_cache_directory) without OpenFOAM, using a stub compile
+# command. Two cases of the Taylor-Green vortex (c++ initial conditions for p and U) are generated with the same cache,
+# and the check fails if
+#   - the cache entries are not stored as <cache>/<version>/<SHA1 of version, WM_OPTIONS and code stream>/ with the
+#     compiled code stream (codeDict) and the libraries (dynamicCode/.../lib*.so)
+#   - the code streams are compiled more than once, i.e. the second case does not hit the cache
+#   - the cached libraries are not placed into the dynamicCode directory of both cases
+#   - the compile command is executed through a shell
+#
+# usage (from the root directory of the case generator):
+#   python3 benchmarks/check_dynamic_code_cache.py [--work-directory=path]
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# stub compile command, executed in the scratch case: writes a library named after the SHA1 hash of system/codeDict
+# into the dynamicCode directory (as OpenFOAM would) and appends the hash to the log given as its argument
+STUB_COMPILER = '''import os
+import sys
+import hashlib
+with open(os.path.join('system', 'codeDict'), 'rb') as code_dict:
+    digest = hashlib.sha1(code_dict.read()).hexdigest()
+library = os.path.join('dynamicCode', 'platforms', os.environ.get('WM_OPTIONS', 'stub'), 'lib', 'lib' + digest + '.so')
+os.makedirs(os.path.dirname(library), exist_ok=True)
+with open(library, 'wb') as library_file:
+    library_file.write(b'stub library ' + digest.encode('utf-8'))
+with open(sys.argv[1], 'a') as log_file:
+    log_file.write(digest + '\\n')
+'''
+
+
+def main():
+    work_directory = None
+    for argument in sys.argv[1:]:
+        if argument.startswith('--work-directory='):
+            work_directory = argument.split('=', 1)[1]
+    if work_directory is None:
+        work_directory = tempfile.mkdtemp(prefix='dynamic-code-cache-')
+    os.makedirs(work_directory, exist_ok=True)
+    cache_directory = os.path.join(work_directory, 'cache')
+    run_directory = os.path.join(work_directory, 'run')
+    compile_log = os.path.join(work_directory, 'compile.log')
+    stub_compiler = os.path.join(work_directory, 'stubCompiler.py')
+    with open(stub_compiler, 'w') as stub_file:
+        stub_file.write(STUB_COMPILER)
+    compile_command = ' '.join(shlex.quote(argument) for argument in [sys.executable, stub_compiler, compile_log])
+
+    failures = []
+    properties = get_default_properties(work_directory)
+    for case_name in ['case_0', 'case_1']:
+        generate_case(properties, work_directory, run_directory, case_name, cache_directory, compile_command)
+    version = properties['file_properties']['version']
+    entries = check_cache_layout(os.path.join(cache_directory, version), version, failures)
+
+    compiled = read_lines(compile_log)
+    if len(entries) != 2 or len(compiled) != len(entries):
+        failures.append('expected 2 code streams to be compiled once each, compiled ' + str(len(compiled)) +
+                        ' times for ' + str(len(entries)) + ' cache entries')
+    for case_name in ['case_0', 'case_1']:
+        check_placed_libraries(os.path.join(run_directory, case_name), entries, failures)
+
+    # shell syntax in the compile command is passed on as arguments and not executed, so no marker file is created
+    marker = os.path.join(work_directory, 'executed_by_shell')
+    properties['flow_properties']['custom_initial_conditions_setup']['p'] = write_modified_code(
+        properties['flow_properties']['custom_initial_conditions_setup']['p'], work_directory)
+    generate_case(properties, work_directory, run_directory, 'case_shell', cache_directory,
+                  'true; touch ' + shlex.quote(marker))
+    if os.path.exists(marker):
+        failures.append('the compile command was executed through a shell')
+
+    if len(failures) > 0:
+        print('Dynamic code cache check failed (' + work_directory + '):')
+        for failure in failures:
+            print('    ' + failure)
+        sys.exit(1)
+    print('Dynamic code cache check passed (' + str(len(entries)) + ' cache entries, ' + str(len(compiled)) +
+          ' compilations for 2 cases)')
+
+
+def get_default_properties(work_directory):
+    path_to_properties = os.path.join(work_directory, 'default_properties.json')
+    subprocess.run([sys.executable, 'OpenFOAMCaseGenerator.py', '--write-json-only=' + path_to_properties],
+                   cwd=ROOT_DIRECTORY, check=True, stdout=subprocess.DEVNULL)
+    with open(path_to_properties, 'r') as json_file:
+        return json.load(json_file)
+
+
+def generate_case(properties, work_directory, run_directory, case_name, cache_directory, compile_command):
+    file_properties = properties['file_properties']
+    file_properties['case_name'] = case_name
+    file_properties['run_directory'] = run_directory
+    file_properties['path'] = os.path.join(run_directory, case_name)
+    file_properties['dynamic_code_cache_directory'] = cache_directory
+    file_properties['dynamic_code_compile_command'] = compile_command
+    path_to_properties = os.path.join(work_directory, case_name + '.json')
+    with open(path_to_properties, 'w') as json_file:
+        json.dump(properties, json_file, indent=4)
+    subprocess.run([sys.executable, 'OpenFOAMCaseGenerator.py', '--input=' + path_to_properties], cwd=ROOT_DIRECTORY,
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def check_cache_layout(version_directory, version, failures):
+    # returns the cache entries as a dictionary of their hash to the paths of their libraries (relative to dynamicCode)
+    entries = {}
+    if not os.path.isdir(version_directory):
+        failures.append('no cache directory for the version at ' + version_directory)
+        return entries
+    for key in sorted(os.listdir(version_directory)):
+        entry_directory = os.path.join(version_directory, key)
+        if key.startswith('.incoming-'):
+            failures.append('temporary build directory left in the cache: ' + key)
+            continue
+        code_dict = os.path.join(entry_directory, 'codeDict')
+        if not os.path.isfile(code_dict):
+            failures.append('cache entry ' + key + ' has no codeDict')
+            continue
+        with open(code_dict, 'r') as code_dict_file:
+            code = code_dict_file.read().split('value           ', 1)[1]
+        digest = hashlib.sha1()
+        digest.update(version.encode('utf-8') + b'\0')
+        digest.update(os.environ.get('WM_OPTIONS', '').encode('utf-8') + b'\0')
+        digest.update(code.encode('utf-8'))
+        if key != digest.hexdigest():
+            failures.append('cache entry ' + key + ' is not named after the SHA1 hash of its code stream (' +
+                            digest.hexdigest() + ')')
+
+        libraries = []
+        for root, _, files in os.walk(os.path.join(entry_directory, 'dynamicCode')):
+            libraries.extend(os.path.relpath(os.path.join(root, file_name), os.path.join(entry_directory,
+                                                                                         'dynamicCode'))
+                             for file_name in files if file_name.startswith('lib') and file_name.endswith('.so'))
+        if len(libraries) == 0:
+            failures.append('cache entry ' + key + ' has no library')
+        entries[key] = (entry_directory, libraries)
+    return entries
+
+
+def check_placed_libraries(case_directory, entries, failures):
+    for key, (entry_directory, libraries) in entries.items():
+        for library in libraries:
+            cached = os.path.join(entry_directory, 'dynamicCode', library)
+            placed = os.path.join(case_directory, 'dynamicCode', library)
+            if not os.path.isfile(placed):
+                failures.append('library ' + library + ' was not placed into ' + case_directory)
+            elif not os.path.samefile(placed, cached):
+                # the default placement hard links the library, the cache and the cases are on the same file system
+                failures.append('library ' + library + ' in ' + case_directory + ' is not linked to the cache')
+
+
+def write_modified_code(path_to_script, work_directory):
+    # a code stream which is not in the cache yet, so that the compile command is executed
+    path = os.path.join(work_directory, 'modified_' + os.path.basename(path_to_script))
+    with open(os.path.join(ROOT_DIRECTORY, path_to_script), 'r') as script:
+        code = script.read()
+    with open(path, 'w') as modified_script:
+        modified_script.write('// modified\n' + code)
+    return path
+
+
+def read_lines(path):
+    if not os.path.isfile(path):
+        return []
+    with open(path, 'r') as log_file:
+        return [line for line in log_file.read().splitlines() if line != '']
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import os
+import sys
+import numpy as np
+
+
+def write_box_mesh(directory, nx, ny, nz, length=(1.0, 1.0, 1.0)):
+    # writes a structured box mesh of nx * ny * nz hexahedral cells as a binary polyMesh into directory/polyMesh. The
+    # mesh is generated one slab of cells (constant x-index) at a time, so that meshes with tens of millions of cells
+    # can be written with little memory. Faces are ordered as written by OpenFOAM (internal faces in upper-triangular
+    # order, followed by the boundary faces of the patches xmin, xmax, ymin, ymax, zmin and zmax)
+    mesh_directory = os.path.join(directory, 'polyMesh')
+    os.makedirs(mesh_directory, exist_ok=True)
+
+    number_of_points = (nx + 1) * (ny + 1) * (nz + 1)
+    number_of_cells = nx * ny * nz
+    number_of_internal_faces = (nx - 1) * ny * nz + nx * (ny - 1) * nz + nx * ny * (nz - 1)
+    patches = [('xmin', ny * nz), ('xmax', ny * nz), ('ymin', nx * nz), ('ymax', nx * nz), ('zmin', nx * ny),
+               ('zmax', nx * ny)]
+    number_of_faces = number_of_internal_faces + sum(n_faces for _, n_faces in patches)
+
+    _write_points(mesh_directory, nx, ny, nz, length, number_of_points)
+
+    note = ('nPoints:' + str(number_of_points) + '  nCells:' + str(number_of_cells) + '  nFaces:' +
+            str(number_of_faces) + '  nInternalFaces:' + str(number_of_internal_faces))
+    with open(os.path.join(mesh_directory, 'faces'), 'wb') as faces, \
+            open(os.path.join(mesh_directory, 'owner'), 'wb') as owner, \
+            open(os.path.join(mesh_directory, 'neighbour'), 'wb') as neighbour:
+        faces.write(_header('faceCompactList', 'faces'))
+        faces.write(b'%d\n(' % (number_of_faces + 1))
+        for start in range(0, number_of_faces + 1, 1024 * 1024):
+            end = min(start + 1024 * 1024, number_of_faces + 1)
+            faces.write((4 * np.arange(start, end, dtype='<i4')).tobytes())
+        faces.write(b')\n\n')
+        faces.write(b'%d\n(' % (4 * number_of_faces))
+        owner.write(_header('labelList', 'owner', note))
+        owner.write(b'%d\n(' % number_of_faces)
+        neighbour.write(_header('labelList', 'neighbour', note))
+        neighbour.write(b'%d\n(' % number_of_internal_faces)
+
+        for i in range(nx):
+            slab_faces, slab_owner, slab_neighbour = _get_internal_faces(i, nx, ny, nz)
+            faces.write(slab_faces.astype('<i4').tobytes())
+            owner.write(slab_owner.astype('<i4').tobytes())
+            neighbour.write(slab_neighbour.astype('<i4').tobytes())
+
+        for name, _ in patches:
+            for i in ([0] if name == 'xmin' else [nx - 1] if name == 'xmax' else range(nx)):
+                slab_faces, slab_owner = _get_boundary_faces(name, i, nx, ny, nz)
+                faces.write(slab_faces.astype('<i4').tobytes())
+                owner.write(slab_owner.astype('<i4').tobytes())
+
+        faces.write(b')\n')
+        owner.write(b')\n')
+        neighbour.write(b')\n')
+
+    with open(os.path.join(mesh_directory, 'boundary'), 'wb') as boundary:
+        boundary.write(_header('polyBoundaryMesh', 'boundary', binary=False))
+        boundary.write(b'%d\n(\n' % len(patches))
+        start_face = number_of_internal_faces
+        for name, n_faces in patches:
+            boundary.write(b'    %s\n    {\n        type            patch;\n        nFaces          %d;\n'
+                           b'        startFace       %d;\n    }\n' % (name.encode('utf-8'), n_faces, start_face))
+            start_face += n_faces
+        boundary.write(b')\n')
+    return number_of_cells
+
+
+def _write_points(mesh_directory, nx, ny, nz, length, number_of_points):
+    y, z = np.meshgrid(np.linspace(0, length[1], ny + 1), np.linspace(0, length[2], nz + 1), indexing='ij')
+    plane = np.empty(((ny + 1) * (nz + 1), 3), dtype='<f8')
+    plane[:, 1] = y.ravel()
+    plane[:, 2] = z.ravel()
+    with open(os.path.join(mesh_directory, 'points'), 'wb') as points:
+        points.write(_header('vectorField', 'points'))
+        points.write(b'%d\n(' % number_of_points)
+        for x in np.linspace(0, length[0], nx + 1):
+            plane[:, 0] = x
+            points.write(plane.tobytes())
+        points.write(b')\n')
+
+
+def _get_internal_faces(i, nx, ny, nz):
+    # faces of all cells of slab i towards their neighbours in +z, +y and +x direction (in this order, so that faces
+    # are sorted by owner and then by neighbour)
+    j, k = np.meshgrid(np.arange(ny), np.arange(nz), indexing='ij')
+    cell = (i * ny + j) * nz + k
+
+    faces = np.empty((ny, nz, 3, 4), dtype=np.int64)
+    faces[:, :, 0] = np.stack([_point(i, j, k + 1, ny, nz), _point(i + 1, j, k + 1, ny, nz),
+                               _point(i + 1, j + 1, k + 1, ny, nz), _point(i, j + 1, k + 1, ny, nz)], -1)
+    faces[:, :, 1] = np.stack([_point(i, j + 1, k, ny, nz), _point(i, j + 1, k + 1, ny, nz),
+                               _point(i + 1, j + 1, k + 1, ny, nz), _point(i + 1, j + 1, k, ny, nz)], -1)
+    faces[:, :, 2] = np.stack([_point(i + 1, j, k, ny, nz), _point(i + 1, j + 1, k, ny, nz),
+                               _point(i + 1, j + 1, k + 1, ny, nz), _point(i + 1, j, k + 1, ny, nz)], -1)
+    neighbours = np.stack([cell + 1, cell + nz, cell + ny * nz], -1)
+    valid = np.stack([k < nz - 1, j < ny - 1, np.full(k.shape, i < nx - 1)], -1)
+    owners = np.broadcast_to(cell[:, :, np.newaxis], valid.shape)
+    return faces[valid].ravel(), owners[valid], neighbours[valid]
+
+
+def _get_boundary_faces(name, i, nx, ny, nz):
+    # boundary faces of slab i on the given patch, with their normal pointing out of the domain
+    if name in ['xmin', 'xmax']:
+        j, k = np.meshgrid(np.arange(ny), np.arange(nz), indexing='ij')
+        plane = i if name == 'xmin' else i + 1
+        faces = np.stack([_point(plane, j, k, ny, nz), _point(plane, j + 1, k, ny, nz),
+                          _point(plane, j + 1, k + 1, ny, nz), _point(plane, j, k + 1, ny, nz)], -1)
+    elif name in ['ymin', 'ymax']:
+        j = 0 if name == 'ymin' else ny - 1
+        k = np.arange(nz)
+        plane = j if name == 'ymin' else j + 1
+        faces = np.stack([_point(i, plane, k, ny, nz), _point(i, plane, k + 1, ny, nz),
+                          _point(i + 1, plane, k + 1, ny, nz), _point(i + 1, plane, k, ny, nz)], -1)
+    else:
+        j = np.arange(ny)
+        k = 0 if name == 'zmin' else nz - 1
+        plane = k if name == 'zmin' else k + 1
+        faces = np.stack([_point(i, j, plane, ny, nz), _point(i + 1, j, plane, ny, nz),
+                          _point(i + 1, j + 1, plane, ny, nz), _point(i, j + 1, plane, ny, nz)], -1)
+    cells = np.broadcast_to((i * ny + j) * nz + k, faces.shape[:-1])
+    if name in ['xmin', 'ymin', 'zmin']:
+        faces = faces[..., ::-1]
+    return faces.reshape(-1), cells.reshape(-1)
+
+
+def _point(i, j, k, ny, nz):
+    return (i * (ny + 1) + j) * (nz + 1) + k
+
+
+def _header(class_type, object_type, note=None, binary=True):
+    header = ('FoamFile\n{\n    version     2.0;\n    format      ' + ('binary' if binary else 'ascii') + ';\n' +
+              ('    arch        "LSB;label=32;scalar=64";\n' if binary else '') +
+              '    class       ' + class_type + ';\n' +
+              ('    note        "' + note + '";\n' if note is not None else '') +
+              '    location    "constant/polyMesh";\n    object      ' + object_type + ';\n}\n\n')
+    return header.encode('utf-8')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 5:
+        print('usage: python3 synthetic_poly_mesh.py directory nx ny nz')
+        exit(1)
+    write_box_mesh(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]))
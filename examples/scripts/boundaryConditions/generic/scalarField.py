@@ -0,0 +1,7 @@
+import numpy as np
+
+p_0 = 0.0
+
+
+def inlet_profile(x, y, z):
+    return p_0 * np.ones_like(x)
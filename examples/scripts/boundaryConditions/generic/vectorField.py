@@ -0,0 +1,10 @@
+U_0 = 1.0
+H = 1.0
+
+
+def inlet_profile(x, y, z):
+    # parabolic channel profile between y = 0 and y = H
+    U_x = 4.0 * U_0 * (y / H) * (1.0 - y / H)
+    U_y = 0.0
+    U_z = 0.0
+    return U_x, U_y, U_z
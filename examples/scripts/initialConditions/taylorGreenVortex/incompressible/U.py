@@ -0,0 +1,10 @@
+import numpy as np
+
+U_0 = 1.0
+
+
+def initial_condition(x, y, z):
+    U_x = U_0 * np.sin(x) * np.cos(y) * np.cos(z)
+    U_y = - U_0 * np.cos(x) * np.sin(y) * np.cos(z)
+    U_z = 0.0
+    return U_x, U_y, U_z
@@ -0,0 +1,9 @@
+import numpy as np
+
+p_0 = 0.0
+U_0 = 1.0
+r_0 = 1.0
+
+
+def initial_condition(x, y, z):
+    return p_0 + ((r_0 * pow(U_0, 2)) / 16.0) * (np.cos(2.0 * x) + np.cos(2.0 * y)) * (np.cos(2.0 * z) + 2.0)
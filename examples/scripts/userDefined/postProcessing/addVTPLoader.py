@@ -3,11 +3,17 @@ import sys, os
 
 def main():
     print('>>> Writing VTP loader for', str(sys.argv[1:]))
-    # get plane names from command line arguments
+    # get surface names from command line arguments. Surfaces sampled by their own function object are given by their
+    # name (written into postProcessing/<name>/<time>/<name>.vtp), surfaces sampled by a function object shared with
+    # other surfaces as <function object>/<name> (written into postProcessing/<function object>/<time>/<name>.vtp)
     assert len(sys.argv) > 1, 'Need at least one plane to process'
     for i in range(1, len(sys.argv)):
-        name = sys.argv[i]
-        sub_dirs = os.listdir(os.path.join('postProcessing', name))
+        function_object, _, name = sys.argv[i].rpartition('/')
+        if function_object == '':
+            function_object = name
+        directory = os.path.join('postProcessing', function_object)
+        sub_dirs = [dir for dir in os.listdir(directory) if os.path.isfile(os.path.join(directory, dir, name + '.vtp'))]
+        sub_dirs.sort(key=float)
         file_id = open(os.path.join('postProcessing', name + '.pvd'), 'w')
         file_id.write('<?xml version="1.0"?>\n')
         file_id.write('<VTKFile type="Collection">\n')
@@ -15,9 +21,10 @@ def main():
         for dir in sub_dirs:
             file_id.write('    <DataSet timestep="' + str(dir) + '" ')
             file_id.write('part="0" ')
-            file_id.write('file="' + str(os.path.join(name, str(dir), str(name + '.vtp"/>'))) + '\n')
+            file_id.write('file="' + str(os.path.join(function_object, str(dir), str(name + '.vtp"/>'))) + '\n')
         file_id.write('  </Collection>\n')
         file_id.write('</VTKFile>\n')
+        file_id.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,251 @@
+import os
+import re
+import sys
+import json
+import numpy as np
+
+# layout of the cache, caches written with a different layout are rebuilt
+CACHE_VERSION = 1
+
+# directory of the cache within postProcessing
+CACHE_DIRECTORY = '.cache'
+
+REMOVE_PARENTHESES = str.maketrans('()', '  ')
+
+# restarts writing into an existing directory append their start time to the file name, e.g. solverInfo_100.dat
+RESTART_FILE_NAME = re.compile(r'^(?P<name>.+)_(?P<start_time>[-+0-9.eE]+)(?P<extension>\.dat)$')
+
+
+def load(case, function_object, file_name=None):
+    # returns the output of a function object of the case as a dictionary of numpy arrays, combining the output of all
+    # runs (postProcessing/<function object>/<startTime>/), where the output of a restart replaces the output written
+    # after its start time by the previous run.
+    #   time series (e.g. forceCoeffs, residuals, volFieldValue, probes): one array per column, keyed by the column
+    #       name of the header ('Time', 'Cd', ..., 'Ux_initial', ...). Vectors are split into their components (name_x,
+    #       name_y, name_z) and columns which are not numeric (e.g. the names of the linear solvers) are skipped. The
+    #       columns of probes are named <field>_<probe>, and their locations are given as 'locations'
+    #   sets (e.g. lineProbes, written with axis xyz): 'Time' (times), 'coordinates' (points, 3) of the sampled points
+    #       and 'values' (times, points, values) of the sampled fields in the order of the file name
+    # The file_name (e.g. 'coefficient.dat', 'p' or 'x=2_U.xy') is only required if the function object writes more
+    # than one file. The parsed output is cached in postProcessing/.cache and only parsed again if the output changes,
+    # where only the appended part of time series is parsed if they grew (e.g. while the case is running)
+    directory = os.path.join(case, 'postProcessing', function_object)
+    if not os.path.isdir(directory):
+        raise ValueError('No output of ' + function_object + ' found in ' + os.path.join(case, 'postProcessing'))
+    sources = get_sources(directory)
+    if file_name is None:
+        if len(sources) != 1:
+            raise ValueError(function_object + ' writes more than one file, select one of ' + ', '.join(sources))
+        file_name = next(iter(sources))
+    elif file_name not in sources:
+        raise ValueError(function_object + ' did not write ' + file_name + ', select one of ' + ', '.join(sources))
+    return ResultsCache(os.path.join(case, 'postProcessing', CACHE_DIRECTORY, function_object), file_name,
+                        sources[file_name]).load()
+
+
+def get_sources(directory):
+    # returns the files written by the function object as a dictionary with the file names as keys and a list of
+    # (start time, path) ordered by the start time of the run (or the time of the output for sets) as values
+    sources = {}
+    time_directories = []
+    for time_directory in os.listdir(directory):
+        try:
+            time_directories.append((float(time_directory), time_directory))
+        except ValueError:
+            continue
+    for start_time, time_directory in sorted(time_directories):
+        path = os.path.join(directory, time_directory)
+        if not os.path.isdir(path):
+            continue
+        for file_name in sorted(os.listdir(path)):
+            match = RESTART_FILE_NAME.match(file_name)
+            if match:
+                sources.setdefault(match.group('name') + match.group('extension'), []).append(
+                    (float(match.group('start_time')), os.path.join(path, file_name)))
+            else:
+                sources.setdefault(file_name, []).append((start_time, os.path.join(path, file_name)))
+    for name in sources:
+        sources[name].sort(key=lambda source: source[0])
+    return sources
+
+
+class ResultsCache:
+    # columnar cache of the output of a function object, consisting of an npz file with the parsed values of each
+    # source file (segment_<n>) and an index (json) with the size, modification time and parsed length of each source
+    # file. Sources which did not change are not parsed again, and time series which grew are only parsed from the end
+    # of the part which was parsed before
+    def __init__(self, directory, file_name, sources):
+        self.directory = directory
+        self.file_name = file_name
+        self.sources = sources
+        self.is_set = file_name.endswith('.xy')
+
+    def load(self):
+        index, segments = self.__read_cache()
+        cached = {source['path']: (source, segment) for source, segment in zip(index.get('sources', []), segments)}
+
+        new_index = {'version': CACHE_VERSION, 'sources': []}
+        new_segments = []
+        changed = len(cached) != len(self.sources)
+        for start_time, path in self.sources:
+            status = os.stat(path)
+            source, segment = cached.get(path, (None, None))
+            if source is not None and source['size'] == status.st_size and source['mtime'] == status.st_mtime:
+                pass
+            elif (source is not None and not self.is_set and source['layout'] is not None and
+                  status.st_size > source['size']):
+                values, offset = parse_time_series(path, source['offset'], source['layout'])
+                segment = np.concatenate((segment, values))
+                source = dict(source, size=status.st_size, mtime=status.st_mtime, offset=offset)
+                changed = True
+            else:
+                source, segment = self.__parse(path, status)
+                changed = True
+            source['start_time'] = start_time
+            new_index['sources'].append(source)
+            new_segments.append(segment)
+
+        if changed:
+            self.__write_cache(new_index, new_segments)
+        return self.__merge(new_index['sources'], new_segments)
+
+    def __parse(self, path, status):
+        source = {'path': path, 'size': status.st_size, 'mtime': status.st_mtime}
+        if self.is_set:
+            segment = np.loadtxt(path, comments='#', ndmin=2)
+            source['offset'] = status.st_size
+            return source, segment
+        layout = get_layout(path)
+        if layout is None:
+            # the header or first sample has not been written yet
+            source.update(size=-1, offset=0, layout=None)
+            return source, np.empty((0, 0))
+        segment, offset = parse_time_series(path, 0, layout)
+        source.update(offset=offset, layout=layout)
+        return source, segment
+
+    def __merge(self, sources, segments):
+        if self.is_set:
+            return {'Time': np.array([source['start_time'] for source in sources]),
+                    'coordinates': segments[0][:, :3] if len(segments) > 0 else np.empty((0, 3)),
+                    'values': np.array([segment[:, 3:] for segment in segments])}
+
+        layouts = [source['layout'] for source in sources if source['layout'] is not None]
+        if len(layouts) == 0:
+            return {}
+        parts = []
+        for index, segment in enumerate(segments):
+            if len(segment) == 0:
+                continue
+            if index + 1 < len(sources):
+                segment = segment[segment[:, 0] < sources[index + 1]['start_time']]
+            parts.append(segment)
+        values = np.concatenate(parts) if len(parts) > 0 else np.empty((0, len(layouts[-1]['names'])))
+        results = {name: values[:, column] for column, name in enumerate(layouts[-1]['names'])}
+        if len(layouts[-1]['locations']) > 0:
+            results['locations'] = np.array(layouts[-1]['locations'])
+        return results
+
+    def __read_cache(self):
+        try:
+            with open(os.path.join(self.directory, self.file_name + '.json'), 'r') as index_file:
+                index = json.load(index_file)
+            if index.get('version') != CACHE_VERSION:
+                return {}, []
+            with np.load(os.path.join(self.directory, self.file_name + '.npz')) as cache:
+                segments = [cache['segment_' + str(number)] for number in range(len(index['sources']))]
+            return index, segments
+        except (OSError, ValueError, KeyError):
+            return {}, []
+
+    def __write_cache(self, index, segments):
+        # both files are replaced atomically, so that readers never see a partially written cache
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, self.file_name)
+            with open(path + '.npz.tmp', 'wb') as cache:
+                np.savez(cache, **{'segment_' + str(number): segment for number, segment in enumerate(segments)})
+            with open(path + '.json.tmp', 'w') as index_file:
+                json.dump(index, index_file)
+            os.replace(path + '.npz.tmp', path + '.npz')
+            os.replace(path + '.json.tmp', path + '.json')
+        except OSError:
+            # e.g. a case in a read-only directory, which is then parsed each time
+            pass
+
+
+def get_layout(path):
+    # returns the names of the numeric columns and their position in a line (after removing the parentheses of
+    # vectors) from the header and the first sample of a time series, or None if no sample was written yet
+    header = []
+    first_sample = None
+    with open(path, 'r') as time_series:
+        for line in time_series:
+            if not line.endswith('\n'):
+                break
+            if line.startswith('#'):
+                header.append(line)
+            elif line.strip() != '':
+                first_sample = line
+                break
+    if first_sample is None or len(header) == 0:
+        return None
+
+    names = header[-1].lstrip('#').split()
+    probes = [re.match(r'#\s*Probe\s+(\d+)\s*\((.*)\)', line) for line in header]
+    locations = [[float(value) for value in probe.group(2).split()] for probe in probes if probe is not None]
+    entries = re.findall(r'\([^)]*\)|\S+', first_sample)
+    if len(locations) > 0:
+        field = os.path.basename(path)
+        names = ['Time'] + [field + '_' + str(probe) for probe in range(len(entries) - 1)]
+    elif len(names) != len(entries):
+        names = ['Time'] + ['column_' + str(column) for column in range(1, len(entries))]
+
+    layout = {'names': [], 'columns': [], 'locations': locations}
+    position = 0
+    for name, entry in zip(names, entries):
+        if entry.startswith('('):
+            components = len(entry.strip('()').split())
+            suffixes = ['x', 'y', 'z'] if components == 3 else [str(component) for component in range(components)]
+            for component in range(components):
+                layout['names'].append(name + '_' + suffixes[component])
+                layout['columns'].append(position + component)
+            position += components
+            continue
+        try:
+            float(entry)
+            layout['names'].append(name)
+            layout['columns'].append(position)
+        except ValueError:
+            pass
+        position += 1
+    return layout
+
+
+def parse_time_series(path, offset, layout):
+    # parses the complete lines of a time series from offset, returns the values and the offset after the last parsed
+    # line
+    with open(path, 'rb') as time_series:
+        time_series.seek(offset)
+        data = time_series.read()
+    end = data.rfind(b'\n') + 1
+    lines = data[:end].decode().translate(REMOVE_PARENTHESES).splitlines()
+    values = np.loadtxt(lines, comments='#', usecols=layout['columns'], ndmin=2)
+    if len(values) == 0:
+        values = np.empty((0, len(layout['columns'])))
+    return values, offset + end
+
+
+def main():
+    # builds (or updates) the cache of a function object and prints the loaded columns, e.g.
+    # python3 postProcessing/loadResults.py forceCoeffs
+    if len(sys.argv) < 2:
+        print('Usage: python3 postProcessing/loadResults.py <function object> [file name]')
+        sys.exit(1)
+    results = load('.', sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    for name, values in results.items():
+        print(name.ljust(24) + str(values.shape))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+import os
+import re
+import sys
+import time
+import argparse
+from collections import deque
+import numpy as np
+
+# bytes read per sample of the rolling window when attaching to the files of a running case, so that the window is
+# filled from the end of the files without reading them from the start
+TAIL_BYTES_PER_SAMPLE = 512
+
+# maximum number of bytes searched for the header of a file
+HEADER_BYTES = 65536
+
+REMOVE_PARENTHESES = str.maketrans('()', '  ')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Monitor the residuals, force coefficients, probes and other time series written into '
+                    'postProcessing while the solver is running. Run from the case directory.')
+    parser.add_argument('--interval', type=float, default=5, help='seconds between two refreshes')
+    parser.add_argument('--window', type=int, default=1000, help='number of samples kept for the rolling statistics')
+    parser.add_argument('--select', default='.*', help='regular expression selecting the monitored quantities, '
+                                                       'given as <function object>/<quantity>, e.g. "residuals/.*"')
+    parser.add_argument('--plot', default=None, help='write a plot of the rolling window to this file at each refresh')
+    parser.add_argument('--once', action='store_true', help='print the summary once and exit')
+    arguments = parser.parse_args()
+
+    monitor = Monitor(os.path.join('postProcessing'), arguments.window, re.compile(arguments.select))
+    try:
+        while True:
+            monitor.update()
+            if sys.stdout.isatty() and not arguments.once:
+                sys.stdout.write('\033[H\033[J')
+            sys.stdout.write(monitor.get_summary())
+            sys.stdout.flush()
+            if arguments.plot is not None:
+                monitor.plot(arguments.plot)
+            if arguments.once:
+                break
+            time.sleep(arguments.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+class Monitor:
+    # follows all time series written into postProcessing/<function object>/<startTime>/ (solverInfo.dat of the
+    # residuals, coefficient.dat of the force coefficients, the files of the probes, ...) while the solver is running.
+    # Only the bytes appended since the last update are read and only the last window samples of each quantity are
+    # kept, so the cost of an update depends on the output written since the last update and not on the length of the
+    # run. Function objects writing into each time directory (surfaces, line probes) are skipped. New restart
+    # directories are picked up at each update, and samples of a restart replace those written after its start time by
+    # the previous run
+    def __init__(self, directory, window, select):
+        self.directory = directory
+        self.window = window
+        self.select = select
+        self.followers = {}
+        self.series = {}
+        self.last_update = {}
+        self.ignored = set()
+
+    def update(self):
+        if not os.path.isdir(self.directory):
+            return
+        for function_object in sorted(os.listdir(self.directory)):
+            function_object_directory = os.path.join(self.directory, function_object)
+            if function_object in self.ignored or not os.path.isdir(function_object_directory):
+                continue
+            for path in self.__get_files(function_object_directory):
+                if path not in self.followers:
+                    self.followers[path] = FileFollower(path, self.window * TAIL_BYTES_PER_SAMPLE)
+                samples = self.followers[path].read_samples()
+                if not self.followers[path].is_time_series:
+                    # function objects writing into each time directory (e.g. surfaces) are not followed, so that
+                    # their growing number of time directories is not listed at each update
+                    self.ignored.add(function_object)
+                    break
+                if len(samples) > 0:
+                    self.last_update[function_object] = time.time()
+                for quantity, sample_time, value in samples:
+                    name = function_object + '/' + quantity
+                    if self.select.match(name):
+                        self.__add(name, sample_time, value)
+
+    def get_summary(self):
+        lines = []
+        for function_object in sorted(self.last_update):
+            names = [name for name in self.series if name.startswith(function_object + '/')]
+            if len(names) == 0:
+                continue
+            latest_time = max(self.series[name][-1][0] for name in names)
+            lines.append(function_object + ' (time ' + format(latest_time, 'g') + ', updated ' +
+                         str(int(time.time() - self.last_update[function_object])) + ' s ago)')
+            lines.append('    ' + 'quantity'.ljust(24) + ''.join(column.rjust(13) for column in
+                                                                  ['last', 'mean', 'std', 'min', 'max', 'trend']))
+            for name in names:
+                statistics = self.get_statistics(name)
+                lines.append('    ' + name[len(function_object) + 1:].ljust(24) +
+                             ''.join(format(statistics[key], '13.4e') for key in
+                                     ['last', 'mean', 'std', 'min', 'max', 'trend']))
+            lines.append('')
+        if len(lines) == 0:
+            lines.append('waiting for output in ' + self.directory)
+        return '\n'.join(lines) + '\n'
+
+    def get_statistics(self, name):
+        # statistics of the rolling window. The trend is the change of the mean from the older to the newer half of the
+        # window, in decades for residuals (negative while converging) and relative to the standard deviation otherwise
+        values = np.fromiter((value for _, value in self.series[name]), dtype=float, count=len(self.series[name]))
+        older, newer = values[:len(values) // 2], values[len(values) // 2:]
+        trend = np.nan
+        if len(older) > 0:
+            if name.startswith('residuals/'):
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    trend = np.log10(np.mean(newer) / np.mean(older))
+            elif np.std(values) > 0:
+                trend = (np.mean(newer) - np.mean(older)) / np.std(values)
+        return {'last': values[-1], 'mean': np.mean(values), 'std': np.std(values), 'min': np.min(values),
+                'max': np.max(values), 'trend': trend}
+
+    def plot(self, path):
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        function_objects = [function_object for function_object in sorted(self.last_update)
+                            if any(name.startswith(function_object + '/') for name in self.series)]
+        if len(function_objects) == 0:
+            return
+        fig, axes = plt.subplots(len(function_objects), 1, squeeze=False, figsize=(8, 3 * len(function_objects)))
+        for ax, function_object in zip(axes[:, 0], function_objects):
+            for name in self.series:
+                if name.startswith(function_object + '/'):
+                    ax.plot([sample[0] for sample in self.series[name]], [sample[1] for sample in self.series[name]],
+                            label=name[len(function_object) + 1:])
+            if function_object == 'residuals':
+                ax.set_yscale('log')
+            ax.set(xlabel='time', title=function_object)
+            ax.legend(loc='upper right', fontsize='small')
+            ax.grid()
+        fig.tight_layout()
+        fig.savefig(path, dpi=100)
+        plt.close('all')
+
+    def __add(self, name, sample_time, value):
+        series = self.series.setdefault(name, deque(maxlen=self.window))
+        # samples written after the start time of a restart are superseded by the samples of the restart
+        while len(series) > 0 and series[-1][0] >= sample_time:
+            series.pop()
+        series.append((sample_time, value))
+
+    @staticmethod
+    def __get_files(function_object_directory):
+        # returns the files of all runs, ordered by the start time of the run
+        time_directories = []
+        for time_directory in os.listdir(function_object_directory):
+            try:
+                time_directories.append((float(time_directory), time_directory))
+            except ValueError:
+                continue
+        files = []
+        for _, time_directory in sorted(time_directories):
+            path = os.path.join(function_object_directory, time_directory)
+            if os.path.isdir(path):
+                files.extend(os.path.join(path, file_name) for file_name in sorted(os.listdir(path))
+                             if os.path.isfile(os.path.join(path, file_name)))
+        return files
+
+
+class FileFollower:
+    # reads the samples appended to a time series file since the last call. The offset of the last complete line is
+    # kept, so each byte of the file is read only once. Files which are not time series (e.g. surfaces or line
+    # probes written into each time directory) are ignored
+    def __init__(self, path, tail_bytes):
+        self.path = path
+        self.tail_bytes = tail_bytes
+        self.offset = None
+        self.columns = None
+        self.number_of_probes = 0
+        self.is_time_series = True
+
+    def read_samples(self):
+        # returns the new samples as a list of (quantity, time, value)
+        if not self.is_time_series:
+            return []
+        if self.offset is None and not self.__read_header():
+            return []
+
+        size = os.path.getsize(self.path)
+        if size < self.offset:
+            # the file was truncated or replaced, e.g. by a restart from the same start time
+            self.offset = None
+            self.columns = None
+            return []
+        if size == self.offset:
+            return []
+        with open(self.path, 'rb') as time_series:
+            time_series.seek(self.offset)
+            data = time_series.read(size - self.offset)
+        # only complete lines are read, the rest is read again at the next update
+        end = data.rfind(b'\n') + 1
+        self.offset += end
+
+        samples = []
+        for line in data[:end].decode(errors='replace').splitlines():
+            if line.startswith('#') or line.strip() == '':
+                continue
+            values = line.translate(REMOVE_PARENTHESES).split()
+            if self.columns is None:
+                self.__set_probe_columns(len(values) - 1)
+            try:
+                sample_time = float(values[0])
+                samples.extend((quantity, sample_time, float(values[column])) for column, quantity in self.columns)
+            except (ValueError, IndexError):
+                continue
+        return samples
+
+    def __read_header(self):
+        # reads the header of the file and positions the offset either after the header or at the tail of the file.
+        # Returns False if the header was not written completely yet
+        with open(self.path, 'rb') as time_series:
+            head = time_series.read(HEADER_BYTES)
+        header = []
+        header_end = 0
+        for line in head.split(b'\n')[:-1]:
+            if not line.startswith(b'#'):
+                break
+            header.append(line.decode(errors='replace'))
+            header_end += len(line) + 1
+        if header_end == len(head) or len(header) == 0:
+            self.is_time_series = len(header) > 0 or len(head) == 0
+            return False
+
+        names = header[-1].lstrip('#').split()
+        if len(names) == 0 or names[0] != 'Time':
+            self.is_time_series = False
+            return False
+        self.number_of_probes = sum(1 for line in header if re.match(r'#\s*Probe\s+\d+\s*\(', line))
+        if any(name.endswith('_initial') for name in names):
+            self.columns = [(index, name[:-len('_initial')]) for index, name in enumerate(names)
+                            if name.endswith('_initial')]
+        elif self.number_of_probes == 0:
+            self.columns = [(index, name) for index, name in enumerate(names) if index > 0]
+
+        self.offset = header_end
+        size = os.path.getsize(self.path)
+        if size - self.tail_bytes > header_end:
+            # start at the first complete line of the tail
+            with open(self.path, 'rb') as time_series:
+                time_series.seek(size - self.tail_bytes)
+                partial_line = time_series.readline()
+            self.offset = size - self.tail_bytes + len(partial_line)
+        return True
+
+    def __set_probe_columns(self, number_of_values):
+        # the number of components of the probed field (scalar, vector, tensor) is only known from the data
+        field = os.path.basename(self.path)
+        number_of_probes = max(1, self.number_of_probes)
+        components = max(1, number_of_values // number_of_probes)
+        suffixes = ['x', 'y', 'z'] if components == 3 else [str(component) for component in range(components)]
+        self.columns = []
+        for probe in range(number_of_probes):
+            for component in range(components):
+                name = field + '_' + str(probe) + ('' if components == 1 else '_' + suffixes[component])
+                self.columns.append((1 + probe * components + component, name))
+
+
+if __name__ == '__main__':
+    main()
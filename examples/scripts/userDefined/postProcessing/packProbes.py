@@ -0,0 +1,392 @@
+import os
+import json
+import time
+import argparse
+from multiprocessing import Pool
+import numpy as np
+
+# layout of the packed output, packs written with a different layout are rebuilt
+PACK_VERSION = 1
+
+# directory of the packed output within postProcessing
+PACK_DIRECTORY = 'packed'
+
+# number of chunks of write times handed to each process, which balances the load if some chunks are read slower
+CHUNKS_PER_PROCESS = 4
+
+# number of packed times copied at once if a pack is rebuilt to insert times in between packed ones
+REBUILD_CHUNK_SIZE = 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Pack the output of line probes (one file per line and write time) or point probes into memory-'
+                    'mapped arrays in postProcessing/packed. Run from the case directory after the solver finished.')
+    parser.add_argument('function_object', help='name of the function object, e.g. lineProbes or point_probes')
+    parser.add_argument('--lines', nargs='*', default=None,
+                        help='names of the lines, used to split the file names of the line probes into the name of '
+                             'the line and the fields (by default, the name of the line ends at the first underscore)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='number of processes reading the files of the line probes (default: number of cores)')
+    parser.add_argument('--dtype', default='float64', choices=['float32', 'float64'],
+                        help='data type of the packed values')
+    parser.add_argument('--delete', action='store_true', help='delete the files which were packed')
+    arguments = parser.parse_args()
+
+    directory = os.path.join('postProcessing', arguments.function_object)
+    pack_directory = os.path.join('postProcessing', PACK_DIRECTORY, arguments.function_object)
+    write_times = get_write_times(directory)
+    if len(write_times) == 0:
+        print('No output of ' + arguments.function_object + ' found in postProcessing')
+        return
+    print('>>> Packing ' + arguments.function_object)
+    if any(file_name.endswith('.xy') for file_name in os.listdir(write_times[0][1])):
+        packed_files = pack_sets(write_times, pack_directory, arguments.lines, arguments.processes, arguments.dtype)
+    else:
+        packed_files = pack_probes(arguments.function_object, pack_directory, arguments.dtype)
+    if arguments.delete:
+        delete_files(packed_files, directory)
+
+
+def open_pack(case, function_object, fields=None):
+    # returns the packed output of a function object as a ProbePack. The fields (e.g. 'U' or 'p_k' for line probes,
+    # the name of the field for point probes) are only required if more than one pack was written
+    directory = os.path.join(case, 'postProcessing', PACK_DIRECTORY, function_object)
+    packs = sorted(file_name[:-len('.json')] for file_name in os.listdir(directory) if file_name.endswith('.json')) \
+        if os.path.isdir(directory) else []
+    if fields is None:
+        if len(packs) != 1:
+            raise ValueError('Select one of the packs of ' + function_object + ': ' + ', '.join(packs))
+        fields = packs[0]
+    elif fields not in packs:
+        raise ValueError(function_object + ' has no pack of ' + fields + ', select one of ' + ', '.join(packs))
+    return ProbePack(os.path.join(directory, fields))
+
+
+class ProbePack:
+    # packed output of a function object, given as the values of the shape (time, line, sample, component), the times,
+    # the names of the lines, the coordinates of the samples (line, sample, 3) and the names of the components. Point
+    # probes are packed as a single line of which the probes are the samples. Lines with fewer samples (e.g. if some
+    # points are outside of the mesh) are padded with nan. The values are memory-mapped, so that only the parts which
+    # are sliced are read from disk, e.g. pack.select(time_start=10, line='x=2') or pack.at_location([2, 0, 0.5])
+    def __init__(self, path):
+        metadata = read_metadata(path)
+        if metadata is None:
+            raise ValueError('No packed output found at ' + path)
+        self.times = np.array(metadata['times'], dtype=float)
+        self.lines = metadata['lines']
+        self.coordinates = np.array(metadata['coordinates'], dtype=float)
+        self.components = metadata['components']
+        shape = (len(self.times), len(self.lines), metadata['number_of_samples'], len(self.components))
+        if len(self.times) == 0:
+            self.values = np.empty(shape, dtype=metadata['dtype'])
+        else:
+            self.values = np.memmap(path + '.bin', dtype=metadata['dtype'], mode='r', shape=shape)
+
+    def get_time_range(self, time_start=None, time_end=None):
+        # returns the slice of the times within [time_start, time_end]
+        start = 0 if time_start is None else np.searchsorted(self.times, time_start, side='left')
+        end = len(self.times) if time_end is None else np.searchsorted(self.times, time_end, side='right')
+        return slice(start, end)
+
+    def select(self, time_start=None, time_end=None, line=None):
+        # returns the times and a view of the values within [time_start, time_end], either of all lines or of a
+        # single line (given by its name), without reading them from disk
+        time_range = self.get_time_range(time_start, time_end)
+        if line is None:
+            return self.times[time_range], self.values[time_range]
+        return self.times[time_range], self.values[time_range, self.lines.index(line)]
+
+    def get_nearest_sample(self, location):
+        # returns the (line, sample) closest to the location
+        distance = np.linalg.norm(self.coordinates - np.asarray(location, dtype=float), axis=-1)
+        return np.unravel_index(np.nanargmin(distance), distance.shape)
+
+    def at_location(self, location, time_start=None, time_end=None):
+        # returns the times and the values (time, component) of the sample closest to the location, reading only
+        # these values from disk
+        line, sample = self.get_nearest_sample(location)
+        time_range = self.get_time_range(time_start, time_end)
+        return self.times[time_range], np.array(self.values[time_range, line, sample])
+
+
+def get_write_times(directory):
+    # returns the time directories of the function object as a sorted list of (time, path)
+    if not os.path.isdir(directory):
+        return []
+    write_times = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                write_times.append((float(entry.name), entry.path))
+            except ValueError:
+                continue
+    write_times.sort()
+    return write_times
+
+
+def pack_sets(write_times, pack_directory, lines, processes, dtype):
+    # packs the output of line probes (postProcessing/<function object>/<time>/<line>_<fields>.xy) into one pack per
+    # group of fields. Write times which were not packed before (or written again since, e.g. by a restart) are read
+    # by a pool of processes, each writing its share directly into its row of the memory-mapped pack, all other packed
+    # times are kept. Returns the packed files
+    packed_files = []
+    for fields, files in get_groups(write_times[0][1], lines).items():
+        path = os.path.join(pack_directory, fields)
+        metadata = read_metadata(path)
+        new_write_times = get_new_write_times(write_times, files[0][1], metadata)
+        if len(new_write_times) == 0:
+            continue
+        layout = get_set_layout(new_write_times[0][1], files, fields)
+        if layout is None:
+            print('Could not read the output of ' + fields + ' at time ' + format(new_write_times[0][0], 'g'))
+            continue
+        if has_changed_layout(metadata, layout):
+            # all write times on disk are packed again, packed times which are no longer on disk are lost
+            print('    the layout of ' + path + ' changed, packing it again')
+            metadata = None
+            new_write_times = write_times
+        metadata, rows = extend_pack(path, metadata, layout, [write_time for write_time, _ in new_write_times], dtype)
+
+        shape = get_shape(metadata)
+        number_of_chunks = max(1, min(len(new_write_times), (processes or os.cpu_count() or 1) * CHUNKS_PER_PROCESS))
+        rows = list(zip(rows, (time_directory for _, time_directory in new_write_times)))
+        # the values are written with the type of the existing pack, which is kept if another one is requested
+        file_names = [file_name for _, file_name in files]
+        tasks = [(path + '.bin', metadata['dtype'], shape, rows[chunk::number_of_chunks], file_names,
+                  len(layout['components'])) for chunk in range(number_of_chunks)]
+        if processes == 1:
+            results = map(read_sets, tasks)
+        else:
+            with Pool(processes) as pool:
+                results = pool.map(read_sets, tasks)
+        for result in results:
+            packed_files.extend(result)
+
+        write_metadata(path, metadata)
+        print('    ' + fields.ljust(16) + str(len(new_write_times)) + ' write times packed, ' + str(shape[0]) +
+              ' in total (' + str(shape[1]) + ' lines, ' + str(shape[2]) + ' samples, ' + str(shape[3]) +
+              ' components)')
+    return packed_files
+
+
+def get_groups(time_directory, lines):
+    # returns the files of each group of fields as a dictionary with the fields as keys and a list of (line, file name)
+    # as values, where the file name is split into the name of the line (the longest of the given lines) and the fields
+    groups = {}
+    for file_name in sorted(os.listdir(time_directory)):
+        if not file_name.endswith('.xy'):
+            continue
+        base_name = file_name[:-len('.xy')]
+        if lines is None:
+            line, _, fields = base_name.partition('_')
+        else:
+            matches = [line for line in lines if base_name.startswith(line + '_')]
+            if len(matches) == 0:
+                continue
+            line = max(matches, key=len)
+            fields = base_name[len(line) + 1:]
+        groups.setdefault(fields, []).append((line, file_name))
+    if lines is not None:
+        for files in groups.values():
+            files.sort(key=lambda file: lines.index(file[0]))
+    return groups
+
+
+def get_new_write_times(write_times, file_name, metadata):
+    # returns the write times which were not packed yet or modified since the last packing
+    if metadata is None:
+        return write_times
+    last_time = metadata['times'][-1] if len(metadata['times']) > 0 else -np.inf
+    new_write_times = []
+    for write_time, time_directory in write_times:
+        if write_time > last_time:
+            new_write_times.append((write_time, time_directory))
+            continue
+        try:
+            if os.path.getmtime(os.path.join(time_directory, file_name)) > metadata['packed_at']:
+                new_write_times.append((write_time, time_directory))
+        except OSError:
+            continue
+    return new_write_times
+
+
+def get_set_layout(time_directory, files, fields):
+    # returns the lines, coordinates and components of a group of fields from the files of a write time
+    samples = [read_set(os.path.join(time_directory, file_name)) for _, file_name in files]
+    if any(line_samples is None for line_samples in samples):
+        return None
+    number_of_samples = max(len(line_samples) for line_samples in samples)
+    coordinates = np.full((len(files), number_of_samples, 3), np.nan)
+    for line, line_samples in enumerate(samples):
+        coordinates[line, :len(line_samples)] = line_samples[:, :3]
+    return {'lines': [line for line, _ in files], 'coordinates': coordinates.tolist(),
+            'components': get_component_names(fields.split('_'), samples[0].shape[1] - 3),
+            'number_of_samples': number_of_samples}
+
+
+def get_component_names(fields, number_of_values):
+    # names of the values, where the components of vectors and tensors are numbered (or named x, y and z)
+    if number_of_values == len(fields):
+        return fields
+    if len(fields) > 0 and number_of_values % len(fields) == 0:
+        components = number_of_values // len(fields)
+        suffixes = ['x', 'y', 'z'] if components == 3 else [str(component) for component in range(components)]
+        return [field + '_' + suffix for field in fields for suffix in suffixes]
+    return ['value_' + str(value) for value in range(number_of_values)]
+
+
+def read_set(path, number_of_values=None):
+    # returns the samples of a set as an array of (x, y, z, values), or None if the file is missing or incomplete
+    try:
+        with open(path, 'rb') as set_file:
+            data = set_file.read()
+    except OSError:
+        return None
+    if not data.endswith(b'\n'):
+        return None
+    if b'#' in data:
+        data = b'\n'.join(line for line in data.split(b'\n') if not line.startswith(b'#'))
+    try:
+        first_line = data.lstrip().split(b'\n', 1)[0]
+        number_of_columns = len(first_line.split()) if number_of_values is None else 3 + number_of_values
+        samples = np.array(data.split(), dtype=float)
+    except ValueError:
+        return None
+    if number_of_columns <= 3 or len(samples) % number_of_columns != 0:
+        return None
+    return samples.reshape(-1, number_of_columns)
+
+
+def read_sets(task):
+    # reads the files of the lines at the given write times into their rows of the pack. Samples which are missing or
+    # incomplete are packed as nan and their files are not returned, so that they are not deleted
+    path, dtype, shape, rows, file_names, number_of_values = task
+    packed_files = []
+    if len(rows) == 0:
+        return packed_files
+    values = np.memmap(path, dtype=dtype, mode='r+', shape=shape)
+    for row, time_directory in rows:
+        for line, file_name in enumerate(file_names):
+            file_path = os.path.join(time_directory, file_name)
+            samples = read_set(file_path, number_of_values)
+            if samples is None or len(samples) > shape[2]:
+                values[row, line] = np.nan
+                continue
+            values[row, line, :len(samples)] = samples[:, 3:]
+            values[row, line, len(samples):] = np.nan
+            packed_files.append(file_path)
+    values.flush()
+    return packed_files
+
+
+def pack_probes(function_object, pack_directory, dtype):
+    # packs the output of point probes (one time series per field, see loadResults.py) as a single line, of which the
+    # probes are the samples. All times of the output on disk are written, packed times which are no longer on disk
+    # (e.g. deleted after they were packed) are kept. Returns the packed files
+    from loadResults import load, get_sources
+    sources = get_sources(os.path.join('postProcessing', function_object))
+    packed_files = []
+    for field in sorted(sources):
+        results = load('.', function_object, field)
+        locations = results.pop('locations', np.empty((0, 3)))
+        times = results.pop('Time')
+        if len(times) == 0 or len(locations) == 0:
+            continue
+        columns = np.column_stack(list(results.values()))
+        layout = {'lines': [function_object], 'coordinates': locations[None].tolist(),
+                  'components': get_component_names([field], columns.shape[1] // len(locations)),
+                  'number_of_samples': len(locations)}
+        path = os.path.join(pack_directory, field)
+        metadata = read_metadata(path)
+        if has_changed_layout(metadata, layout):
+            print('    the layout of ' + path + ' changed, packing it again')
+            metadata = None
+        metadata, rows = extend_pack(path, metadata, layout, times.tolist(), dtype)
+        values = np.memmap(path + '.bin', dtype=metadata['dtype'], mode='r+', shape=get_shape(metadata))
+        values[rows] = columns.reshape(len(times), 1, len(locations), -1)
+        values.flush()
+        del values
+        write_metadata(path, metadata)
+        packed_files.extend(path for _, path in sources[field])
+        print('    ' + field.ljust(16) + str(len(times)) + ' times packed, ' + str(len(metadata['times'])) +
+              ' in total (' + str(len(locations)) + ' probes)')
+    return packed_files
+
+
+def has_changed_layout(metadata, layout):
+    return metadata is not None and any(metadata[key] != layout[key] for key in ['lines', 'components',
+                                                                                 'number_of_samples'])
+
+
+def extend_pack(path, metadata, layout, times, dtype):
+    # prepares the pack for writing the given times. Times which are already packed are written again in their rows,
+    # all other packed times are kept. The times are the slowest varying dimension, so times after the last packed one
+    # are appended to the file, while times in between packed ones require the file to be rebuilt. A new pack is
+    # started if there is no metadata (e.g. the layout changed). Returns the new metadata and the row of each time
+    if metadata is not None and metadata['dtype'] != dtype:
+        print('    the packed output of ' + path + ' is kept as ' + metadata['dtype'])
+        dtype = metadata['dtype']
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if metadata is None:
+        metadata = dict(layout, version=PACK_VERSION, dtype=dtype, times=[])
+        open(path + '.bin', 'wb').close()
+    metadata['coordinates'] = layout['coordinates']
+
+    packed_times = metadata['times']
+    all_times = sorted(set(packed_times).union(times))
+    row_size = int(np.prod(get_shape(metadata)[1:]))
+    if all_times[:len(packed_times)] == packed_times:
+        with open(path + '.bin', 'ab') as pack:
+            pack.truncate(len(all_times) * row_size * np.dtype(dtype).itemsize)
+    else:
+        packed_rows = np.searchsorted(all_times, packed_times)
+        packed = np.memmap(path + '.bin', dtype=dtype, mode='r', shape=(len(packed_times), row_size))
+        rebuilt = np.memmap(path + '.bin.tmp', dtype=dtype, mode='w+', shape=(len(all_times), row_size))
+        for start in range(0, len(packed_times), REBUILD_CHUNK_SIZE):
+            end = start + REBUILD_CHUNK_SIZE
+            rebuilt[packed_rows[start:end]] = packed[start:end]
+        rebuilt.flush()
+        del packed, rebuilt
+        os.replace(path + '.bin.tmp', path + '.bin')
+    metadata['times'] = all_times
+    metadata['packed_at'] = time.time()
+    return metadata, np.searchsorted(all_times, times).tolist()
+
+
+def get_shape(metadata):
+    return len(metadata['times']), len(metadata['lines']), metadata['number_of_samples'], len(metadata['components'])
+
+
+def read_metadata(path):
+    try:
+        with open(path + '.json', 'r') as metadata_file:
+            metadata = json.load(metadata_file)
+    except (OSError, ValueError):
+        return None
+    return metadata if metadata.get('version') == PACK_VERSION else None
+
+
+def write_metadata(path, metadata):
+    # the metadata is written after the values and replaced atomically, so that it only lists packed times
+    with open(path + '.json.tmp', 'w') as metadata_file:
+        json.dump(metadata, metadata_file)
+    os.replace(path + '.json.tmp', path + '.json')
+
+
+def delete_files(packed_files, directory):
+    for path in packed_files:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+    for _, time_directory in get_write_times(directory):
+        try:
+            os.rmdir(time_directory)
+        except OSError:
+            continue
+    print('    ' + str(len(packed_files)) + ' packed files deleted')
+
+
+if __name__ == '__main__':
+    main()
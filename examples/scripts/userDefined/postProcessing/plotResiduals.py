@@ -1,58 +1,203 @@
 import os
+import argparse
+from itertools import islice
+import numpy as np
 import matplotlib.pyplot as plt
 
+# number of lines parsed at once, which limits the memory used while reading the residuals of long runs
+CHUNK_SIZE = 100000
+
 
 def main():
+    parser = argparse.ArgumentParser(description='Plot the residuals of all (restarted) runs of the case')
+    parser.add_argument('--format', default='png', help='file format of the plot, e.g. png, pdf or svg')
+    parser.add_argument('--dpi', type=int, default=600, help='resolution of the plot (for raster formats)')
+    parser.add_argument('--max-points', type=int, default=4000,
+                        help='maximum number of points plotted per residual (the series is downsampled beyond that)')
+    arguments = parser.parse_args()
+
     print('>>> Plotting residuals')
-    # get residual files
-    dirs = os.listdir(os.path.join('postProcessing', 'residuals'))
-    for dir in dirs:
-        # read residuals
-        res_file = open(os.path.join('postProcessing', 'residuals', dir, 'solverInfo.dat'), 'r')
-        lines = res_file.readlines()
-
-        # get all variables that needs to be plotted
-        header = lines[1].strip().split()
-        index = 0
-        var_index = []
-        for var in header:
-            if var.find('_initial') != -1:
-                var_index.append(index)
-            index += 1
-
-        # store variable name
-        var_name = []
-        for index in var_index:
-            var_name.append(header[index][:-8])
-
-        # get residuals for each variable, offset by -1 to account for additional entry in header
-        res = []
-        time = []
-        for var in var_name:
-            res.append([])
-
-        for i in range(2, len(lines)):
-            line = lines[i].strip().split()
-            time.append(float(line[0]))
-            index = 0
-            for var in var_index:
-                res[index].append(float(line[var-1]))
-                index += 1
-
-        # plot residuals
-        fig, ax = plt.subplots()
-        for var_res in res:
-            ax.plot(time, var_res)
-
-        ax.legend(var_name, loc='upper right')
-        ax.set(xlabel='iterations', ylabel='residuals')
-        ax.set_yscale('log')
-        ax.grid()
-
-        fig.savefig('postProcessing/residuals_' + dir + '.png', dpi=600, facecolor='w', edgecolor='w', orientation='portrait',
-                    format=None, transparent=False, bbox_inches='tight', pad_inches=0.1, metadata=None)
-
-        plt.close('all')
+    segments = get_segments(os.path.join('postProcessing', 'residuals'))
+    if len(segments) == 0:
+        print('No residuals found in postProcessing/residuals')
+        return
+    residuals = read_residuals(segments, arguments.max_points)
+    plot_residuals(residuals, arguments.format, arguments.dpi)
+
+
+def get_segments(directory):
+    # each run (and each restart) writes its residuals into postProcessing/residuals/<startTime>/solverInfo.dat (or
+    # solverInfo_<time>.dat if the directory already exists). Returns the files ordered by their first time as a list of
+    # (path, end time), where the end time is the start of the next run, whose residuals supersede those written after
+    # it (e.g. when restarting from an earlier time directory). The end time of the last run is None
+    if not os.path.isdir(directory):
+        return []
+    start_times = []
+    for time_directory in os.listdir(directory):
+        path = os.path.join(directory, time_directory)
+        if not os.path.isdir(path):
+            continue
+        for file_name in sorted(os.listdir(path)):
+            if file_name.startswith('solverInfo') and file_name.endswith('.dat'):
+                start_time = get_start_time(os.path.join(path, file_name))
+                if start_time is not None:
+                    start_times.append((start_time, os.path.join(path, file_name)))
+    start_times.sort(key=lambda start_time: start_time[0])
+
+    segments = []
+    for index, (start_time, path) in enumerate(start_times):
+        end_time = start_times[index + 1][0] if index + 1 < len(start_times) else None
+        segments.append((path, end_time))
+    return segments
+
+
+def get_start_time(path):
+    with open(path, 'r') as residual_file:
+        for line in residual_file:
+            if not line.startswith('#') and line.strip() != '':
+                return float(line.split()[0])
+    return None
+
+
+def read_residuals(segments, max_points):
+    # reads the initial residuals of all variables in chunks of CHUNK_SIZE lines, so that only the downsampled series
+    # is kept in memory. Returns a dictionary with the variable names as keys and (time, residual) as values
+    decimators = {}
+    for path, end_time in segments:
+        with open(path, 'r') as residual_file:
+            names, columns = read_header(residual_file)
+            if len(columns) == 0:
+                continue
+            while True:
+                lines = list(islice(residual_file, CHUNK_SIZE))
+                # the last line may be incomplete if the run was stopped while writing it
+                if len(lines) > 0 and not lines[-1].endswith('\n'):
+                    lines.pop()
+                if len(lines) == 0:
+                    break
+                data = np.loadtxt(lines, usecols=[0] + columns, comments='#', ndmin=2)
+                if end_time is not None:
+                    data = data[data[:, 0] < end_time]
+                for index, name in enumerate(names):
+                    decimators.setdefault(name, MinMaxDecimator(max_points)).add(data[:, 0], data[:, index + 1])
+                if end_time is not None and len(data) > 0 and data[-1, 0] >= end_time:
+                    break
+    return {name: decimator.get_points() for name, decimator in decimators.items()}
+
+
+def read_header(residual_file):
+    # returns the names of the variables with an initial residual and their columns. The header is given as
+    # '# Time U_solver Ux_initial Ux_final Ux_iters ...', where the columns of the solver names, final residuals and
+    # iterations are skipped when reading the data
+    for line in residual_file:
+        if not line.startswith('#'):
+            break
+        header = line.lstrip('#').split()
+        if len(header) > 0 and header[0] == 'Time':
+            columns = [index for index, entry in enumerate(header) if entry.endswith('_initial')]
+            return [header[index][:-len('_initial')] for index in columns], columns
+    return [], []
+
+
+class MinMaxDecimator:
+    # downsamples a series while it is being read. The series is split into buckets of the same number of samples, of
+    # which only the samples with the minimum and maximum value are kept, so that the peaks of the residuals are
+    # preserved regardless of the length of the series. Whenever the number of buckets exceeds max_points / 2, adjacent
+    # buckets are merged and the number of samples per bucket is doubled, so that the memory used does not depend on
+    # the length of the series. Each bucket is stored as (x of minimum, minimum, x of maximum, maximum)
+    def __init__(self, max_points):
+        self.max_buckets = max(1, max_points // 2)
+        self.bucket_size = 1
+        self.buckets = np.empty((0, 4))
+        self.open_bucket = None
+        self.open_count = 0
+
+    def add(self, x, y):
+        samples = np.column_stack((x, y, x, y))
+
+        # fill up the last bucket of the previous chunk first
+        if self.open_bucket is not None:
+            number_of_samples = min(self.bucket_size - self.open_count, len(samples))
+            if number_of_samples > 0:
+                self.open_bucket = self.__merge(self.open_bucket, self.__reduce(samples[None, :number_of_samples]))
+                self.open_count += number_of_samples
+                samples = samples[number_of_samples:]
+            if self.open_count == self.bucket_size:
+                self.buckets = np.concatenate((self.buckets, self.open_bucket))
+                self.open_bucket = None
+                self.open_count = 0
+
+        number_of_samples = len(samples) // self.bucket_size * self.bucket_size
+        if number_of_samples > 0:
+            self.buckets = np.concatenate((self.buckets, self.__reduce(
+                samples[:number_of_samples].reshape(-1, self.bucket_size, 4))))
+        if number_of_samples < len(samples):
+            self.open_bucket = self.__reduce(samples[None, number_of_samples:])
+            self.open_count = len(samples) - number_of_samples
+
+        while len(self.buckets) > self.max_buckets:
+            self.__coarsen()
+
+    def get_points(self):
+        # returns the minimum and maximum of each bucket in the order in which they appear in the series
+        buckets = self.buckets if self.open_bucket is None else np.concatenate((self.buckets, self.open_bucket))
+        swap = buckets[:, 0] > buckets[:, 2]
+        x = np.empty(2 * len(buckets))
+        y = np.empty(2 * len(buckets))
+        x[0::2] = np.where(swap, buckets[:, 2], buckets[:, 0])
+        y[0::2] = np.where(swap, buckets[:, 3], buckets[:, 1])
+        x[1::2] = np.where(swap, buckets[:, 0], buckets[:, 2])
+        y[1::2] = np.where(swap, buckets[:, 1], buckets[:, 3])
+        return x, y
+
+    def __coarsen(self):
+        # with an odd number of buckets, the last one is merged with the incomplete bucket, which then holds less than
+        # twice the number of samples per bucket
+        if len(self.buckets) % 2 == 1:
+            last_bucket = self.buckets[-1:]
+            self.buckets = self.buckets[:-1]
+            if self.open_bucket is None:
+                self.open_bucket = last_bucket
+            else:
+                self.open_bucket = self.__merge(last_bucket, self.open_bucket)
+            self.open_count += self.bucket_size
+        self.buckets = self.__merge(self.buckets[0::2], self.buckets[1::2])
+        self.bucket_size *= 2
+
+    @staticmethod
+    def __reduce(samples):
+        # reduces samples of the shape (buckets, samples per bucket, 4) to one row per bucket
+        rows = np.arange(samples.shape[0])
+        minimum = np.argmin(samples[:, :, 1], axis=1)
+        maximum = np.argmax(samples[:, :, 3], axis=1)
+        return np.column_stack((samples[rows, minimum, 0], samples[rows, minimum, 1],
+                                samples[rows, maximum, 2], samples[rows, maximum, 3]))
+
+    @staticmethod
+    def __merge(first, second):
+        merged = first.copy()
+        smaller = second[:, 1] < first[:, 1]
+        merged[smaller, 0:2] = second[smaller, 0:2]
+        larger = second[:, 3] > first[:, 3]
+        merged[larger, 2:4] = second[larger, 2:4]
+        return merged
+
+
+def plot_residuals(residuals, file_format, dpi):
+    fig, ax = plt.subplots()
+    for name, (time, residual) in residuals.items():
+        ax.plot(time, residual, label=name)
+
+    ax.legend(loc='upper right')
+    ax.set(xlabel='iterations', ylabel='residuals')
+    ax.set_yscale('log')
+    ax.grid()
+
+    fig.savefig(os.path.join('postProcessing', 'residuals.' + file_format), dpi=dpi, facecolor='w', edgecolor='w',
+                orientation='portrait', format=file_format, transparent=False, bbox_inches='tight', pad_inches=0.1,
+                metadata=None)
+
+    plt.close('all')
 
 
 if __name__ == '__main__':
@@ -1,17 +1,29 @@
 import os
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 
 TIME = 0
 EKIN = 1
-DISS = 2 
+DISS = 2
 
-def main():
-    ref_solution = get_reference_solution()
-    num_solution = get_numerical_solution()
 
+def main():
+    parser = argparse.ArgumentParser(description='Compare the kinetic energy and its dissipation rate of the Taylor-'
+                                                 'Green vortex with the spectral reference solution')
+    parser.add_argument('--reference', default=os.path.join('postProcessing', 'taylor_green_vortex_512_ref.dat'),
+                        help='reference solution, e.g. a single copy shared by all cases of a resolution study')
+    parser.add_argument('--order', type=int, choices=[1, 2], default=1,
+                        help='order of the finite differences used for the dissipation rate (1: backward differences '
+                             'between samples, 2: second-order central differences, one-sided at the ends)')
+    arguments = parser.parse_args()
+
+    ref_solution = get_reference_solution(arguments.reference)
+    num_solution = get_numerical_solution(os.path.join('postProcessing', 'volIntK'), arguments.order)
+
+    print_error_norms(ref_solution, num_solution)
     plot_kinetic_energy(ref_solution, num_solution)
-    plot_dissipation_of_kinetic_energy(ref_solution, num_solution)  
+    plot_dissipation_of_kinetic_energy(ref_solution, num_solution)
 
 
 def plot_kinetic_energy(ref_solution, num_solution):
@@ -33,7 +45,7 @@ def plot_dissipation_of_kinetic_energy(ref_solution, num_solution):
     ax.plot(ref_solution[TIME][:], ref_solution[DISS][:])
 
     ax.legend(['OpenFOAM', 'spectral, 512^3'], loc='upper right')
-    ax.set(xlabel='time [s]', ylabel='E_kin')
+    ax.set(xlabel='time [s]', ylabel='-dE_kin/dt')
     ax.grid()
 
     fig.savefig('postProcessing/tgv_dissipation_of_e_kin_.png', dpi=600, facecolor='w', edgecolor='w',
@@ -42,69 +54,75 @@ def plot_dissipation_of_kinetic_energy(ref_solution, num_solution):
     plt.close('all')
 
 
-def get_reference_solution():
-    path_to_ref_soluition = os.path.join('postProcessing', 'taylor_green_vortex_512_ref.dat')
-    num_line_headers = get_number_of_lines_of_header(path_to_ref_soluition)
-    num_lines = get_number_of_lines_in_file(path_to_ref_soluition)
-
-    zero_vec = np.zeros(num_lines - num_line_headers)
-    ref_solution = np.array([zero_vec, zero_vec, zero_vec])
-
-    with open(path_to_ref_soluition, 'r') as tgv_ref:
-        counter = 0
-        for line in tgv_ref:
-            # ignore header
-            if counter >= num_line_headers:
-                data = line.strip().split()
-                ref_solution[TIME][counter - num_line_headers] = float(data[TIME])
-                ref_solution[EKIN][counter - num_line_headers] = float(data[EKIN])
-                ref_solution[DISS][counter - num_line_headers] = float(data[DISS])
-            counter += 1
+def print_error_norms(ref_solution, num_solution):
+    # the reference solution is interpolated onto the times of the numerical solution (within the time range of the
+    # reference). The L2 norms are relative to the L2 norm of the reference
+    in_range = (num_solution[TIME] >= ref_solution[TIME][0]) & (num_solution[TIME] <= ref_solution[TIME][-1])
+    if np.count_nonzero(in_range) == 0:
+        print('No overlap between the numerical and the reference solution, skipping error norms')
+        return
+    time = num_solution[TIME][in_range]
+
+    print('Error norms against the spectral reference solution (t = ' + format(time[0], 'g') + ' to ' +
+          format(time[-1], 'g') + ' s):')
+    for index, name in [(EKIN, 'E_kin'), (DISS, '-dE_kin/dt')]:
+        reference = np.interp(time, ref_solution[TIME], ref_solution[index])
+        error = np.sqrt(np.sum((num_solution[index][in_range] - reference)**2) / np.sum(reference**2))
+        print('    relative L2 error of ' + name.ljust(12) + ': ' + format(error, '.4e'))
+
+    # the time of peak dissipation is only compared if the peak of the reference was reached
+    ref_peak = np.argmax(ref_solution[DISS])
+    if time[-1] < ref_solution[TIME][ref_peak]:
+        print('    peak dissipation not reached yet (reference at t = ' + format(ref_solution[TIME][ref_peak], 'g') +
+              ' s)')
+        return
+    num_peak = np.argmax(np.where(in_range, num_solution[DISS], -np.inf))
+    print('    time of peak dissipation  : ' + format(num_solution[TIME][num_peak], 'g') + ' s (reference ' +
+          format(ref_solution[TIME][ref_peak], 'g') + ' s, error ' +
+          format(num_solution[TIME][num_peak] - ref_solution[TIME][ref_peak], '+.4e') + ' s)')
+    print('    peak dissipation          : ' + format(num_solution[DISS][num_peak], '.6e') + ' (reference ' +
+          format(ref_solution[DISS][ref_peak], '.6e') + ', relative error ' +
+          format((num_solution[DISS][num_peak] - ref_solution[DISS][ref_peak]) / ref_solution[DISS][ref_peak], '+.4e') +
+          ')')
+
+
+def get_reference_solution(path):
+    # the parsed reference solution is cached as a binary .npy file next to the .dat file, which is used as long as it
+    # is newer than the .dat file
+    cache = os.path.splitext(path)[0] + '.npy'
+    if os.path.isfile(cache) and os.path.getmtime(cache) >= os.path.getmtime(path):
+        return np.load(cache)
+
+    ref_solution = np.loadtxt(path, comments='#', usecols=(TIME, EKIN, DISS), ndmin=2).T
+    try:
+        np.save(cache, ref_solution)
+    except OSError:
+        # e.g. a shared reference in a read-only directory, which is then parsed each time
+        pass
     return ref_solution
 
 
-def get_numerical_solution():
-    path_to_numeric_soluition = os.path.join('postProcessing', 'volIntK', '0', 'volFieldValue.dat')
-    num_line_headers = get_number_of_lines_of_header(path_to_numeric_soluition)
-    num_lines = get_number_of_lines_in_file(path_to_numeric_soluition)
-
-    zero_vec = np.zeros(num_lines - num_line_headers)
-    numerical_solution = np.array([zero_vec, zero_vec, zero_vec])
-
-    with open(path_to_numeric_soluition, 'r') as tgv_ref:
-        counter = 0
-        for line in tgv_ref:
-            # ignore header
-            if counter >= num_line_headers:
-                data = line.strip().split()
-                numerical_solution[TIME][counter - num_line_headers] = float(data[TIME])
-                numerical_solution[EKIN][counter - num_line_headers] = float(data[EKIN])
-            counter += 1
-    
-    # calculate dissipation rate of kinetic energy
-    for i in range (1, num_lines - num_line_headers):
-        ek1 = numerical_solution[EKIN][i]
-        ek0 = numerical_solution[EKIN][i-1]
-        t1 = numerical_solution[TIME][i]
-        t0 = numerical_solution[TIME][i-1]
-        dekin = ek1 - ek0
-        dt = t1 - t0
-        numerical_solution[DISS][i] = - dekin / dt
-    numerical_solution[DISS][0] = numerical_solution[DISS][1]
-    return numerical_solution
-
-
-def get_number_of_lines_in_file(path):
-    return sum(1 for line in open(path, 'r'))
-
-
-def get_number_of_lines_of_header(path):
-    with open(path, 'r') as f:
-        counter = 0
-        for line in f:
-            if line.strip()[0] != "#":
-                return counter
-            counter += 1
+def get_numerical_solution(directory, order):
+    # the kinetic energy of all runs (postProcessing/volIntK/<startTime>/volFieldValue.dat) is combined into a single
+    # series, where the values of a restart replace those written after its start time by the previous run
+    start_times = sorted(os.listdir(directory), key=float)
+    segments = []
+    for index, start_time in enumerate(start_times):
+        segment = np.loadtxt(os.path.join(directory, start_time, 'volFieldValue.dat'), comments='#', usecols=(0, 1),
+                             ndmin=2)
+        if index + 1 < len(start_times):
+            segment = segment[segment[:, 0] < float(start_times[index + 1])]
+        segments.append(segment)
+    time, e_kin = np.concatenate(segments).T
+
+    # dissipation rate of kinetic energy
+    if order == 2:
+        dissipation = -np.gradient(e_kin, time, edge_order=2)
+    else:
+        dissipation = np.empty_like(e_kin)
+        dissipation[1:] = -np.diff(e_kin) / np.diff(time)
+        dissipation[0] = dissipation[1]
+    return np.array([time, e_kin, dissipation])
 
 
 if __name__ == '__main__':
@@ -33,12 +33,46 @@ class CaseProperties:
                 # files)
                 'polymesh_directory': os.path.join(''),
 
+                # directory of a shared mesh store. If specified (and mesh_treatment is POLY_MESH), the polyMesh is
+                # stored only once in this directory (identified by a hash of its content) and placed into the case
+                # according to mesh_placement, instead of copying it into every case. Leave empty to copy the polyMesh.
+                'mesh_store_directory': os.path.join(''),
+
+                # specify how the polyMesh is placed from the mesh store into the case directory
+                #   The following types are supported
+                #   HARD_LINK:      Hard link the mesh files (requires the store and the case to be on the same file
+                #                   system)
+                #   REFLINK:        Copy-on-write clone of the mesh files (requires file system support, e.g. btrfs, xfs)
+                #   SYMBOLIC_LINK:  Symbolic link to the mesh files in the store
+                #   COPY:           Copy the mesh files from the store
+                #   If the requested placement is not supported, the mesh files will be copied instead
+                'mesh_placement': Parameters.HARD_LINK,
+
+                # directory of a per-user cache of compiled dynamic code (e.g. '~/.cache/OpenFOAMCaseGenerator'). If
+                # specified, custom initial and inlet boundary conditions written in c++ (#codeStream) are compiled
+                # only once, using dynamic_code_compile_command, and the compiled libraries are placed into the
+                # dynamicCode directory of every case using the same code, so that OpenFOAM does not compile them
+                # again. Leave empty to let OpenFOAM compile the code in each case.
+                'dynamic_code_cache_directory': os.path.join(''),
+
+                # command used to compile a code stream into the cache. It is executed in a scratch case containing
+                # the code stream as the entry 'value' of system/codeDict and needs to leave the compiled library in the
+                # dynamicCode directory of the scratch case (requires a sourced OpenFOAM environment). The command is
+                # trusted local configuration, split into its arguments and executed without a shell
+                'dynamic_code_compile_command': 'foamDictionary -expand system/codeDict',
+
                 # path to where the currently generated case should be copied to (parent directory)
                 # if left empty, the case will be written into the current directory
                 'run_directory': os.path.join(''),
 
                 # version of openfoam to use (does not have an influence on the case setup, but will be used in headers)
                 'version': 'v2006',
+
+                # flag indicating if an existing case should be updated incrementally. If set to true, only files whose
+                # content has changed since the last generation of the case will be written (copied), files no longer
+                # part of the case will be removed and all other files are left untouched (can also be activated with
+                # the --incremental command line argument)
+                'incremental_generation': False,
             },
 
             # setting up simulation for parallel processing
@@ -47,8 +81,22 @@ class CaseProperties:
                 # decomposition will be written (and Allrun script modified, accordingly)
                 'run_in_parallel': True,
 
-                # number of processors that will be used to run case in parallel
+                # number of processors that will be used to run case in parallel. Use AUTO to determine the number of
+                # processors from the number of cells in the mesh (requires mesh_treatment to be either BLOCK_MESH_DICT
+                # or POLY_MESH) and the target number of cells per processor given below
                 'number_of_processors': 4,
+
+                # target number of cells per processor, used if number_of_processors is set to AUTO
+                'cells_per_processor': 50000,
+
+                # method used to decompose the domain
+                #   The following types are supported
+                #   AUTO:           Use HIERARCHICAL if the mesh is a structured box, SCOTCH otherwise
+                #   SCOTCH:         Graph based decomposition minimising the number of processor boundaries
+                #   HIERARCHICAL:   Geometric decomposition into n (x y z) subdomains, which are derived from the number
+                #                   of cells (or the bounding box) of the mesh in each direction
+                #   SIMPLE:         Same as HIERARCHICAL, using the simple decomposition method
+                'decomposition_method': Parameters.SCOTCH,
             },
 
             # properties imposed at boundaries / freestream
@@ -88,12 +136,25 @@ class CaseProperties:
 
                 # if custom inlet boundary conditions should be used, this dictionary provides a mapping where the key
                 # is used to identify for which variable custom inlet boundary conditions should be written. The value
-                # is a path to the c++ script which should be used as the custom inlet boundary condition
+                # is a path to the c++ script which should be used as the custom inlet boundary condition. Alternatively,
+                # the path may point to a python script (.py) providing a function inlet_profile(x, y, z), or to
+                # tabulated data (.csv or .dat) with the columns x, y, z followed by the value(s) of the variable. These
+                # are evaluated by the case generator, so no code needs to be compiled by OpenFOAM
                 'custom_inlet_boundary_conditions_setup': {
                     'p': os.path.join('examples', 'scripts', 'boundaryConditions', 'generic', 'scalarField'),
                     'U': os.path.join('examples', 'scripts', 'boundaryConditions', 'generic', 'vectorField'),
                 },
 
+                # specify how inlet profiles given as a python script are written (tabulated data is always written as
+                # boundary data)
+                #   NON_UNIFORM_FIXED_VALUE: Evaluate the profile at the inlet face centres and write it as a nonuniform
+                #                            fixedValue condition (requires a complete polyMesh)
+                #   TIME_VARYING_MAPPED:     Write the profile to constant/boundaryData and use the
+                #                            timeVaryingMappedFixedValue condition. Required for time-dependent
+                #                            profiles, i.e. scripts defining a list of times and a function
+                #                            inlet_profile(x, y, z, t)
+                'custom_inlet_profile_type': Parameters.TIME_VARYING_MAPPED,
+
                 # start DFSEM Inlet only section -----------------------------------------------------------------------
                 # the below options are for the special DFSEM Inlet only. Use with caution. Before using, see remarks at
                 # https://www.cfd-online.com/Forums/openfoam-solving/177711-turbulentdfseminlet.html
@@ -138,7 +199,11 @@ class CaseProperties:
 
                 # if custom initial conditions should be used, this dictionary provides a mapping where the key is
                 # used to identify for which variable custom initial conditions should be written. The value is a
-                # path to the c++ script which should be used as the custom initial condition
+                # path to the c++ script which should be used as the custom initial condition. Alternatively, a python
+                # script (ending in .py) may be given, providing a vectorised function initial_condition(x, y, z) of the
+                # cell centre coordinates. It is evaluated by the case generator and written as a non-uniform field, so
+                # that no code needs to be compiled by OpenFOAM (requires mesh_treatment to be either BLOCK_MESH_DICT or
+                # POLY_MESH, where the polyMesh needs to contain the faces file)
                 'custom_initial_conditions_setup': {
                     'p': os.path.join('examples', 'scripts', 'initialConditions', 'taylorGreenVortex', 'incompressible',
                                       'p'),
@@ -146,6 +211,11 @@ class CaseProperties:
                                       'U'),
                 },
 
+                # file format of custom initial conditions evaluated in python
+                #   ASCII:  Write the non-uniform field in ascii format
+                #   BINARY: Write the non-uniform field in binary format (faster to read and write for large meshes)
+                'custom_initial_conditions_format': Parameters.ASCII,
+
                 # specify how the initial field should be set for non-custom initial conditions
                 #   BOUNDARY_CONDITIONED_BASED: set the initial field based on inlet conditions (where applicable)
                 #   ZERO_VELOCITY:              set the initial field to a zero velocity field
@@ -294,6 +364,42 @@ class CaseProperties:
                 },
             },
 
+            # format and handling of the fields written into the time directories during the run
+            'io_properties': {
+                # format in which the fields are written
+                #   ASCII:  human readable, about three times larger than binary and considerably slower to write and
+                #           read back (e.g. by decomposePar, reconstructPar or paraview)
+                #   BINARY: binary representation of the values, recommended for large meshes
+                'write_format': Parameters.ASCII,
+
+                # flag indicating if fields written in ascii should be compressed with gzip (ignored for binary fields)
+                'write_compression': False,
+
+                # number of significant digits of the values written in ascii
+                'write_precision': 6,
+
+                # number of significant digits of the time directory names (increase if the time steps are small
+                # compared to the simulated time, otherwise subsequent writes may map to the same directory)
+                'time_precision': 6,
+
+                # file handler used to write the fields of parallel runs
+                #   UNCOLLATED:        each processor writes its own files into the processorN directories
+                #   COLLATED:          the data of all processors is collected and written into a single file per
+                #                      field within the processorsN directory, reducing the number of files
+                #   MASTER_UNCOLLATED: the master collects and writes the files of all processorN directories
+                'file_handler': Parameters.UNCOLLATED,
+
+                # processors which collect and write the data of all processors up to the next io rank when using the
+                # COLLATED file handler, e.g. the first processor of each node for multi-node runs ([0, 32, 64]). Leave
+                # empty to write all data through the master
+                'io_ranks': [],
+
+                # disk quota in GB. The disk space used by the time directories written during the run is estimated
+                # from the number of cells, the written fields and the write settings, and a warning is shown if it
+                # exceeds the quota. Use 0 to disable the check
+                'disk_quota': 0,
+            },
+
             'numerical_discretisation': {
                 # time integration scheme, options are listed below
                 #   STEADY_STATE: Do not integrate in time, i.e. dU / dt = 0
@@ -521,6 +627,11 @@ class CaseProperties:
                 # be written according to the settings in the controlDict (i.e. every time a new time directory is
                 # generated)
                 'output_probe_at_every_timestep': True,
+
+                # pack the probes into memory-mapped arrays (postProcessing/packed/point_probes) after the solver
+                # finished (Allrun, see postProcessing/packProbes.py) and optionally delete the packed files
+                'pack_output': False,
+                'delete_packed_output': False,
             },
 
             # specify 1-D line probes
@@ -529,7 +640,9 @@ class CaseProperties:
                 # rest of this dictionary.
                 'write_line_probes': False,
 
-                # specify the start and end point where line should be placed, can be more than 1
+                # specify the start and end point where line should be placed, can be more than 1. Optionally, the
+                # number of time steps between two outputs of a line can be given as 'write_interval' (used if the
+                # lines are grouped BY_FREQUENCY or ONE_PER_LOCATION, see below)
                 'location': [
                     {
                         'name': 'x=2',
@@ -553,6 +666,25 @@ class CaseProperties:
                 # be written according to the settings in the controlDict (i.e. every time a new time directory is
                 # generated)
                 'output_probe_at_every_timestep': False,
+
+                # specify how the lines are grouped into sampling function objects
+                #   ONE_PER_LOCATION:    one function object per line, named after the line, so the output of each
+                #                        line is written into its own directory, postProcessing/<name>/<time>/
+                #   ONE_FUNCTION_OBJECT: all lines are sampled by a single function object (lineProbes), which shares
+                #                        the interpolation, field lookup and output between all lines (recommended for
+                #                        many lines), all lines are written into postProcessing/lineProbes/<time>/
+                #   BY_FREQUENCY:        one function object per output frequency of the lines (write_interval), named
+                #                        lineProbes for lines without write_interval and lineProbes_interval_N otherwise
+                #   The output files of each line are named after the line in all cases, i.e.
+                #   postProcessing/<function object>/<time>/<name>_<fields>.xy
+                'grouping': Parameters.ONE_PER_LOCATION,
+
+                # pack the output of the lines (one file per line and write time, see output_probe_at_every_timestep)
+                # into memory-mapped arrays of the shape (time, line, sample, component) after the solver finished
+                # (Allrun, see postProcessing/packProbes.py), written into postProcessing/packed/<function object>.
+                # If delete_packed_output is set to true, the packed files are deleted
+                'pack_output': False,
+                'delete_packed_output': False,
             },
 
             # specify 2-D cutting planes
@@ -587,6 +719,14 @@ class CaseProperties:
                 # only be written according to the settings in the controlDict (i.e. every time a new time directory is
                 # generated)
                 'output_cutting_plane_at_every_timestep': False,
+
+                # flag indicating if all cutting planes and iso-surfaces (see below) with the same write schedule should
+                # be sampled by a shared surfaces function object (named surfaces, or surfaces_interval_1 for those
+                # written at every time step), so that the interpolation is only set up once per time step. The
+                # surfaces are written into postProcessing/<function object>/<time>/<name>.vtp and all fields requested
+                # for any of the grouped surfaces are written on each of them. If set to false, each plane and
+                # iso-surface is sampled by its own function object, named after the plane or iso-surface
+                'group_surfaces': False,
             },
 
             # write iso surfaces of variables during calculation
@@ -611,6 +751,35 @@ class CaseProperties:
                 'output_iso_surfaces_at_every_timestep': False,
             },
 
+            # scheduling of the function objects written above (user-defined function objects are not affected). Each
+            # function object is written with its own default schedule, e.g. the force coefficients and residuals at
+            # every time step, probes and surfaces as specified in their dictionaries and yPlus, the Mach number, the
+            # pressure coefficient and the additional fields at every write time. Function objects are only executed
+            # when they write, and additional fields (as well as yPlus, Ma and cp) whenever they are written or sampled
+            # by probes or surfaces, unless an execute control is specified. Controls are given as a dictionary with the
+            # (optional) keys:
+            #   execute_control:  when the function object is executed (TIME_STEP, RUN_TIME, ADJUSTABLE_RUN_TIME,
+            #                     CPU_TIME, CLOCK_TIME or WRITE_TIME)
+            #   execute_interval: number of time steps (TIME_STEP) or time (otherwise) between executions
+            #   write_control:    when the function object writes its output (same options as execute_control)
+            #   write_interval:   number of time steps (TIME_STEP) or time (otherwise) between writes
+            #   time_start:       time from which on the function object is executed (e.g. after the initial transient)
+            #   time_end:         time after which the function object is no longer executed
+            'function_object_controls': {
+                # controls applied to all function objects
+                'default': {
+                },
+
+                # controls of individual function objects, overwriting the default controls. The key is the name of the
+                # function object, i.e. Q, Lambda2, vorticity, enstrophy, forceCoeffs, pressureCoefficient, yPlus,
+                # MachNo, residuals, point_probes, the line probes (lineProbes or see grouping), the cutting planes and
+                # iso-surfaces (their name, e.g. isoSurface_Q, or surfaces if grouped), for example
+                # 'Q': {'time_start': 10} or
+                # 'forceCoeffs': {'write_control': Parameters.TIME_STEP, 'write_interval': 10}
+                'function_objects': {
+                },
+            },
+
             # user-defined function objects that will get executed after all other function objects have run
             'post_processing': {
                 # execute user-defined function object?
@@ -648,6 +817,13 @@ class CaseProperties:
         self.properties = self.__handle_command_line_arguments(command_line_arguments, self.properties)
         return self.properties
 
+    def get_case_properties_from_dictionary(self, properties):
+        # use an externally constructed properties dictionary (e.g. a single case of a parameter sweep) and
+        # (re-)calculate all properties that are derived from the user input
+        self.properties = properties
+        self.__add_default_properties()
+        return self.properties
+
     def __handle_command_line_arguments(self, command_line_arguments, properties):
         # process properties dictionary (read and write if necessary)
         if command_line_arguments.option_exists('input'):
@@ -660,6 +836,9 @@ class CaseProperties:
             with open(command_line_arguments['write-json-only'], 'w') as json_file:
                 json.dump(self.properties, json_file, indent=4)
             exit(0)
+
+        if command_line_arguments.option_exists('incremental'):
+            properties['file_properties']['incremental_generation'] = True
         return properties
 
     def __add_default_properties(self):
@@ -9,6 +9,18 @@ BLOCK_MESH_DICT = 1
 BLOCK_MESH_AND_SNAPPY_HEX_MESH_DICT = 2
 POLY_MESH = 3
 
+# placement of a polyMesh from the shared mesh store
+HARD_LINK = 0
+REFLINK = 1
+SYMBOLIC_LINK = 2
+COPY = 3
+
+# domain decomposition (AUTO may also be used for the number of processors)
+AUTO = -2
+SCOTCH = 0
+HIERARCHICAL = 1
+SIMPLE = 2
+
 # boundary condition ID
 INLET = 0
 DFSEM_INLET = 1
@@ -78,6 +90,9 @@ ADJUSTABLE_RUN_TIME = 2
 CPU_TIME = 3
 CLOCK_TIME = 4
 
+# additional write and execute control of function objects (at every write time of the fields)
+WRITE_TIME = 5
+
 # numerical schemes
 STEADY_STATE = 0
 UNSTEADY = 1
@@ -156,6 +171,24 @@ VORTICITY = 1
 LAMBDA_2 = 2
 ENSTROPHY = 3
 
+# file format of non-uniform fields
+ASCII = 0
+BINARY = 1
+
+# file handler used to write the fields of parallel runs
+UNCOLLATED = 0
+COLLATED = 1
+MASTER_UNCOLLATED = 2
+
+# grouping of sampled locations into function objects
+ONE_FUNCTION_OBJECT = 0
+BY_FREQUENCY = 1
+ONE_PER_LOCATION = 2
+
+# custom inlet profile type
+NON_UNIFORM_FIXED_VALUE = 0
+TIME_VARYING_MAPPED = 1
+
 # initial conditions
 BOUNDARY_CONDITIONED_BASED = 0
 ZERO_VELOCITY = 1
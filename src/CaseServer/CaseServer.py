@@ -0,0 +1,355 @@
+import os
+import copy
+import json
+import time
+import uuid
+import shutil
+import signal
+import socket
+import ipaddress
+import tempfile
+import threading
+import collections
+import socketserver
+import concurrent.futures
+import input.CaseProperties as CaseProperties
+import src.Checker as Checker
+from src.FileDirectoryIO.FileManager import FileManager
+from src.FileDirectoryIO.OutputBackend import ArchiveBackend
+from src.FileDirectoryIO.PolyMeshReader import PolyMeshReader
+
+# number of the most recent requests used for the latency statistics
+LATENCY_WINDOW = 1000
+
+# settings naming commands executed on the host or files and directories of the host that are read, executed or copied
+# into the case. They are taken from the configuration of the server (input/CaseProperties.py) only, requests which set
+# them to other values are rejected
+SERVER_SETTINGS = {
+    'file_properties': ['blockmeshdict_directory', 'snappyhexmeshdict_directory', 'polymesh_directory',
+                        'mesh_store_directory', 'dynamic_code_cache_directory', 'dynamic_code_compile_command'],
+    'boundary_properties': ['custom_inlet_boundary_conditions_setup', 'custom_DFSEM_conditions_setup'],
+    'flow_properties': ['custom_initial_conditions_setup'],
+    'post_processing': ['function_objects', 'python_script'],
+}
+
+
+class CaseServer:
+    # long-running case generator, serving requests over a unix domain socket or a local TCP socket. Each connection
+    # sends one request per line as a json object and receives one json response per line. Requests are:
+    #
+    #   {"properties": {...}, "output": "path"}         generate the case on disk and return its path
+    #   {"properties": {...}, "output": "archive",      generate the case as a tar archive, the response contains the
+    #    "compression": null | "gz" | "zst"}            size of the archive, which follows the response line directly
+    #   {"command": "stats"}                            request latencies, cache statistics and state of the workers
+    #
+    # The properties are the same as written with the --output option (if omitted, the properties of
+    # input/CaseProperties.py are used), "run_directory" and "case_name" may be given to override those of the
+    # properties. Each case is checked and generated in one process of a bounded pool of workers, which stay alive
+    # between requests, so the imports, the default properties, the mesh summaries and the rendered file headers are
+    # only processed once per worker rather than once per request.
+    #
+    # The server has no authentication and must not be exposed to untrusted clients. Requests cannot change the
+    # settings in SERVER_SETTINGS (mesh, script and cache locations and the compile command), these are taken from
+    # input/CaseProperties.py of the server. The run directory of a request is relative to the run directory of the
+    # server and cases cannot be written outside of it. TCP sockets only listen on loopback addresses unless
+    # allow_remote is set (--allow-remote).
+    def __init__(self, address, number_of_workers=None, generate_case=None, allow_remote=False):
+        # address is either unix:path/to/socket, tcp:port or tcp:host:port (host defaults to localhost)
+        self.address = address
+        self.number_of_workers = max(1, number_of_workers if number_of_workers is not None else os.cpu_count())
+        self.generate_case = generate_case
+        self.allow_remote = allow_remote
+
+        self.__lock = threading.Lock()
+        self.__start_time = time.time()
+        self.__requests = 0
+        self.__failed_requests = 0
+        self.__active_requests = 0
+        self.__latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.__worker_statistics = {}
+        self.__archive_directory = None
+
+    def serve(self):
+        self.__archive_directory = tempfile.mkdtemp(prefix='case-server-')
+        # the workers are stopped by the server, so they ignore interrupts sent to all processes (e.g. by Ctrl+C)
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.number_of_workers,
+                                                          initializer=signal.signal,
+                                                          initargs=(signal.SIGINT, signal.SIG_IGN))
+        server = None
+        try:
+            # start all workers (and import the writers within them) before any request is accepted
+            for future in [executor.submit(_warm_up) for _ in range(self.number_of_workers)]:
+                self.__update_worker_statistics(future.result())
+
+            # stop the server in the same way when it is terminated (e.g. by a service manager)
+            signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+            server = self.__create_server(executor)
+            print('Serving case generation requests on ' + self.address + ' using ' + str(self.number_of_workers) +
+                  ' processes (stop with Ctrl+C)')
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print('\nStopped serving case generation requests')
+        finally:
+            if server is not None:
+                server.server_close()
+                if server.address_family == socket.AF_UNIX and os.path.exists(server.server_address):
+                    os.remove(server.server_address)
+            executor.shutdown(wait=True, cancel_futures=True)
+            shutil.rmtree(self.__archive_directory, ignore_errors=True)
+
+    def handle_request(self, executor, request):
+        # returns the response and, for archives, the path of the archive which is sent after the response
+        start = time.perf_counter()
+        with self.__lock:
+            self.__active_requests += 1
+        try:
+            if request.get('command', 'generate') == 'stats':
+                return self.get_statistics(), None
+            elif request.get('command', 'generate') != 'generate':
+                raise Exception('Unknown command ' + str(request['command']) + ', use either generate or stats')
+
+            path_to_archive = None
+            if request.get('output', 'path') == 'archive':
+                path_to_archive = os.path.join(self.__archive_directory, uuid.uuid4().hex + '.tar')
+            elif request.get('output', 'path') != 'path':
+                raise Exception('Unknown output ' + str(request['output']) + ', use either path or archive')
+            if request.get('compression') not in [None, 'gz', 'zst']:
+                raise Exception('Unknown compression ' + str(request['compression']) + ', use either null, gz or zst')
+
+            result = executor.submit(_generate_case, self.generate_case, request, path_to_archive).result()
+            self.__update_worker_statistics(result.pop('worker'))
+            if result['status'] != 'ok':
+                path_to_archive = None
+            return result, path_to_archive
+        except Exception as error:
+            return {'status': 'error', 'message': type(error).__name__ + ': ' + str(error)}, None
+        finally:
+            latency = time.perf_counter() - start
+            with self.__lock:
+                self.__active_requests -= 1
+                if request.get('command', 'generate') == 'generate':
+                    self.__requests += 1
+                    self.__latencies.append(latency)
+
+    def count_failed_request(self):
+        with self.__lock:
+            self.__failed_requests += 1
+
+    def get_statistics(self):
+        with self.__lock:
+            latencies = sorted(self.__latencies)
+            statistics = {
+                'status': 'ok',
+                'uptime': time.time() - self.__start_time,
+                'requests': self.__requests,
+                'failed_requests': self.__failed_requests,
+                'active_requests': self.__active_requests,
+                'workers': self.number_of_workers,
+                'latency': {},
+                'caches': {},
+            }
+            if len(latencies) > 0:
+                statistics['latency'] = {
+                    'window': len(latencies),
+                    'mean': sum(latencies) / len(latencies),
+                    'min': latencies[0],
+                    'median': latencies[len(latencies) // 2],
+                    'p95': latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+                    'max': latencies[-1],
+                }
+            # cache statistics are summed over all workers, using the latest statistics reported by each of them
+            for worker in self.__worker_statistics.values():
+                for cache, counters in worker.items():
+                    total = statistics['caches'].setdefault(cache, {})
+                    for counter, value in counters.items():
+                        total[counter] = total.get(counter, 0) + value
+            return statistics
+
+    @staticmethod
+    def send_request(address, request, archive_file=None):
+        # sends a single request to a running case server and returns its response. If an archive is requested, it is
+        # written into archive_file (a binary file object)
+        with CaseServer.__connect(address) as connection, connection.makefile('rwb') as stream:
+            stream.write(json.dumps(request).encode('utf-8') + b'\n')
+            stream.flush()
+            response = json.loads(stream.readline())
+            remaining = response.get('archive_size', 0)
+            while remaining > 0:
+                chunk = stream.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    raise Exception('Connection to the case server closed before the archive was received')
+                if archive_file is not None:
+                    archive_file.write(chunk)
+                remaining -= len(chunk)
+            return response
+
+    def __update_worker_statistics(self, worker):
+        with self.__lock:
+            self.__worker_statistics[worker['pid']] = worker['caches']
+
+    def __create_server(self, executor):
+        case_server = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if line.strip() == b'':
+                        continue
+                    try:
+                        request = json.loads(line)
+                        if not isinstance(request, dict):
+                            raise ValueError('request must be a json object')
+                    except ValueError as error:
+                        case_server.count_failed_request()
+                        self.__send({'status': 'error', 'message': 'Invalid request: ' + str(error)})
+                        continue
+
+                    response, path_to_archive = case_server.handle_request(executor, request)
+                    if response['status'] != 'ok':
+                        case_server.count_failed_request()
+                    if path_to_archive is None:
+                        self.__send(response)
+                        continue
+                    try:
+                        response['archive_size'] = os.path.getsize(path_to_archive)
+                        self.__send(response)
+                        with open(path_to_archive, 'rb') as archive:
+                            self.connection.sendfile(archive)
+                    finally:
+                        os.remove(path_to_archive)
+
+            def __send(self, response):
+                self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+                self.wfile.flush()
+
+        kind, _, location = self.address.partition(':')
+        if kind == 'unix':
+            if os.path.exists(location):
+                os.remove(location)
+            server = socketserver.ThreadingUnixStreamServer(location, RequestHandler)
+        elif kind == 'tcp':
+            host, port = CaseServer.__get_tcp_address(location)
+            if not self.allow_remote and not CaseServer.__is_loopback(host):
+                raise Exception('Refusing to serve on ' + host + ', which is not a loopback address. The case server '
+                                'has no authentication and must not be exposed, use --allow-remote to listen on it '
+                                'anyway')
+            socketserver.ThreadingTCPServer.allow_reuse_address = True
+            server = socketserver.ThreadingTCPServer((host, port), RequestHandler)
+        else:
+            raise Exception('Unknown server address ' + self.address + ', use either unix:path or tcp:[host:]port')
+        server.daemon_threads = True
+        return server
+
+    @staticmethod
+    def __connect(address):
+        kind, _, location = address.partition(':')
+        if kind == 'unix':
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(location)
+            return connection
+        return socket.create_connection(CaseServer.__get_tcp_address(location))
+
+    @staticmethod
+    def __get_tcp_address(location):
+        host, _, port = location.rpartition(':')
+        return host if host != '' else 'localhost', int(port)
+
+    @staticmethod
+    def __is_loopback(host):
+        # true if all addresses the host name resolves to are loopback addresses (e.g. localhost, 127.0.0.1 or ::1)
+        addresses = [address[4][0].split('%')[0] for address in socket.getaddrinfo(host, None)]
+        return len(addresses) > 0 and all(ipaddress.ip_address(address).is_loopback for address in addresses)
+
+
+# state kept by each worker process between requests
+_default_properties = None
+_default_properties_statistics = {'hits': 0, 'misses': 0}
+
+
+def _warm_up():
+    import src.WriteSystemDirectoryFiles
+    import src.WriteConstantDirectoryFiles
+    import src.WriteZeroDirectoryFiles
+    _get_default_properties()
+    return _get_worker_statistics()
+
+
+def _generate_case(generate_case, request, path_to_archive):
+    start = time.perf_counter()
+    result = {'status': 'ok'}
+    try:
+        properties = request.get('properties')
+        properties = copy.deepcopy(properties if properties is not None else _get_default_properties())
+        for key in ['run_directory', 'case_name']:
+            if key in request:
+                properties['file_properties'][key] = request[key]
+        _apply_server_settings(properties)
+        properties = CaseProperties.CaseProperties().get_case_properties_from_dictionary(properties)
+        result['case_name'] = properties['file_properties']['case_name']
+
+        check_case = Checker.CheckCase(properties)
+        check_case.run_all_checks()
+
+        if path_to_archive is None:
+            generate_case(properties)
+            result['path'] = os.path.abspath(properties['file_properties']['path'])
+        else:
+            backend = ArchiveBackend(path_to_archive, properties['file_properties']['case_name'],
+                                     request.get('compression'))
+            generate_case(properties, backend=backend)
+    except SystemExit as error:
+        result = {'status': 'error', 'message': str(error.code)}
+    except Exception as error:
+        result = {'status': 'error', 'message': type(error).__name__ + ': ' + str(error)}
+    if result['status'] != 'ok' and path_to_archive is not None and os.path.exists(path_to_archive):
+        os.remove(path_to_archive)
+    result['generation_time'] = time.perf_counter() - start
+    result['worker'] = _get_worker_statistics()
+    return result
+
+
+def _apply_server_settings(properties):
+    # takes the settings which are not accepted from requests from the configuration of the server and confines the
+    # case to the run directory of the server
+    default_properties = _get_default_properties()
+    for section, keys in SERVER_SETTINGS.items():
+        for key in keys:
+            value = properties[section].setdefault(key, copy.deepcopy(default_properties[section][key]))
+            if value != default_properties[section][key]:
+                raise Exception('The case server does not accept ' + section + '.' + key + ' from requests, it is '
+                                'taken from the configuration of the server (input/CaseProperties.py)')
+
+    file_properties = properties['file_properties']
+    case_name = str(file_properties['case_name'])
+    if case_name in ['', '.', '..'] or os.path.basename(case_name) != case_name or \
+            (os.path.altsep is not None and os.path.altsep in case_name):
+        raise Exception('Invalid case name ' + case_name + ', it must be a single directory name')
+    server_run_directory = os.path.realpath(default_properties['file_properties']['run_directory'])
+    run_directory = os.path.realpath(os.path.join(server_run_directory, str(file_properties['run_directory'])))
+    if os.path.commonpath([server_run_directory, run_directory]) != server_run_directory:
+        raise Exception('Invalid run directory ' + str(file_properties['run_directory']) + ', it must be within the '
+                        'run directory of the server (' + server_run_directory + ')')
+    file_properties['run_directory'] = run_directory
+
+
+def _get_default_properties():
+    global _default_properties
+    if _default_properties is None:
+        _default_properties_statistics['misses'] += 1
+        _default_properties = CaseProperties.CaseProperties().properties
+    else:
+        _default_properties_statistics['hits'] += 1
+    return _default_properties
+
+
+def _get_worker_statistics():
+    header_cache = FileManager.render_header.cache_info()
+    return {
+        'pid': os.getpid(),
+        'caches': {
+            'default_properties': dict(_default_properties_statistics),
+            'mesh_summary': PolyMeshReader.get_summary_statistics(),
+            'file_header': {'hits': header_cache.hits, 'misses': header_cache.misses},
+        },
+    }
@@ -0,0 +1 @@
+from .CaseServer import CaseServer
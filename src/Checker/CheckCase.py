@@ -1,3 +1,4 @@
+import os
 import sys
 import warnings
 from input import GlobalVariables as Parameters
@@ -15,6 +16,13 @@ class CheckCase:
         self.check_appropriate_pressure_solver()
         self.check_correct_incompressible_solver_setup()
         self.check_correct_compressible_solver_setup()
+        self.check_correct_decomposition_setup()
+        self.check_correct_python_initial_conditions_setup()
+        self.check_correct_inlet_profile_setup()
+        self.check_correct_field_setup()
+        self.check_correct_io_setup()
+        self.check_correct_line_probe_setup()
+        self.check_correct_function_object_controls_setup()
 
     def check_correct_turbulence_model_setup(self):
         if (self.properties['turbulence_properties']['RANS_model'] == Parameters.kOmegaSSTLM or
@@ -132,3 +140,184 @@ class CheckCase:
                 'know what you are doing and are sure your setup is correct.\n' +
                 '\n================================== END WARNING ==================================\n',
                 UserWarning, '', 0)
+
+    def check_correct_decomposition_setup(self):
+        if not self.properties['parallel_properties']['run_in_parallel']:
+            return
+        number_of_processors = self.properties['parallel_properties']['number_of_processors']
+        method = self.properties['parallel_properties'].get('decomposition_method', Parameters.SCOTCH)
+        mesh_treatment = self.properties['file_properties']['mesh_treatment']
+        if (number_of_processors == Parameters.AUTO or method != Parameters.SCOTCH) and \
+                mesh_treatment == Parameters.NO_MESH:
+            sys.exit('\n===================================== ERROR =====================================\n' +
+                     '\nThe number of processors or the decomposition method is set to be determined from\n' +
+                     'the mesh, but no mesh is specified. Either specify a mesh (blockMeshDict or\n' +
+                     'polyMesh) or set the number of processors and use the SCOTCH decomposition method.\n' +
+                     '\n=================================== END ERROR ===================================\n')
+
+        if number_of_processors == Parameters.AUTO and \
+                mesh_treatment == Parameters.BLOCK_MESH_AND_SNAPPY_HEX_MESH_DICT:
+            warnings.showwarning(
+                '\n==================================== WARNING ====================================\n' +
+                '\nThe number of processors is determined from the number of cells of the background\n' +
+                'mesh in the blockMeshDict. The final mesh produced by snappyHexMesh will typically\n' +
+                'contain more cells, consider setting the number of processors explicitly.\n' +
+                '\n================================== END WARNING ==================================\n',
+                UserWarning, '', 0)
+
+    def check_correct_python_initial_conditions_setup(self):
+        flow_properties = self.properties['flow_properties']
+        if not flow_properties['custom_initial_conditions']:
+            return
+        if not any(path.endswith('.py') for path in flow_properties['custom_initial_conditions_setup'].values()):
+            return
+
+        mesh_treatment = self.properties['file_properties']['mesh_treatment']
+        if mesh_treatment == Parameters.POLY_MESH:
+            mesh_directory = os.path.join(self.properties['file_properties']['polymesh_directory'], 'polyMesh')
+            if not (os.path.isfile(os.path.join(mesh_directory, 'faces')) or
+                    os.path.isfile(os.path.join(mesh_directory, 'faces.gz'))):
+                sys.exit('\n===================================== ERROR =====================================\n' +
+                         '\nCustom initial conditions written in python are evaluated at the cell centres of\n' +
+                         'the mesh, which requires the faces file in the polyMesh directory. Ensure that the\n' +
+                         'polyMesh is complete or use initial conditions written in c++ instead.\n' +
+                         '\n=================================== END ERROR ===================================\n')
+        elif mesh_treatment != Parameters.BLOCK_MESH_DICT:
+            sys.exit('\n===================================== ERROR =====================================\n' +
+                     '\nCustom initial conditions written in python are evaluated at the cell centres of\n' +
+                     'the mesh, which is only known before running the case if the mesh is given either\n' +
+                     'as a blockMeshDict or a polyMesh. Use initial conditions written in c++ instead.\n' +
+                     '\n=================================== END ERROR ===================================\n')
+
+    def check_correct_inlet_profile_setup(self):
+        boundary_properties = self.properties['boundary_properties']
+        if not boundary_properties['custom_inlet_boundary_conditions']:
+            return
+        paths = boundary_properties['custom_inlet_boundary_conditions_setup'].values()
+        if not any(os.path.splitext(path)[1] in ['.py', '.csv', '.dat'] for path in paths):
+            return
+
+        mesh_treatment = self.properties['file_properties']['mesh_treatment']
+        profile_type = boundary_properties.get('custom_inlet_profile_type', Parameters.TIME_VARYING_MAPPED)
+        if profile_type == Parameters.NON_UNIFORM_FIXED_VALUE and any(path.endswith('.py') for path in paths):
+            mesh_directory = os.path.join(self.properties['file_properties']['polymesh_directory'], 'polyMesh')
+            if mesh_treatment != Parameters.POLY_MESH or not (
+                    os.path.isfile(os.path.join(mesh_directory, 'faces')) or
+                    os.path.isfile(os.path.join(mesh_directory, 'faces.gz'))):
+                sys.exit('\n===================================== ERROR =====================================\n' +
+                         '\nInlet profiles written as a nonuniform fixedValue condition are evaluated at the\n' +
+                         'inlet face centres in the order of the faces of the mesh, which requires a complete\n' +
+                         'polyMesh (including the faces file). Use the TIME_VARYING_MAPPED profile type\n' +
+                         'instead.\n' +
+                         '\n=================================== END ERROR ===================================\n')
+        elif mesh_treatment != Parameters.POLY_MESH and mesh_treatment != Parameters.BLOCK_MESH_DICT and any(
+                path.endswith('.py') for path in paths):
+            sys.exit('\n===================================== ERROR =====================================\n' +
+                     '\nInlet profiles written in python are evaluated at the inlet face centres, which are\n' +
+                     'only known before running the case if the mesh is given either as a blockMeshDict\n' +
+                     'or a polyMesh. Use tabulated data or inlet profiles written in c++ instead.\n' +
+                     '\n=================================== END ERROR ===================================\n')
+
+    def check_correct_field_setup(self):
+        from src.WriteZeroDirectoryFiles.FieldDependencies import FieldDependencies
+        field_dependencies = FieldDependencies(self.properties)
+        if not field_dependencies.is_turbulence_model_known():
+            warnings.showwarning(
+                '\n==================================== WARNING ====================================\n' +
+                '\nThe fields required by the selected turbulence model are not known, all boundary\n' +
+                'condition files are written into the 0/ directory instead.\n' +
+                '\n================================== END WARNING ==================================\n',
+                UserWarning, '', 0)
+            return
+
+        # custom initial conditions and inlet profiles are only written for the fields required by the current set-up
+        required_fields = field_dependencies.get_required_fields()
+        flow_properties = self.properties['flow_properties']
+        boundary_properties = self.properties['boundary_properties']
+        custom_fields = []
+        if flow_properties['custom_initial_conditions']:
+            custom_fields.extend(flow_properties['custom_initial_conditions_setup'].keys())
+        if boundary_properties['custom_inlet_boundary_conditions']:
+            custom_fields.extend(boundary_properties['custom_inlet_boundary_conditions_setup'].keys())
+        ignored_fields = sorted(set(field for field in custom_fields if field not in required_fields))
+        if len(ignored_fields) > 0:
+            warnings.showwarning(
+                '\n==================================== WARNING ====================================\n' +
+                '\nCustom initial or inlet conditions are set for ' + ', '.join(ignored_fields) + ', which are\n' +
+                'not used by the selected flow type and turbulence model and are therefore ignored.\n' +
+                'Only the fields ' + ', '.join(required_fields) + ' are written.\n' +
+                '\n================================== END WARNING ==================================\n',
+                UserWarning, '', 0)
+
+    def check_correct_io_setup(self):
+        io_properties = self.properties.get('io_properties', {})
+        if (len(io_properties.get('io_ranks', [])) > 0 and
+                io_properties.get('file_handler', Parameters.UNCOLLATED) != Parameters.COLLATED):
+            warnings.showwarning(
+                '\n==================================== WARNING ====================================\n' +
+                '\nIO ranks are only used by the COLLATED file handler and will be ignored. Either\n' +
+                'select the COLLATED file handler or remove the io_ranks.\n' +
+                '\n================================== END WARNING ==================================\n',
+                UserWarning, '', 0)
+
+        if io_properties.get('disk_quota', 0) <= 0:
+            return
+        from src.FileDirectoryIO.DiskFootprint import DiskFootprint
+        estimate = DiskFootprint(self.properties).get_estimate()
+        if estimate is not None and estimate['total_bytes'] > io_properties['disk_quota'] * 1e9:
+            warnings.showwarning(
+                '\n==================================== WARNING ====================================\n' +
+                '\nThe time directories written during the run are estimated to use ' +
+                str(round(estimate['total_bytes'] / 1e9, 1)) + ' GB,\n' +
+                'which exceeds the disk quota of ' + str(io_properties['disk_quota']) + ' GB. Consider writing\n' +
+                'binary or compressed fields, writing less frequently or keeping fewer time\n' +
+                'directories (purge_write).\n' +
+                '\n================================== END WARNING ==================================\n',
+                UserWarning, '', 0)
+
+    def check_correct_line_probe_setup(self):
+        line_probes = self.properties['line_probes']
+        if not line_probes['write_line_probes']:
+            return
+        if (line_probes.get('grouping', Parameters.ONE_PER_LOCATION) == Parameters.ONE_FUNCTION_OBJECT and
+                any('write_interval' in line for line in line_probes['location'])):
+            warnings.showwarning(
+                '\n==================================== WARNING ====================================\n' +
+                '\nAll line probes are sampled by a single function object, so the write_interval of\n' +
+                'individual lines is ignored. Group the line probes BY_FREQUENCY to sample lines\n' +
+                'with different write intervals.\n' +
+                '\n================================== END WARNING ==================================\n',
+                UserWarning, '', 0)
+
+    def check_correct_function_object_controls_setup(self):
+        from src.WriteSystemDirectoryFiles.FunctionObjectControls import FunctionObjectControls
+        function_object_controls = self.properties.get('function_object_controls', {})
+        all_controls = dict(function_object_controls.get('function_objects', {}))
+        all_controls['default'] = function_object_controls.get('default', {})
+        for name, controls in all_controls.items():
+            for control, interval in [('execute_control', 'execute_interval'), ('write_control', 'write_interval')]:
+                if (controls.get(control, Parameters.TIME_STEP) not in [Parameters.TIME_STEP, Parameters.WRITE_TIME]
+                        and interval not in controls):
+                    sys.exit('\n===================================== ERROR =====================================\n' +
+                             '\nThe ' + control + ' of the function object controls (' + name + ') is based on\n' +
+                             'time, but no ' + interval + ' was given. Specify the time between two\n' +
+                             'executions or writes of the function object.\n' +
+                             '\n=================================== END ERROR ===================================\n')
+            if controls.get('time_start', 0) > controls.get('time_end', float('inf')):
+                warnings.showwarning(
+                    '\n==================================== WARNING ====================================\n' +
+                    '\nThe time_start of the function object controls (' + name + ') is after its\n' +
+                    'time_end, so the function object will never be executed.\n' +
+                    '\n================================== END WARNING ==================================\n',
+                    UserWarning, '', 0)
+
+        names = FunctionObjectControls(self.properties).get_function_object_names()
+        unknown = [name for name in function_object_controls.get('function_objects', {}) if name not in names]
+        if len(unknown) > 0:
+            warnings.showwarning(
+                '\n==================================== WARNING ====================================\n' +
+                '\nFunction object controls were given for ' + ', '.join(unknown) + ', which are not\n' +
+                'written for the current set-up and will be ignored. Controls can be given for\n' +
+                ', '.join(names) + '.\n' +
+                '\n================================== END WARNING ==================================\n',
+                UserWarning, '', 0)
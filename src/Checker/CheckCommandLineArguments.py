@@ -17,20 +17,52 @@ class CheckCommandLineArguments:
         --input=name                select a input file to use instead of the properties set in the code
         --output=name               output a json script along with the case setup as specified by the properties dictionary
         --write-json-only=name      output the case to a json file only, don't write the case setup
+        --sweep=name                generate all cases of the parameter sweep defined in the json file name
+        --workers=number            number of parallel processes to use for a parameter sweep or the case server
+                                    (default: all cores)
+        --incremental               only write files of an existing case whose content has changed
+        --profile[=name]            print the time spent in each stage of the case generation, and write a timeline
+                                    (chrome trace format) to the json file name, if specified
+        --archive=name              stream the case into the tar archive name (.tar, .tar.gz or .tar.zst) instead of
+                                    writing its files into the run directory, use - to stream an uncompressed tar
+                                    archive to the standard output (all other output is then written to stderr)
+        --serve=address             serve case generation requests on the socket address, either unix:path or
+                                    tcp:[host:]port (see src/CaseServer/CaseServer.py for the protocol)
+        --allow-remote              let the case server listen on a host which is not a loopback address (the server has
+                                    no authentication, only use this on a trusted network)
         '''
         for i in range(1, len(self.__args)):
             if '--input=' in self.__args[i]:
                 self.__options['input'] = self.__args[i].replace('--input=', '')
+            elif '--sweep=' in self.__args[i]:
+                self.__options['sweep'] = self.__args[i].replace('--sweep=', '')
+            elif '--workers=' in self.__args[i]:
+                self.__options['workers'] = int(self.__args[i].replace('--workers=', ''))
             elif '--output=' in self.__args[i]:
                 self.__options['output'] = self.__args[i].replace('--output=', '')
             elif '--write-json-only=' in self.__args[i]:
                 self.__options['write-json-only'] = self.__args[i].replace('--write-json-only=', '')
+            elif '--incremental' == self.__args[i]:
+                self.__options['incremental'] = True
+            elif '--profile=' in self.__args[i]:
+                self.__options['profile'] = self.__args[i].replace('--profile=', '')
+            elif '--profile' == self.__args[i]:
+                self.__options['profile'] = ''
+            elif '--serve=' in self.__args[i]:
+                self.__options['serve'] = self.__args[i].replace('--serve=', '')
+            elif '--allow-remote' == self.__args[i]:
+                self.__options['allow-remote'] = True
+            elif '--archive=' in self.__args[i]:
+                self.__options['archive'] = self.__args[i].replace('--archive=', '')
             elif '--help' in self.__args[i]:
                 print(help)
                 exit(0)
             else:
                 raise Exception(help)
 
+        if 'archive' in self.__options and 'sweep' in self.__options:
+            raise Exception('--archive can only be used for a single case, not for a parameter sweep')
+
     def __getitem__(self, item):
         if item in self.__options:
             return self.__options[item]
@@ -0,0 +1,294 @@
+import re
+import ast
+import math
+import operator
+
+TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|//[^\n]*|/\*.*?\*/|[(){};]|[^\s(){};"]+', re.DOTALL)
+VARIABLE = re.compile(r'\$:?([A-Za-z_][\w.]*)')
+# largest integer (in bits) computed by a power in #calc / #eval expressions, larger powers are computed as floats
+CALC_MAX_INTEGER_BITS = 4096
+
+
+def _power(base, exponent, modulus=None):
+    if modulus is None and isinstance(base, int) and isinstance(exponent, int) and \
+            base.bit_length() * exponent > CALC_MAX_INTEGER_BITS:
+        return float(base) ** exponent
+    return pow(base, exponent, modulus)
+
+
+# constants and functions available in #calc / #eval expressions (functions of integers which take long to compute for
+# large arguments are left out), which are evaluated from their syntax tree with the operators below only
+CALC_FUNCTIONS = {name: getattr(math, name) for name in dir(math)
+                  if not name.startswith('_') and name not in ['factorial', 'comb', 'perm']}
+CALC_FUNCTIONS.update({'pow': _power, 'abs': abs, 'min': min, 'max': max, 'mag': abs})
+CALC_UNARY_OPERATORS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+CALC_BINARY_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+                         ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+                         ast.Pow: _power}
+
+
+class BlockMeshDictReader:
+    # reads the vertices and blocks of a blockMeshDict to determine the size of the mesh without running blockMesh.
+    # Macro expansions ($variable, $:scope.variable) and #calc / #eval expressions are evaluated, which is sufficient for
+    # parametrised dictionaries such as the one provided for the Taylor-Green vortex. Entries included from other files
+    # (#include) are not supported.
+    def __init__(self, path_to_block_mesh_dict):
+        self.path = path_to_block_mesh_dict
+        with open(self.path, 'r') as block_mesh_dict:
+            tokens = [token for token in TOKEN.findall(block_mesh_dict.read())
+                      if not token.startswith('//') and not token.startswith('/*')]
+        self.__dictionary, _ = self.__parse_dictionary(tokens, 0, [])
+        self.__scale = float(self.__dictionary.get('scale', self.__dictionary.get('convertToMeters', [1.0]))[0])
+        self.vertices = [[self.__scale * float(x) for x in vertex] for vertex in self.__dictionary['vertices'][0]]
+        self.blocks = self.__get_blocks(self.__dictionary['blocks'][0])
+
+    def get_number_of_cells(self):
+        return sum(block['cells'][0] * block['cells'][1] * block['cells'][2] for block in self.blocks)
+
+    def get_bounding_box(self):
+        bounding_box_min = [min(vertex[i] for vertex in self.vertices) for i in range(3)]
+        bounding_box_max = [max(vertex[i] for vertex in self.vertices) for i in range(3)]
+        return bounding_box_min, bounding_box_max
+
+    def get_structured_cells(self):
+        # returns the number of cells in x, y and z if the blocks are axis-aligned boxes which tile the bounding box
+        # (i.e. the mesh is a single structured box), otherwise None
+        intervals = [{}, {}, {}]
+        for block in self.blocks:
+            corners = [self.vertices[label] for label in block['vertices']]
+            for direction in range(3):
+                coordinates = sorted(set(round(corner[direction], 12) for corner in corners))
+                if len(coordinates) != 2:
+                    return None
+                # hex blocks may be oriented arbitrarily, find the local direction spanning this global direction
+                local = self.__get_local_direction(corners, direction)
+                if local is None:
+                    return None
+                interval = tuple(coordinates)
+                if intervals[direction].setdefault(interval, block['cells'][local]) != block['cells'][local]:
+                    return None
+
+        cells = []
+        for direction in range(3):
+            sorted_intervals = sorted(intervals[direction])
+            for previous, current in zip(sorted_intervals[:-1], sorted_intervals[1:]):
+                if previous[1] != current[0]:
+                    return None
+            cells.append(sum(intervals[direction][interval] for interval in sorted_intervals))
+
+        if cells[0] * cells[1] * cells[2] != self.get_number_of_cells():
+            return None
+        return cells
+
+    def __get_local_direction(self, corners, direction):
+        # local hex directions: x1 = vertex 0 -> 1, x2 = vertex 0 -> 3, x3 = vertex 0 -> 4
+        for local, vertex in enumerate([1, 3, 4]):
+            if round(corners[vertex][direction], 12) != round(corners[0][direction], 12):
+                return local
+        return None
+
+    def iterate_cell_centres(self, chunk_size):
+        # yields the cell centres (in the order in which blockMesh creates the cells, i.e. block by block with the
+        # first local direction running fastest) in chunks of at most chunk_size cells. Cells are mapped trilinearly
+        # from the block vertices, curved edges are not taken into account
+        import numpy as np
+        for block in self.blocks:
+            corners = np.array([self.vertices[label] for label in block['vertices']])
+            weights = [self.__get_cell_centre_weights(block['cells'][i], block['grading'][i]) for i in range(3)]
+            cells_per_layer = block['cells'][0] * block['cells'][1]
+            layers_per_chunk = max(1, chunk_size // max(1, cells_per_layer))
+            for start in range(0, block['cells'][2], layers_per_chunk):
+                w3, w2, w1 = np.meshgrid(weights[2][start:start + layers_per_chunk], weights[1], weights[0],
+                                         indexing='ij')
+                w1, w2, w3 = w1.ravel()[:, np.newaxis], w2.ravel()[:, np.newaxis], w3.ravel()[:, np.newaxis]
+                centres = self.__map_to_block(corners, w1, w2, w3)
+                for chunk_start in range(0, len(centres), chunk_size):
+                    yield centres[chunk_start:chunk_start + chunk_size]
+
+    def get_patch_face_centres(self, patch_name):
+        # face centres of all faces of a patch (in no particular order), calculated in the same way as the cell centres
+        import numpy as np
+        local_faces = [[0, 3, 7, 4], [1, 2, 6, 5], [0, 1, 5, 4], [3, 2, 6, 7], [0, 1, 2, 3], [4, 5, 6, 7]]
+        face_centres = []
+        for face in self.__get_patch_faces(patch_name):
+            for block in self.blocks:
+                block_faces = [set(block['vertices'][vertex] for vertex in local_face) for local_face in local_faces]
+                if set(face) not in block_faces:
+                    continue
+                local_face = block_faces.index(set(face))
+                normal_direction, position = local_face // 2, float(local_face % 2)
+                corners = np.array([self.vertices[label] for label in block['vertices']])
+                weights = [self.__get_cell_centre_weights(block['cells'][i], block['grading'][i]) for i in range(3)]
+                weights[normal_direction] = np.array([position])
+                w3, w2, w1 = np.meshgrid(weights[2], weights[1], weights[0], indexing='ij')
+                face_centres.append(self.__map_to_block(corners, w1.ravel()[:, np.newaxis],
+                                                        w2.ravel()[:, np.newaxis], w3.ravel()[:, np.newaxis]))
+                break
+            else:
+                raise Exception('Could not find the block of face ' + str(face) + ' of patch ' + patch_name + ' in ' +
+                                self.path)
+        return np.concatenate(face_centres) if len(face_centres) > 0 else np.zeros((0, 3))
+
+    def __get_patch_faces(self, patch_name):
+        # patches are either given in a boundary list (name { type ...; faces (...); }) or in the older patches list
+        # (type name (...))
+        if 'boundary' in self.__dictionary:
+            entries = self.__dictionary['boundary'][0]
+            for index in range(len(entries) - 1):
+                if entries[index] == patch_name and isinstance(entries[index + 1], dict):
+                    return [[int(float(label)) for label in face] for face in entries[index + 1]['faces'][0]]
+        if 'patches' in self.__dictionary:
+            entries = self.__dictionary['patches'][0]
+            for index in range(1, len(entries) - 1):
+                if entries[index] == patch_name and isinstance(entries[index + 1], list):
+                    return [[int(float(label)) for label in face] for face in entries[index + 1]]
+        raise Exception('Could not find patch ' + patch_name + ' in ' + self.path)
+
+    def __map_to_block(self, corners, w1, w2, w3):
+        # trilinear mapping from local block coordinates (between 0 and 1) to global coordinates
+        return ((1 - w1) * (1 - w2) * (1 - w3) * corners[0] + w1 * (1 - w2) * (1 - w3) * corners[1] +
+                w1 * w2 * (1 - w3) * corners[2] + (1 - w1) * w2 * (1 - w3) * corners[3] +
+                (1 - w1) * (1 - w2) * w3 * corners[4] + w1 * (1 - w2) * w3 * corners[5] +
+                w1 * w2 * w3 * corners[6] + (1 - w1) * w2 * w3 * corners[7])
+
+    def __get_cell_centre_weights(self, number_of_cells, grading):
+        # local coordinates (between 0 and 1) of the cell centres along one block direction. The grading is either a
+        # single expansion ratio (last / first cell size) or a list of (length fraction, cell fraction, expansion
+        # ratio) entries for multi-grading
+        import numpy as np
+        if not isinstance(grading, list):
+            grading = [[1.0, 1.0, grading]]
+        sections = [[float(entry) for entry in section] for section in grading]
+        total_length = sum(section[0] for section in sections)
+        total_cells = sum(section[1] for section in sections)
+
+        nodes = [0.0]
+        remaining_cells = number_of_cells
+        for index, section in enumerate(sections):
+            if index == len(sections) - 1:
+                cells = remaining_cells
+            else:
+                cells = int(round(section[1] / total_cells * number_of_cells))
+            remaining_cells -= cells
+            if cells == 0:
+                continue
+            ratio = section[2] ** (1.0 / (cells - 1)) if cells > 1 else 1.0
+            if abs(ratio - 1.0) < 1e-12:
+                local_nodes = np.arange(1, cells + 1) / cells
+            else:
+                local_nodes = (1.0 - ratio ** np.arange(1, cells + 1)) / (1.0 - ratio ** cells)
+            nodes.extend(nodes[-1] + local_nodes * section[0] / total_length)
+        nodes = np.array(nodes)
+        return 0.5 * (nodes[:-1] + nodes[1:])
+
+    def __get_blocks(self, entries):
+        blocks = []
+        index = 0
+        while index < len(entries):
+            if entries[index] != 'hex':
+                index += 1
+                continue
+            vertices = [int(float(label)) for label in entries[index + 1]]
+            index += 2
+            # skip optional zone name
+            while not isinstance(entries[index], list) or len(entries[index]) != 3:
+                index += 1
+            cells = [int(float(number)) for number in entries[index]]
+            grading = [1.0, 1.0, 1.0]
+            if index + 2 < len(entries) and entries[index + 1] in ['simpleGrading', 'edgeGrading']:
+                grading = self.__get_grading(entries[index + 1], entries[index + 2])
+                index += 2
+            blocks.append({'vertices': vertices, 'cells': cells, 'grading': grading})
+            index += 1
+        return blocks
+
+    def __get_grading(self, grading_type, values):
+        values = [value if isinstance(value, list) else float(value) for value in values]
+        if grading_type == 'simpleGrading':
+            return values
+        # edge grading is only supported if all four edges in each direction use the same grading
+        grading = []
+        for direction in range(3):
+            edges = values[4 * direction:4 * direction + 4]
+            if any(edge != edges[0] for edge in edges):
+                raise Exception('Edge grading with different gradings per direction is not supported in ' + self.path)
+            grading.append(edges[0])
+        return grading
+
+    def __parse_dictionary(self, tokens, index, scopes):
+        dictionary = {}
+        scopes = scopes + [dictionary]
+        while index < len(tokens) and tokens[index] != '}':
+            key = tokens[index]
+            index += 1
+            if key.startswith('#') and key != '#calc' and key != '#eval':
+                # directives such as #inputMode or #include are ignored
+                if index < len(tokens) and tokens[index].startswith('"'):
+                    index += 1
+                continue
+            if index < len(tokens) and tokens[index] == '{':
+                dictionary[key], index = self.__parse_dictionary(tokens, index + 1, scopes)
+                index += 1
+            else:
+                dictionary[key], index = self.__parse_values(tokens, index, scopes, ';')
+                index += 1
+        return dictionary, index
+
+    def __parse_values(self, tokens, index, scopes, end):
+        values = []
+        while index < len(tokens) and tokens[index] != end:
+            token = tokens[index]
+            if token == '(':
+                value, index = self.__parse_values(tokens, index + 1, scopes, ')')
+                values.append(value)
+            elif token == '{':
+                value, index = self.__parse_dictionary(tokens, index + 1, scopes)
+                values.append(value)
+            elif token == '#calc' or token == '#eval':
+                values.append(self.__evaluate(tokens[index + 1].strip('"{}'), scopes))
+                index += 1
+            elif token.startswith('$'):
+                values.extend(self.__lookup(token, scopes))
+            else:
+                values.append(token)
+            index += 1
+        return values, index
+
+    def __lookup(self, variable, scopes):
+        # $:a.b is looked up from the top level dictionary, $a.b from the current scope outwards
+        names = variable.lstrip('$:').split('.')
+        candidates = [scopes[0]] if variable.startswith('$:') else reversed(scopes)
+        for scope in candidates:
+            entry = scope
+            for name in names:
+                if not isinstance(entry, dict) or name not in entry:
+                    entry = None
+                    break
+                entry = entry[name]
+            if entry is not None:
+                return entry
+        raise Exception('Could not evaluate ' + variable + ' in ' + self.path)
+
+    def __evaluate(self, expression, scopes):
+        # only numbers, the constants and functions of CALC_FUNCTIONS and arithmetic operators are evaluated, anything
+        # else (e.g. attribute access) is rejected, as blockMeshDicts are often taken from elsewhere
+        expression = VARIABLE.sub(lambda match: '(' + str(self.__lookup(match.group(0), scopes)[0]) + ')', expression)
+        try:
+            return self.__evaluate_node(ast.parse(expression.strip(), mode='eval').body)
+        except (SyntaxError, ValueError, TypeError, ArithmeticError, RecursionError) as error:
+            raise Exception('Could not evaluate expression "' + expression + '" in ' + self.path + ': ' + str(error))
+
+    def __evaluate_node(self, node):
+        if isinstance(node, ast.Constant) and type(node.value) in [int, float]:
+            return node.value
+        elif isinstance(node, ast.Name) and node.id in CALC_FUNCTIONS and not callable(CALC_FUNCTIONS[node.id]):
+            return CALC_FUNCTIONS[node.id]
+        elif isinstance(node, ast.UnaryOp) and type(node.op) in CALC_UNARY_OPERATORS:
+            return CALC_UNARY_OPERATORS[type(node.op)](self.__evaluate_node(node.operand))
+        elif isinstance(node, ast.BinOp) and type(node.op) in CALC_BINARY_OPERATORS:
+            return CALC_BINARY_OPERATORS[type(node.op)](self.__evaluate_node(node.left),
+                                                        self.__evaluate_node(node.right))
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and len(node.keywords) == 0 and \
+                node.func.id in CALC_FUNCTIONS and callable(CALC_FUNCTIONS[node.func.id]):
+            return CALC_FUNCTIONS[node.func.id](*[self.__evaluate_node(argument) for argument in node.args])
+        raise ValueError('unsupported ' + type(node).__name__ + ' ' + ast.dump(node))
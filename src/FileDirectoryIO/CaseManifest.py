@@ -0,0 +1,88 @@
+import os
+import json
+import hashlib
+
+
+class CaseManifest:
+    # keeps track of all files generated for a case so that a re-generation of the same case only needs to write files
+    # whose content has changed. Generated files are identified by a hash of their content, copied files (such as the
+    # mesh) by the size and modification time of their source.
+    manifest_name = '.caseManifest.json'
+
+    def __init__(self, case_directory):
+        self.case_directory = case_directory
+        self.__previous_entries = {}
+        self.__current_entries = {}
+        self.__report = {'added': [], 'changed': [], 'unchanged': [], 'removed': []}
+
+        manifest_path = os.path.join(self.case_directory, CaseManifest.manifest_name)
+        if os.path.isfile(manifest_path):
+            with open(manifest_path, 'r') as json_file:
+                self.__previous_entries = json.load(json_file)['files']
+
+    def content_changed(self, relative_path, content):
+        return self.digest_changed(relative_path, hashlib.sha256(content).hexdigest())
+
+    def digest_changed(self, relative_path, digest):
+        self.__current_entries[relative_path] = {'sha256': digest}
+
+        destination = os.path.join(self.case_directory, relative_path)
+        previous_entry = self.__previous_entries.get(relative_path, {})
+        if 'sha256' in previous_entry:
+            unchanged = previous_entry['sha256'] == digest and os.path.isfile(destination)
+        else:
+            # no entry from a previous incremental run, compare against the content on disk instead
+            unchanged = os.path.isfile(destination) and self.__hash_file(destination) == digest
+        return self.__record(relative_path, destination, unchanged)
+
+    def source_changed(self, relative_path, source):
+        source_stat = os.stat(source)
+        entry = {'source': source, 'size': source_stat.st_size, 'mtime_ns': source_stat.st_mtime_ns}
+        self.__current_entries[relative_path] = entry
+
+        destination = os.path.join(self.case_directory, relative_path)
+        previous_entry = self.__previous_entries.get(relative_path, {})
+        if os.path.isfile(destination):
+            destination_stat = os.stat(destination)
+            if 'source' in previous_entry:
+                unchanged = (previous_entry == entry and destination_stat.st_size == source_stat.st_size)
+            else:
+                # copies preserve the modification time of the source, so these are sufficient to identify a copy
+                unchanged = (destination_stat.st_size == source_stat.st_size and
+                             destination_stat.st_mtime_ns == source_stat.st_mtime_ns)
+        else:
+            unchanged = False
+        return self.__record(relative_path, destination, unchanged)
+
+    def finalise(self):
+        # remove files written by the previous generation that are no longer part of the case
+        for relative_path in sorted(set(self.__previous_entries) - set(self.__current_entries)):
+            destination = os.path.join(self.case_directory, relative_path)
+            if os.path.isfile(destination):
+                os.remove(destination)
+            self.__report['removed'].append(relative_path)
+
+        manifest_path = os.path.join(self.case_directory, CaseManifest.manifest_name)
+        temporary_path = manifest_path + '.' + str(os.getpid()) + '.tmp'
+        with open(temporary_path, 'w') as json_file:
+            json.dump({'files': self.__current_entries}, json_file, indent=4, sort_keys=True)
+        os.replace(temporary_path, manifest_path)
+
+    def get_report(self):
+        return self.__report
+
+    def __record(self, relative_path, destination, unchanged):
+        if unchanged:
+            self.__report['unchanged'].append(relative_path)
+        elif os.path.isfile(destination):
+            self.__report['changed'].append(relative_path)
+        else:
+            self.__report['added'].append(relative_path)
+        return not unchanged
+
+    def __hash_file(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
@@ -0,0 +1,99 @@
+import os
+from math import floor
+from input import GlobalVariables as Parameters
+
+# bytes per value of fields written in binary (double precision)
+BINARY_VALUE_SIZE = 8
+
+# characters per value of fields written in ascii in addition to the significant digits (sign, decimal point, exponent
+# and separator)
+ASCII_VALUE_OVERHEAD = 7
+
+# typical size of fields written in ascii after compressing them with gzip, relative to their uncompressed size
+ASCII_COMPRESSION_RATIO = 0.4
+
+
+class DiskFootprint:
+    # estimates the disk space used by the time directories written during the run from the number of cells, the fields
+    # written at each write time and the write settings of the controlDict. The estimate only covers the cell values of
+    # the fields (file headers and boundary values are small in comparison) and excludes the mesh and the 0 directory
+
+    # number of values per cell of fields which are not scalars. phi is stored on the faces, of which there are about
+    # three internal ones per cell in hexahedral meshes
+    components = {'U': 3, 'R': 6, 'vorticity': 3, 'phi': 3}
+
+    def __init__(self, properties):
+        self.properties = properties
+        self.io_properties = properties.get('io_properties', {})
+
+    def get_estimate(self):
+        # returns the estimate as a dictionary, or None if either the number of cells or the number of writes is not
+        # known before running the case (e.g. for snappyHexMesh meshes or writes based on the cpu or clock time)
+        number_of_cells = self.__get_number_of_cells()
+        number_of_writes = self.__get_number_of_writes()
+        if number_of_cells is None or number_of_writes is None:
+            return None
+
+        fields = self.get_written_fields()
+        bytes_per_write = sum(number_of_cells * self.__get_bytes_per_cell(field) for field in fields)
+        return {
+            'number_of_cells': number_of_cells,
+            'fields': fields,
+            'number_of_writes': number_of_writes,
+            'bytes_per_write': bytes_per_write,
+            'total_bytes': bytes_per_write * number_of_writes,
+        }
+
+    def get_written_fields(self):
+        from src.WriteZeroDirectoryFiles.FieldDependencies import FieldDependencies
+        fields = FieldDependencies(self.properties).get_required_fields() + ['phi']
+        if self.properties['flow_properties']['flow_type'] == Parameters.compressible:
+            fields.extend(['rho', 'Ma'])
+        if self.properties['additional_fields']['write_additional_fields']:
+            names = {Parameters.Q: 'Q', Parameters.LAMBDA_2: 'Lambda2', Parameters.VORTICITY: 'vorticity',
+                     Parameters.ENSTROPHY: 'enstrophy'}
+            fields.extend(names[field] for field in self.properties['additional_fields']['fields'] if field in names)
+        return fields
+
+    def __get_bytes_per_cell(self, field):
+        components = self.components.get(field, 1)
+        if self.io_properties.get('write_format', Parameters.ASCII) == Parameters.BINARY:
+            return components * BINARY_VALUE_SIZE
+
+        # values of vectors and tensors are enclosed in brackets
+        size = components * (self.io_properties.get('write_precision', 6) + ASCII_VALUE_OVERHEAD)
+        if components > 1:
+            size += 2
+        if self.io_properties.get('write_compression', False):
+            size *= ASCII_COMPRESSION_RATIO
+        return size
+
+    def __get_number_of_writes(self):
+        solver_properties = self.properties['solver_properties']
+        duration = solver_properties['endTime'] - solver_properties['startTime']
+        write_control = solver_properties['write_control']
+        if write_control == Parameters.TIME_STEP:
+            # with CFL based time stepping, deltaT is only the initial time step and the estimate is approximate
+            number_of_time_steps = round(duration / solver_properties['deltaT'])
+            number_of_writes = number_of_time_steps // solver_properties['write_frequency']
+        elif write_control == Parameters.RUN_TIME or write_control == Parameters.ADJUSTABLE_RUN_TIME:
+            number_of_writes = floor(duration / solver_properties['write_frequency'] + 1e-6)
+        else:
+            return None
+
+        # only the latest purge_write time directories are kept
+        if solver_properties['purge_write'] > 0:
+            number_of_writes = min(number_of_writes, solver_properties['purge_write'])
+        return max(0, number_of_writes)
+
+    def __get_number_of_cells(self):
+        file_properties = self.properties['file_properties']
+        if file_properties['mesh_treatment'] == Parameters.POLY_MESH:
+            from src.FileDirectoryIO.PolyMeshReader import PolyMeshReader
+            return PolyMeshReader(file_properties['polymesh_directory']).get_summary()['n_cells']
+        elif file_properties['mesh_treatment'] == Parameters.BLOCK_MESH_DICT:
+            from src.FileDirectoryIO.BlockMeshDictReader import BlockMeshDictReader
+            return BlockMeshDictReader(os.path.join(file_properties['blockmeshdict_directory'],
+                                                    'blockMeshDict')).get_number_of_cells()
+        # the number of cells of meshes generated by snappyHexMesh (or copied manually) is only known later
+        return None
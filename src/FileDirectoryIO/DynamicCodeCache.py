@@ -0,0 +1,128 @@
+import os
+import shlex
+import shutil
+import hashlib
+import tempfile
+import warnings
+import subprocess
+from input import GlobalVariables as Parameters
+
+
+class DynamicCodeCache:
+    # per-user cache of dynamic code libraries compiled by OpenFOAM for #codeStream entries. OpenFOAM compiles each
+    # code stream into the dynamicCode directory of the case, so that cases using the same code (e.g. all cases of a
+    # parameter sweep) compile the same library over and over again. OpenFOAM skips the compilation if the library is
+    # already present in the dynamicCode directory, so each code stream is compiled only once (in a scratch case, using
+    # the compile command) and the resulting libraries are placed into every case using it.
+    #
+    # Entries are identified by the SHA1 hash over the OpenFOAM version, the platform (WM_OPTIONS) and the complete
+    # text of the code stream (boilerplate and injected code), as OpenFOAM names the library after the SHA1 hash of the
+    # same text:
+    #
+    #   <cache directory>/<version>/<hash>/codeDict                                     dictionary that was compiled
+    #   <cache directory>/<version>/<hash>/dynamicCode/platforms/<WM_OPTIONS>/lib/*.so  compiled libraries
+    #
+    # The compile command is executed in the scratch case, which contains the code stream as the entry 'value' of the
+    # file system/codeDict. It is considered successful if it leaves at least one library (lib*.so) in the dynamicCode
+    # directory of the scratch case, otherwise the case is left to compile the code itself. The compile command is
+    # trusted local configuration: it is split into its arguments (shlex) and executed without a shell, so shell syntax
+    # (pipes, redirections, several commands) is not supported. benchmarks/check_dynamic_code_cache.py checks the cache
+    # with a stub compile command, without OpenFOAM.
+    def __init__(self, cache_directory, version, compile_command):
+        self.cache_directory = os.path.join(os.path.expanduser(cache_directory), version)
+        self.version = version
+        self.compile_command = compile_command
+        if not os.path.exists(self.cache_directory):
+            os.makedirs(self.cache_directory, exist_ok=True)
+
+    def get_key(self, code):
+        digest = hashlib.sha1()
+        digest.update(self.version.encode('utf-8') + b'\0')
+        digest.update(os.environ.get('WM_OPTIONS', '').encode('utf-8') + b'\0')
+        digest.update(code.encode('utf-8'))
+        return digest.hexdigest()
+
+    def add_code(self, code):
+        # return the directory of the compiled code within the cache (compiling it if it is not already present), or
+        # None if the code could not be compiled
+        entry_directory = os.path.join(self.cache_directory, self.get_key(code))
+        if os.path.isdir(entry_directory):
+            return entry_directory
+
+        # compile in a temporary directory and rename it, so that concurrent generations never see a partial entry
+        build_directory = tempfile.mkdtemp(prefix='.incoming-', dir=self.cache_directory)
+        try:
+            scratch_case = os.path.join(build_directory, 'case')
+            self.__write_scratch_case(scratch_case, code)
+            try:
+                result = subprocess.run(shlex.split(self.compile_command), cwd=scratch_case, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT)
+                output = result.stdout.decode('utf-8', errors='replace').strip().splitlines()
+            except (OSError, ValueError) as error:
+                # e.g. the compiler is not found or the command is not quoted correctly
+                output = [str(error)]
+            libraries = self.list_libraries(scratch_case)
+            if len(libraries) == 0:
+                warnings.showwarning(
+                    '\n==================================== WARNING ====================================\n' +
+                    '\nCould not compile the code stream into the dynamic code cache, it will be compiled\n' +
+                    'by OpenFOAM when the case is run instead. Last output of the compile command\n' +
+                    '"' + self.compile_command + '":\n\n' + '\n'.join(output[-10:]) + '\n' +
+                    '\n================================== END WARNING ==================================\n',
+                    UserWarning, '', 0)
+                return None
+
+            # only the libraries are kept, OpenFOAM does not need the generated sources once the library exists
+            entry = os.path.join(build_directory, 'entry')
+            for library in libraries:
+                destination = os.path.join(entry, 'dynamicCode', library)
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                os.rename(os.path.join(scratch_case, 'dynamicCode', library), destination)
+                os.chmod(destination, 0o555)
+            os.rename(os.path.join(scratch_case, 'system', 'codeDict'), os.path.join(entry, 'codeDict'))
+            try:
+                os.rename(entry, entry_directory)
+            except OSError:
+                # another process has compiled the same code in the meantime
+                pass
+            return entry_directory
+        finally:
+            shutil.rmtree(build_directory, ignore_errors=True)
+
+    def place_libraries(self, entry_directory, file_manager, placement=Parameters.HARD_LINK):
+        case_directory = file_manager.properties['file_properties']['path']
+        for library in self.list_libraries(entry_directory):
+            file_manager.place_file(os.path.join(entry_directory, 'dynamicCode', library),
+                                    os.path.join(case_directory, 'dynamicCode', library), placement)
+
+    @staticmethod
+    def list_libraries(directory):
+        # paths of all libraries below the dynamicCode directory, relative to it
+        dynamic_code_directory = os.path.join(directory, 'dynamicCode')
+        libraries = []
+        for root, _, files in os.walk(dynamic_code_directory):
+            for file_name in files:
+                if file_name.startswith('lib') and file_name.endswith('.so'):
+                    libraries.append(os.path.relpath(os.path.join(root, file_name), dynamic_code_directory))
+        return sorted(libraries)
+
+    def __write_scratch_case(self, scratch_case, code):
+        for directory in ['system', 'constant']:
+            os.makedirs(os.path.join(scratch_case, directory), exist_ok=True)
+        with open(os.path.join(scratch_case, 'system', 'controlDict'), 'w') as file_id:
+            file_id.write(self.__header('controlDict'))
+            file_id.write('application     foamDictionary;\n')
+            file_id.write('startFrom       startTime;\n')
+            file_id.write('startTime       0;\n')
+            file_id.write('stopAt          endTime;\n')
+            file_id.write('endTime         0;\n')
+            file_id.write('deltaT          1;\n')
+            file_id.write('writeControl    timeStep;\n')
+            file_id.write('writeInterval   1;\n')
+        with open(os.path.join(scratch_case, 'system', 'codeDict'), 'w') as file_id:
+            file_id.write(self.__header('codeDict'))
+            file_id.write('value           ' + code)
+
+    def __header(self, object_name):
+        return ('FoamFile\n{\n    version     2.0;\n    format      ascii;\n    class       dictionary;\n' +
+                '    location    "system";\n    object      ' + object_name + ';\n}\n\n')
@@ -1,12 +1,97 @@
 import os
-import distutils.dir_util
-import distutils.file_util
+import hashlib
+import functools
 from input import GlobalVariables as Parameters
+from src.FileDirectoryIO.CaseManifest import CaseManifest
+from src.FileDirectoryIO.MeshStore import MeshStore
+from src.FileDirectoryIO.OutputBackend import DiskBackend
+
+
+class FileBuffer:
+    # in-memory content of a single file. Everything written to it is collected and committed to the output backend
+    # with a single write once the file is closed through the file manager. Large files (e.g. non-uniform fields) are
+    # spilled into a temporary file next to the destination once they exceed spill_size, so that memory stays bounded
+    # (only if the backend provides a temporary path, i.e. if the case is written to disk)
+    spill_size = 64 * 1024 * 1024
+
+    def __init__(self, path, temporary_path, executable=False):
+        self.path = path
+        self.temporary_path = temporary_path
+        self.executable = executable
+        self.__content = []
+        self.__size = 0
+        self.__spill_file = None
+        self.__digest = None
+
+    def write(self, message):
+        # accepts both text and (already encoded) binary content
+        self.__content.append(message)
+        self.__size += len(message)
+        if self.__size > FileBuffer.spill_size and self.temporary_path is not None:
+            self.__spill()
+
+    def is_spilled(self):
+        return self.__spill_file is not None
+
+    def getvalue(self):
+        if self.__spill_file is not None:
+            self.__spill()
+            with open(self.temporary_path, 'rb') as spilled_file:
+                return spilled_file.read()
+        return self.__encode()
+
+    def get_digest(self):
+        # sha256 of the complete content, without holding the content in memory if the buffer has been spilled
+        if self.__spill_file is None:
+            return hashlib.sha256(self.__encode()).hexdigest()
+        self.__spill()
+        return self.__digest.hexdigest()
+
+    def finish_spill(self):
+        # flush all remaining content into the temporary file, which then holds the complete file
+        self.__spill()
+        self.__spill_file.close()
+
+    def discard(self):
+        if self.__spill_file is not None:
+            self.__spill_file.close()
+            os.remove(self.temporary_path)
+
+    def __encode(self):
+        return b''.join(part.encode('utf-8') if isinstance(part, str) else part for part in self.__content)
+
+    def __spill(self):
+        if self.__spill_file is None:
+            descriptor = os.open(self.temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            self.__spill_file = open(descriptor, 'wb')
+            self.__digest = hashlib.sha256()
+        content = self.__encode()
+        if not self.__spill_file.closed:
+            self.__spill_file.write(content)
+        self.__digest.update(content)
+        self.__content = []
+        self.__size = 0
 
 
 class FileManager:
-    def __init__(self, properties):
+    def __init__(self, properties, backend=None):
         self.properties = properties
+        self.__open_files = {}
+
+        # all files of the case are written through the output backend, which writes them into the case directory on
+        # disk by default (see OutputBackend for alternatives, e.g. keeping the case in memory)
+        self.__backend = backend
+        if self.__backend is None:
+            self.__backend = DiskBackend(self.properties['file_properties']['path'])
+
+        # number of files and bytes written into the case directory (used for profiling)
+        self.__files_written = 0
+        self.__bytes_written = 0
+
+        # only write files that have changed since the last generation of the case, if requested
+        self.__manifest = None
+        if self.properties['file_properties'].get('incremental_generation', False) and self.__backend.on_disk:
+            self.__manifest = CaseManifest(self.properties['file_properties']['path'])
 
     def copy_mesh_to_destination(self):
         if self.properties['file_properties']['mesh_treatment'] == Parameters.BLOCK_MESH_DICT:
@@ -20,49 +105,107 @@ class FileManager:
             self.__copy_poly_mesh_dict()
 
     def create_directory_structure(self):
-        self.__create_directory(os.path.join(self.properties['file_properties']['path']))
-        self.__create_directory(os.path.join(self.properties['file_properties']['path'], '0'))
-        self.__create_directory(os.path.join(self.properties['file_properties']['path'], 'constant'))
-        self.__create_directory(os.path.join(self.properties['file_properties']['path'], 'system'))
-        self.__create_directory(os.path.join(self.properties['file_properties']['path'], 'system/include'))
+        self.create_directory('')
+        self.create_directory('0')
+        self.create_directory('constant')
+        self.create_directory('system')
+        self.create_directory('system/include')
         self.__create_case_file()
 
-    def create_file(self, folder, file_name):
-        file_id = open(os.path.join(self.properties['file_properties']['path'], folder, file_name), 'w')
+    def create_directory(self, folder):
+        # folder is relative to the case directory
+        self.__backend.create_directory(folder)
+
+    def create_file(self, folder, file_name, executable=False):
+        path = os.path.join(self.properties['file_properties']['path'], folder, file_name)
+        file_id = FileBuffer(path, self.__backend.get_temporary_path(self.__relative_path(path)), executable)
+        self.__open_files[path] = file_id
         return file_id
 
     def close_file(self, file_id):
-        file_id.close()
+        self.__commit(file_id)
+        self.__open_files.pop(file_id.path, None)
+
+    def close_all_files(self):
+        # commit files that were not explicitly closed by their writer so that no content is lost
+        for file_id in list(self.__open_files.values()):
+            self.close_file(file_id)
+        if self.__manifest is not None:
+            self.__manifest.finalise()
+        self.__backend.close()
+
+    def get_backend(self):
+        return self.__backend
+
+    def get_statistics(self):
+        return {'files': self.__files_written, 'bytes': self.__bytes_written}
+
+    def get_incremental_generation_report(self):
+        if self.__manifest is None:
+            return None
+        return self.__manifest.get_report()
 
     def write(self, file_id, message):
         file_id.write(message)
 
-    def write_header(self, file_id, class_type, location, object_type):
-        file_id.write('/*--------------------------------*- C++ -*----------------------------------*\\\n')
-        file_id.write('| =========                 |                                                 |\n')
-        file_id.write('| \\\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n')
-        file_id.write('|  \\\    /   O peration     | Version:  ' + self.properties['file_properties']['version'] + '                                 |\n')
-        file_id.write('|   \\\  /    A nd           | Web:      www.OpenFOAM.com                      |\n')
-        file_id.write('|    \\\/     M anipulation  |                                                 |\n')
-        file_id.write('\*---------------------------------------------------------------------------*/\n')
-        file_id.write('FoamFile\n')
-        file_id.write('{\n')
-        file_id.write('    version     2.0;\n')
-        file_id.write('    format      ascii;\n')
-        file_id.write('    class       ' + class_type + ';\n')
-        file_id.write('    location    "' + location + '";\n')
-        file_id.write('    object      ' + object_type + ';\n')
-        file_id.write('}\n')
-        file_id.write('// * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * //\n')
+    def write_header(self, file_id, class_type, location, object_type, binary=False):
+        file_id.write(FileManager.render_header(self.properties['file_properties']['version'], class_type, location,
+                                                object_type, binary))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def render_header(version, class_type, location, object_type, binary=False):
+        # the same headers are written for every case (and repeatedly by long-running processes, e.g. the case server),
+        # so rendered headers are cached. Fields with binary (non-uniform) lists require the binary format and the
+        # architecture of the binary data
+        file_format = ('    format      binary;\n'
+                       '    arch        "LSB;label=32;scalar=64";\n') if binary else '    format      ascii;\n'
+        return ('/*--------------------------------*- C++ -*----------------------------------*\\\n'
+                '| =========                 |                                                 |\n'
+                '| \\\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n'
+                '|  \\\    /   O peration     | Version:  ' + version +
+                '                                 |\n'
+                '|   \\\  /    A nd           | Web:      www.OpenFOAM.com                      |\n'
+                '|    \\\/     M anipulation  |                                                 |\n'
+                '\*---------------------------------------------------------------------------*/\n'
+                'FoamFile\n'
+                '{\n'
+                '    version     2.0;\n'
+                + file_format +
+                '    class       ' + class_type + ';\n'
+                '    location    "' + location + '";\n'
+                '    object      ' + object_type + ';\n'
+                '}\n'
+                '// * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * //\n')
 
     def get_version(self):
         return self.properties['file_properties']['version']
 
     def copy_directory(self, src, dst):
-        distutils.dir_util.copy_tree(src, dst)
+        # dst (as for copy_file and place_file) is the destination within the case directory
+        for root, _, files in os.walk(src, followlinks=True):
+            destination = os.path.normpath(os.path.join(dst, os.path.relpath(root, src)))
+            self.create_directory(self.__relative_path(destination))
+            for file_name in files:
+                self.copy_file(os.path.join(root, file_name), os.path.join(destination, file_name))
 
     def copy_file(self, src, dst):
-        distutils.file_util.copy_file(src, dst)
+        relative_path = self.__relative_path(dst)
+        if self.__manifest is not None:
+            if not self.__manifest.source_changed(relative_path, src):
+                return
+            self.create_directory(os.path.dirname(relative_path))
+        self.__backend.copy_file(src, relative_path)
+        self.__count_file(os.path.getsize(src))
+
+    def place_file(self, src, dst, placement):
+        # places a file of a store shared between cases (e.g. the mesh store) into the case, as a link if possible
+        relative_path = self.__relative_path(dst)
+        if self.__manifest is not None:
+            if not self.__manifest.source_changed(relative_path, src):
+                return
+        copied = self.__backend.place_file(src, relative_path, placement)
+        self.__count_file(os.path.getsize(src) if copied else 0)
 
     def __copy_block_mesh_dict(self):
         src = os.path.join(self.properties['file_properties']['blockmeshdict_directory'], 'blockMeshDict')
@@ -77,13 +220,45 @@ class FileManager:
     def __copy_poly_mesh_dict(self):
         src = os.path.join(self.properties['file_properties']['polymesh_directory'], 'polyMesh')
         dst = os.path.join(self.properties['file_properties']['path'], 'constant', 'polyMesh')
-        self.copy_directory(src, dst)
-
-    def __create_directory(self, directory):
-        if not os.path.exists(directory):
-            os.makedirs(directory)
+        store_directory = self.properties['file_properties'].get('mesh_store_directory', '')
+        if store_directory == '' or not self.__backend.on_disk:
+            self.copy_directory(src, dst)
+        else:
+            mesh_store = MeshStore(store_directory)
+            mesh_directory = mesh_store.add_mesh(src)
+            placement = self.properties['file_properties'].get('mesh_placement', Parameters.HARD_LINK)
+            for file_name in mesh_store.list_mesh_files(mesh_directory):
+                self.place_file(os.path.join(mesh_directory, file_name), os.path.join(dst, file_name), placement)
 
     def __create_case_file(self):
-        file_id = open(os.path.join(self.properties['file_properties']['path'],
-                                    self.properties['file_properties']['case_name'] + '.foam'), 'w')
-        file_id.close()
+        file_id = self.create_file('', self.properties['file_properties']['case_name'] + '.foam')
+        self.close_file(file_id)
+
+    def __count_file(self, size):
+        self.__files_written += 1
+        self.__bytes_written += size
+
+    def __relative_path(self, path):
+        return os.path.normpath(os.path.relpath(path, self.properties['file_properties']['path']))
+
+    def __commit(self, file_id):
+        # write the whole file with a single write through the output backend
+        relative_path = self.__relative_path(file_id.path)
+        if file_id.is_spilled():
+            # large files have already been written into the temporary file while they were generated
+            if self.__manifest is not None:
+                if not self.__manifest.digest_changed(relative_path, file_id.get_digest()):
+                    file_id.discard()
+                    return
+            file_id.finish_spill()
+            size = os.path.getsize(file_id.temporary_path)
+            self.__backend.move_file(file_id.temporary_path, relative_path, file_id.executable)
+            self.__count_file(size)
+            return
+
+        content = file_id.getvalue()
+        if self.__manifest is not None:
+            if not self.__manifest.content_changed(relative_path, content):
+                return
+        self.__backend.write_file(relative_path, content, file_id.executable)
+        self.__count_file(len(content))
@@ -0,0 +1,131 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from input import GlobalVariables as Parameters
+
+# ioctl request to clone (reflink) a file on Linux (btrfs, xfs, ...), see linux/fs.h
+FICLONE = 0x40049409
+
+
+class MeshStore:
+    # content-addressed store of polyMesh directories shared between cases. Each mesh is kept once in the store,
+    # identified by a hash over the content of all of its files, and placed into cases using hard links, reflinks or
+    # symbolic links, so that many cases using the same mesh do not duplicate it on disk.
+    #
+    # Files in the store are read-only. Utilities modifying the mesh in place (e.g. refineMesh -overwrite) will fail on
+    # linked files instead of silently changing the mesh of all other cases.
+    __file_hashes = {}
+
+    def __init__(self, store_directory):
+        self.store_directory = store_directory
+        self.__index_path = os.path.join(self.store_directory, 'index.json')
+        if not os.path.exists(self.store_directory):
+            os.makedirs(self.store_directory, exist_ok=True)
+
+    def add_mesh(self, source_directory):
+        # return the directory of the mesh within the store, adding the mesh to the store if it is not already present
+        file_names = sorted(self.__list_files(source_directory))
+        digest = hashlib.sha256()
+        for file_name in file_names:
+            digest.update(file_name.encode('utf-8') + b'\0')
+            digest.update(self.__hash_file(os.path.join(source_directory, file_name)).encode('utf-8') + b'\0')
+        mesh_directory = os.path.join(self.store_directory, digest.hexdigest(), 'polyMesh')
+
+        if not os.path.isdir(mesh_directory):
+            # populate a temporary directory first and rename it, so that concurrent generations (e.g. of a parameter
+            # sweep) never see a partially copied mesh
+            temporary_directory = tempfile.mkdtemp(prefix='.incoming-', dir=self.store_directory)
+            for file_name in file_names:
+                destination = os.path.join(temporary_directory, 'polyMesh', file_name)
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                shutil.copy2(os.path.join(source_directory, file_name), destination)
+                os.chmod(destination, 0o444)
+            try:
+                os.rename(temporary_directory, os.path.dirname(mesh_directory))
+            except OSError:
+                # another process has added the same mesh in the meantime
+                shutil.rmtree(temporary_directory, ignore_errors=True)
+        return mesh_directory
+
+    def list_mesh_files(self, mesh_directory):
+        return sorted(self.__list_files(mesh_directory))
+
+    @staticmethod
+    def place_file(src, dst, placement):
+        # returns True if the file had to be copied, False if it has been linked
+        if os.path.lexists(dst):
+            os.remove(dst)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        try:
+            if placement == Parameters.HARD_LINK:
+                os.link(src, dst)
+                return False
+            elif placement == Parameters.REFLINK:
+                MeshStore.__reflink(src, dst)
+                return False
+            elif placement == Parameters.SYMBOLIC_LINK:
+                os.symlink(os.path.abspath(src), dst)
+                return False
+        except (OSError, ImportError):
+            # linking is not supported by the file system (or the case is on another file system), fall back to copy
+            if os.path.lexists(dst):
+                os.remove(dst)
+        shutil.copyfile(src, dst)
+        source_stat = os.stat(src)
+        os.utime(dst, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        return True
+
+    @staticmethod
+    def __reflink(src, dst):
+        import fcntl
+        with open(src, 'rb') as source, open(dst, 'wb') as destination:
+            fcntl.ioctl(destination.fileno(), FICLONE, source.fileno())
+        source_stat = os.stat(src)
+        os.utime(dst, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+
+    def __list_files(self, directory):
+        file_names = []
+        for root, _, files in os.walk(directory):
+            for file_name in files:
+                file_names.append(os.path.relpath(os.path.join(root, file_name), directory))
+        return file_names
+
+    def __hash_file(self, path):
+        # hashing large meshes is expensive, so hashes are remembered (in memory and in the index file of the store)
+        # for as long as the size and modification time of the source file do not change
+        path_stat = os.stat(path)
+        key = os.path.abspath(path)
+        stamp = [path_stat.st_size, path_stat.st_mtime_ns]
+
+        if key in MeshStore.__file_hashes and MeshStore.__file_hashes[key][0] == stamp:
+            return MeshStore.__file_hashes[key][1]
+
+        index = self.__read_index()
+        if key in index and index[key][0] == stamp:
+            MeshStore.__file_hashes[key] = index[key]
+            return index[key][1]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        MeshStore.__file_hashes[key] = [stamp, digest.hexdigest()]
+
+        index[key] = MeshStore.__file_hashes[key]
+        self.__write_index(index)
+        return digest.hexdigest()
+
+    def __read_index(self):
+        try:
+            with open(self.__index_path, 'r') as json_file:
+                return json.load(json_file)
+        except (OSError, ValueError):
+            return {}
+
+    def __write_index(self, index):
+        descriptor, temporary_path = tempfile.mkstemp(prefix='.index-', dir=self.store_directory)
+        with open(descriptor, 'w') as json_file:
+            json.dump(index, json_file, indent=4)
+        os.replace(temporary_path, self.__index_path)
@@ -0,0 +1,216 @@
+import io
+import os
+import gzip
+import stat
+import time
+import shutil
+import tarfile
+import tempfile
+import itertools
+from src.FileDirectoryIO.MeshStore import MeshStore
+
+
+class DiskBackend:
+    # writes the case into its directory on disk. Files are written into a temporary file next to the destination and
+    # renamed afterwards, so that the destination is either the old or the new file, but never a partially written one
+    on_disk = True
+    __temporary_file_counter = itertools.count()
+
+    def __init__(self, case_directory):
+        self.case_directory = case_directory
+
+    def create_directory(self, relative_path):
+        directory = os.path.join(self.case_directory, relative_path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def get_temporary_path(self, relative_path):
+        # path of the temporary file into which large files are spilled while they are generated
+        directory, name = os.path.split(os.path.join(self.case_directory, relative_path))
+        return os.path.join(directory, '.' + name + '.' + str(os.getpid()) + '.' +
+                            str(next(DiskBackend.__temporary_file_counter)) + '.tmp')
+
+    def write_file(self, relative_path, content, executable=False):
+        temporary_path = self.get_temporary_path(relative_path)
+        descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o777 if executable else 0o666)
+        with open(descriptor, 'wb') as temporary_file:
+            temporary_file.write(content)
+        os.replace(temporary_path, os.path.join(self.case_directory, relative_path))
+
+    def move_file(self, temporary_path, relative_path, executable=False):
+        if executable:
+            # everyone who may read the file may execute it as well
+            mode = stat.S_IMODE(os.stat(temporary_path).st_mode)
+            os.chmod(temporary_path, mode | (mode & 0o444) >> 2)
+        os.replace(temporary_path, os.path.join(self.case_directory, relative_path))
+
+    def copy_file(self, src, relative_path):
+        # copies content (using the fast in-kernel copy of the platform, e.g. sendfile on linux), permissions and
+        # modification time. The copy replaces the destination rather than writing into it, as the destination may be a
+        # link into the mesh store (placed by an earlier generation), which is shared with other cases
+        temporary_path = self.get_temporary_path(relative_path)
+        try:
+            shutil.copy2(src, temporary_path)
+            os.replace(temporary_path, os.path.join(self.case_directory, relative_path))
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def place_file(self, src, relative_path, placement):
+        # returns True if the file had to be copied, False if it has been linked
+        return MeshStore.place_file(src, os.path.join(self.case_directory, relative_path), placement)
+
+    def close(self):
+        pass
+
+
+class MemoryBackend:
+    # keeps the case in memory as a dictionary of paths (relative to the case directory, separated by /) to the content
+    # of each file, without creating any file or directory. Large files are kept in memory as well, and files copied
+    # into the case (e.g. the mesh) are read into memory, so this backend is meant for cases which are inspected or sent
+    # elsewhere directly after their generation
+    on_disk = False
+
+    def __init__(self):
+        self.__files = {}
+
+    def get_files(self):
+        return self.__files
+
+    def create_directory(self, relative_path):
+        # directories only exist implicitly through the files within them
+        pass
+
+    def get_temporary_path(self, relative_path):
+        # files are never spilled to disk
+        return None
+
+    def write_file(self, relative_path, content, executable=False):
+        self.__files[self.__key(relative_path)] = content
+
+    def copy_file(self, src, relative_path):
+        with open(src, 'rb') as source:
+            self.__files[self.__key(relative_path)] = source.read()
+
+    def place_file(self, src, relative_path, placement):
+        self.copy_file(src, relative_path)
+        return True
+
+    def close(self):
+        pass
+
+    def __key(self, relative_path):
+        return os.path.normpath(relative_path).replace(os.sep, '/')
+
+
+class ArchiveBackend:
+    # streams the case into a tar archive (uncompressed, gzip or zstd compressed) instead of creating its files, e.g. to
+    # send the case to another machine or into object storage. The destination is either the path of the archive or a
+    # binary file object (such as sys.stdout.buffer or the file object of a socket), into which the archive is written
+    # as a stream, so the destination does not need to be seekable. All entries are placed within a directory named
+    # after the case, as if the case directory had been archived. Files copied into the case (e.g. the polyMesh) are
+    # read in chunks and large generated files are spilled into a temporary file, so memory stays bounded
+    on_disk = False
+    __temporary_file_counter = itertools.count()
+    compressions = {'.tar': None, '.tar.gz': 'gz', '.tgz': 'gz', '.tar.zst': 'zst', '.tar.zstd': 'zst'}
+
+    def __init__(self, destination, case_name, compression=None):
+        self.case_name = case_name
+        self.__closed = False
+        self.__time = int(time.time())
+        self.__directories = set()
+        self.__close_stream = isinstance(destination, str)
+        self.__stream = open(destination, 'wb') if self.__close_stream else destination
+
+        self.__compressor = None
+        if compression == 'zst':
+            try:
+                import zstandard
+            except ImportError:
+                raise Exception('Writing zstd compressed archives requires the zstandard package (pip install '
+                                'zstandard), use an uncompressed (.tar) or gzip compressed (.tar.gz) archive instead')
+            self.__compressor = zstandard.ZstdCompressor().stream_writer(self.__stream, closefd=False)
+            self.__archive = tarfile.open(fileobj=self.__compressor, mode='w|', format=tarfile.PAX_FORMAT)
+        elif compression == 'gz':
+            # the default level of gzip (6) instead of the level 9 used by tarfile, which takes more than twice as long
+            # for hardly any smaller archives of cases
+            self.__compressor = gzip.GzipFile(fileobj=self.__stream, mode='wb', compresslevel=6, mtime=self.__time)
+            self.__archive = tarfile.open(fileobj=self.__compressor, mode='w|', format=tarfile.PAX_FORMAT)
+        else:
+            self.__archive = tarfile.open(fileobj=self.__stream, mode='w|', format=tarfile.PAX_FORMAT)
+
+    @staticmethod
+    def get_compression(path):
+        # compression used for the archive path, based on its extension (- for standard output is not compressed)
+        for extension, compression in ArchiveBackend.compressions.items():
+            if path.endswith(extension):
+                return compression
+        if path == '-':
+            return None
+        raise Exception('Unknown archive type of ' + path + ', supported are ' +
+                        ', '.join(ArchiveBackend.compressions.keys()))
+
+    def create_directory(self, relative_path):
+        name = self.__name(relative_path)
+        if name in self.__directories:
+            return
+        parent = os.path.dirname(relative_path)
+        if parent != '' and os.path.normpath(parent) != '.':
+            self.create_directory(parent)
+        self.__directories.add(name)
+        self.__archive.addfile(self.__get_entry(name, tarfile.DIRTYPE, 0o755, 0, self.__time))
+
+    def get_temporary_path(self, relative_path):
+        return os.path.join(tempfile.gettempdir(), '.' + os.path.basename(relative_path) + '.' + str(os.getpid()) +
+                            '.' + str(next(ArchiveBackend.__temporary_file_counter)) + '.tmp')
+
+    def write_file(self, relative_path, content, executable=False):
+        self.create_directory(os.path.dirname(relative_path))
+        entry = self.__get_entry(self.__name(relative_path), tarfile.REGTYPE, 0o755 if executable else 0o644,
+                                 len(content), self.__time)
+        self.__archive.addfile(entry, io.BytesIO(content))
+
+    def move_file(self, temporary_path, relative_path, executable=False):
+        self.__add_file(temporary_path, relative_path, 0o755 if executable else 0o644, self.__time)
+        os.remove(temporary_path)
+
+    def copy_file(self, src, relative_path):
+        # permissions and modification time of the source are kept, as for files copied on disk
+        source_stat = os.stat(src)
+        self.__add_file(src, relative_path, stat.S_IMODE(source_stat.st_mode), int(source_stat.st_mtime))
+
+    def place_file(self, src, relative_path, placement):
+        # links can not point outside of the archive, so files are always stored with their content
+        self.copy_file(src, relative_path)
+        return True
+
+    def close(self):
+        if self.__closed:
+            return
+        self.__closed = True
+        self.__archive.close()
+        if self.__compressor is not None:
+            self.__compressor.close()
+        if self.__close_stream:
+            self.__stream.close()
+        else:
+            self.__stream.flush()
+
+    def __add_file(self, path, relative_path, mode, modification_time):
+        self.create_directory(os.path.dirname(relative_path))
+        with open(path, 'rb') as source:
+            size = os.fstat(source.fileno()).st_size
+            entry = self.__get_entry(self.__name(relative_path), tarfile.REGTYPE, mode, size, modification_time)
+            self.__archive.addfile(entry, source)
+
+    def __get_entry(self, name, entry_type, mode, size, modification_time):
+        entry = tarfile.TarInfo(name)
+        entry.type = entry_type
+        entry.mode = mode
+        entry.size = size
+        entry.mtime = modification_time
+        return entry
+
+    def __name(self, relative_path):
+        return os.path.normpath(os.path.join(self.case_name, relative_path)).replace(os.sep, '/')
@@ -0,0 +1,448 @@
+import os
+import re
+import gzip
+import json
+import mmap
+import tempfile
+import numpy as np
+
+FOAM_FILE_HEADER = re.compile(rb'FoamFile\s*\{(.*?)\}', re.DOTALL)
+LIST_START = re.compile(rb'(\d+)\s*\(')
+PATCH_ENTRY = re.compile(rb'([^\s{}()]+)\s*\{([^{}]*)\}')
+BRACKETS_TO_SPACES = bytes.maketrans(b'()', b'  ')
+FACE_CHUNK_SIZE = 65536
+SUMMARY_VERSION = 2
+
+
+class PolyMeshReader:
+    # reads an OpenFOAM polyMesh (ascii or binary, optionally compressed) into numpy arrays. Lists are parsed in bulk
+    # from memory-mapped files, without looping over individual entries in python.
+    #
+    # The mesh summary (sizes, bounding box, patches and cell sizes) is cached in a file next to the polyMesh directory,
+    # which is valid for as long as the size and modification time of all mesh files stay the same, so that repeated
+    # generations using the same mesh only parse the mesh once.
+    summary_name = '.polyMeshSummary.npz'
+    __summaries = {}
+    __summary_statistics = {'memory_hits': 0, 'file_hits': 0, 'misses': 0}
+
+    def __init__(self, polymesh_directory):
+        # polymesh_directory is the directory containing the polyMesh directory (same as in the file_properties)
+        self.polymesh_directory = polymesh_directory
+        self.mesh_directory = os.path.join(polymesh_directory, 'polyMesh')
+
+    def has_faces(self):
+        return self.__find_file('faces') is not None
+
+    def read_points(self):
+        return self.__read_list('points', 'scalar', 3)
+
+    def read_owner(self):
+        return self.__read_list('owner', 'label', 1)
+
+    def read_neighbour(self):
+        return self.__read_list('neighbour', 'label', 1)
+
+    def read_faces(self):
+        # returns the faces in compact form, i.e. the point labels of face i are labels[offsets[i]:offsets[i + 1]]
+        header, content, start = self.__open('faces')
+        label_type = self.__get_dtype(header, 'label')
+        match = LIST_START.search(content, start)
+        number_of_faces = int(match.group(1))
+
+        if self.__is_binary(header):
+            # binary faces are always written as faceCompactList, i.e. a list of offsets followed by a list of labels
+            offsets = np.frombuffer(content, label_type, number_of_faces, match.end()).astype(np.int64)
+            match = LIST_START.search(content, match.end() + number_of_faces * label_type.itemsize)
+            labels = np.frombuffer(content, label_type, int(match.group(1)), match.end()).astype(np.int64)
+            return offsets, labels
+
+        body = content[match.end():]
+        first_open = body.find(b'(')
+        first_close = body.find(b')')
+        if first_open == -1 or first_close < first_open:
+            # faceCompactList in ascii format, a flat list of offsets followed by a flat list of labels
+            offsets = np.fromstring(body[:first_close], dtype=np.int64, count=number_of_faces, sep=' ')
+            match = LIST_START.search(body, first_close)
+            labels = np.fromstring(body[match.end():], dtype=np.int64, count=int(match.group(1)), sep=' ')
+            return offsets, labels
+
+        # faceList in ascii format, each face is written as n(p0 p1 ... pn-1)
+        sizes = np.array(LIST_START.findall(body), dtype=np.int64)[:number_of_faces]
+        offsets = np.zeros(number_of_faces + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        labels = np.fromstring(LIST_START.sub(b' ', body).translate(BRACKETS_TO_SPACES), dtype=np.int64,
+                               count=int(offsets[-1]), sep=' ')
+        return offsets, labels
+
+    def read_boundary(self):
+        header, content, start = self.__open('boundary')
+        patches = []
+        for name, entries in PATCH_ENTRY.findall(content[start:]):
+            patches.append({
+                'name': name.decode('utf-8'),
+                'type': re.search(rb'\btype\s+([^\s;]+)\s*;', entries).group(1).decode('utf-8'),
+                'n_faces': int(re.search(rb'\bnFaces\s+(\d+)\s*;', entries).group(1)),
+                'start_face': int(re.search(rb'\bstartFace\s+(\d+)\s*;', entries).group(1)),
+            })
+        return patches
+
+    def get_patch_face_centres(self, patch_name):
+        # face centres of a boundary patch, in the order of the faces within the patch
+        patches = {patch['name']: patch for patch in self.read_boundary()}
+        if patch_name not in patches:
+            raise Exception('Could not find patch ' + patch_name + ' in ' + self.mesh_directory)
+        start = patches[patch_name]['start_face']
+        end = start + patches[patch_name]['n_faces']
+        offsets, labels = self.read_faces()
+        patch_labels = labels[offsets[start]:offsets[end]]
+        patch_offsets = offsets[start:end + 1] - offsets[start]
+        face_centres, _ = self.get_face_centres_and_areas(self.read_points(), (patch_offsets, patch_labels))
+        return face_centres
+
+    def get_face_centres_and_areas(self, points=None, faces=None):
+        # face centres and area vectors, calculated by decomposing each face into triangles around its average point
+        # (same approach as used by OpenFOAM)
+        if points is None:
+            points = self.read_points()
+        offsets, labels = self.read_faces() if faces is None else faces
+        sizes = np.diff(offsets)
+        if len(sizes) > 0 and sizes.min() == sizes.max():
+            # faces are processed in chunks to keep the memory of intermediate arrays bounded for large meshes
+            face_points = labels.reshape(len(sizes), sizes[0])
+            face_centres = np.empty((len(sizes), 3))
+            face_areas = np.empty((len(sizes), 3))
+            for start in range(0, len(sizes), FACE_CHUNK_SIZE):
+                end = start + FACE_CHUNK_SIZE
+                face_centres[start:end], face_areas[start:end] = \
+                    self.__get_uniform_face_centres_and_areas(points, face_points[start:end])
+            return face_centres, face_areas
+        face_of_label = np.repeat(np.arange(len(sizes)), sizes)
+
+        next_labels = np.roll(labels, -1)
+        next_labels[offsets[1:] - 1] = labels[offsets[:-1]]
+
+        average_points = np.add.reduceat(points[labels], offsets[:-1], axis=0) / sizes[:, np.newaxis]
+        first = points[labels]
+        second = points[next_labels]
+        apex = average_points[face_of_label]
+
+        triangle_areas = 0.5 * self.__cross(second - first, apex - first)
+        triangle_centres = (first + second + apex) / 3.0
+        triangle_magnitudes = np.sqrt(np.einsum('ij,ij->i', triangle_areas, triangle_areas))
+
+        face_areas = np.zeros((len(sizes), 3))
+        face_centres = np.zeros((len(sizes), 3))
+        face_magnitudes = np.bincount(face_of_label, triangle_magnitudes, minlength=len(sizes))
+        for component in range(3):
+            face_areas[:, component] = np.bincount(face_of_label, triangle_areas[:, component], minlength=len(sizes))
+            face_centres[:, component] = np.bincount(face_of_label,
+                                                     triangle_magnitudes * triangle_centres[:, component],
+                                                     minlength=len(sizes))
+        degenerate = face_magnitudes <= 0
+        face_centres[~degenerate] /= face_magnitudes[~degenerate, np.newaxis]
+        face_centres[degenerate] = average_points[degenerate]
+        return face_centres, face_areas
+
+    def __get_uniform_face_centres_and_areas(self, points, face_points):
+        # same as above for meshes where all faces have the same number of points (e.g. hexahedral meshes), where the
+        # faces can be processed as a two-dimensional array without scattering triangles back onto faces
+        first = points[face_points]
+        second = np.roll(first, -1, axis=1)
+        average_points = first.mean(axis=1)
+        apex = average_points[:, np.newaxis, :]
+
+        triangle_areas = 0.5 * self.__cross(second - first, apex - first)
+        triangle_magnitudes = np.sqrt(np.einsum('ijk,ijk->ij', triangle_areas, triangle_areas))
+        face_magnitudes = triangle_magnitudes.sum(axis=1)
+        face_areas = triangle_areas.sum(axis=1)
+        face_centres = np.einsum('ij,ijk->ik', triangle_magnitudes, first + second + apex) / 3.0
+
+        degenerate = face_magnitudes <= 0
+        face_centres[~degenerate] /= face_magnitudes[~degenerate, np.newaxis]
+        face_centres[degenerate] = average_points[degenerate]
+        return face_centres, face_areas
+
+    def __cross(self, a, b):
+        result = np.empty(np.broadcast_shapes(a.shape, b.shape))
+        result[..., 0] = a[..., 1] * b[..., 2] - a[..., 2] * b[..., 1]
+        result[..., 1] = a[..., 2] * b[..., 0] - a[..., 0] * b[..., 2]
+        result[..., 2] = a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+        return result
+
+    @staticmethod
+    def __on_both_sides(face_values, component, owner_faces, neighbour_faces, neighbour_sign=1):
+        # component of a face quantity as seen by the owner of the owner_faces followed by the neighbour of the
+        # neighbour_faces (given as slices or indices into face_values)
+        return np.concatenate((face_values[owner_faces, component],
+                               neighbour_sign * face_values[neighbour_faces, component]))
+
+    def get_cell_centres_and_volumes(self):
+        # cell centres and volumes, calculated by decomposing each cell into pyramids with the faces as their base and
+        # the average face centre of the cell as their apex (same approach as used by OpenFOAM)
+        face_centres, face_areas = self.get_face_centres_and_areas()
+        owner = self.read_owner()
+        neighbour = self.read_neighbour()
+        number_of_cells = int(max(owner.max(initial=-1), neighbour.max(initial=-1))) + 1
+        internal = len(neighbour)
+        cells = np.concatenate((owner, neighbour))
+        del owner, neighbour
+        return self.__get_cell_centres_and_volumes(face_centres, face_areas, cells, slice(None), slice(0, internal),
+                                                   number_of_cells)
+
+    def iterate_cell_centres(self, chunk_size):
+        # yields the cell centres in chunks of at most chunk_size cells. Only the faces of the cells of a chunk are
+        # selected (scanning owner and neighbour in chunks of FACE_CHUNK_SIZE faces) and their geometry computed, so
+        # that apart from the lists of the mesh itself, the memory used depends on chunk_size and not on the size of
+        # the mesh
+        points = self.read_points()
+        owner = self.read_owner()
+        neighbour = self.read_neighbour()
+        offsets, labels = self.read_faces()
+        number_of_cells = int(max(owner.max(initial=-1), neighbour.max(initial=-1))) + 1
+        sizes = np.diff(offsets)
+        uniform_size = int(sizes[0]) if len(sizes) > 0 and sizes.min() == sizes.max() else None
+        del sizes
+
+        # range of the cells of each chunk of faces, so that chunks without faces of the cells of a chunk are skipped
+        face_chunks = []
+        for face_start in range(0, len(owner), FACE_CHUNK_SIZE):
+            cells = np.concatenate((owner[face_start:face_start + FACE_CHUNK_SIZE],
+                                    neighbour[face_start:face_start + FACE_CHUNK_SIZE]))
+            face_chunks.append((face_start, int(cells.min()), int(cells.max())))
+        del cells
+
+        for start in range(0, number_of_cells, chunk_size):
+            end = min(start + chunk_size, number_of_cells)
+            faces = self.__get_faces_of_cells(owner, neighbour, face_chunks, start, end)
+
+            # faces of the chunk in compact form, see read_faces
+            if uniform_size is not None:
+                face_offsets = np.arange(len(faces) + 1, dtype=np.int64) * uniform_size
+                face_labels = labels.reshape(-1, uniform_size)[faces].ravel()
+            else:
+                sizes = offsets[faces + 1] - offsets[faces]
+                face_offsets = np.zeros(len(faces) + 1, dtype=np.int64)
+                np.cumsum(sizes, out=face_offsets[1:])
+                face_labels = np.repeat(offsets[faces] - face_offsets[:-1], sizes)
+                face_labels += np.arange(face_offsets[-1])
+                face_labels = labels[face_labels]
+            face_centres, face_areas = self.get_face_centres_and_areas(points, (face_offsets, face_labels))
+            del face_labels
+
+            owner_cells = owner[faces]
+            owner_faces = np.flatnonzero((owner_cells >= start) & (owner_cells < end))
+            internal_faces = np.flatnonzero(faces < len(neighbour))
+            neighbour_cells = neighbour[faces[internal_faces]]
+            in_chunk = (neighbour_cells >= start) & (neighbour_cells < end)
+            neighbour_faces = internal_faces[in_chunk]
+            cells = np.concatenate((owner_cells[owner_faces], neighbour_cells[in_chunk])) - start
+            cell_centres, _ = self.__get_cell_centres_and_volumes(face_centres, face_areas, cells, owner_faces,
+                                                                  neighbour_faces, end - start)
+            # the arrays of this chunk are released before the next chunk is processed
+            del faces, face_centres, face_areas, owner_cells, owner_faces, internal_faces, neighbour_cells, in_chunk
+            del neighbour_faces, cells
+            yield cell_centres
+
+    @staticmethod
+    def __get_faces_of_cells(owner, neighbour, face_chunks, start, end):
+        # indices of the faces owned by or neighbouring the cells start to end - 1, in ascending order
+        faces = []
+        for face_start, first_cell, last_cell in face_chunks:
+            if last_cell < start or first_cell >= end:
+                continue
+            owner_chunk = owner[face_start:face_start + FACE_CHUNK_SIZE]
+            neighbour_chunk = neighbour[face_start:face_start + FACE_CHUNK_SIZE]
+            selected = (owner_chunk >= start) & (owner_chunk < end)
+            selected[:len(neighbour_chunk)] |= (neighbour_chunk >= start) & (neighbour_chunk < end)
+            faces.append(np.flatnonzero(selected) + face_start)
+        return np.concatenate(faces) if len(faces) > 0 else np.empty(0, dtype=np.int64)
+
+    def __get_cell_centres_and_volumes(self, face_centres, face_areas, cells, owner_faces, neighbour_faces,
+                                       number_of_cells):
+        # cells holds the cell of each owner_face followed by the cell of each neighbour_face (see __on_both_sides).
+        # All quantities are accumulated one component at a time and updated in-place, so that only a few temporary
+        # arrays of the size of the number of faces (and not of three times this size) are held in memory at once
+        faces_per_cell = np.bincount(cells, minlength=number_of_cells)
+
+        estimated_centres = np.zeros((number_of_cells, 3))
+        for component in range(3):
+            face_centre = self.__on_both_sides(face_centres, component, owner_faces, neighbour_faces)
+            estimated_centres[:, component] = np.bincount(cells, face_centre, minlength=number_of_cells)
+        del face_centre
+        estimated_centres /= np.maximum(faces_per_cell, 1)[:, np.newaxis]
+
+        pyramid_volumes = np.zeros(len(cells))
+        for component in range(3):
+            pyramid_volume = self.__on_both_sides(face_centres, component, owner_faces, neighbour_faces)
+            pyramid_volume -= estimated_centres[cells, component]
+            pyramid_volume *= self.__on_both_sides(face_areas, component, owner_faces, neighbour_faces, -1)
+            pyramid_volumes += pyramid_volume
+        del pyramid_volume
+        pyramid_volumes /= 3.0
+
+        cell_volumes = np.bincount(cells, pyramid_volumes, minlength=number_of_cells)
+        cell_centres = np.zeros((number_of_cells, 3))
+        for component in range(3):
+            pyramid_centres = self.__on_both_sides(face_centres, component, owner_faces, neighbour_faces)
+            pyramid_centres *= 0.75
+            pyramid_centres += 0.25 * estimated_centres[cells, component]
+            pyramid_centres *= pyramid_volumes
+            cell_centres[:, component] = np.bincount(cells, pyramid_centres, minlength=number_of_cells)
+        del pyramid_centres
+        valid = np.abs(cell_volumes) > 0
+        cell_centres[valid] /= cell_volumes[valid, np.newaxis]
+        cell_centres[~valid] = estimated_centres[~valid]
+        return cell_centres, cell_volumes
+
+    @staticmethod
+    def get_summary_statistics():
+        # number of summaries found in memory (read before by this process), in the cache file or calculated
+        return dict(PolyMeshReader.__summary_statistics)
+
+    def get_summary(self):
+        stamp = self.__get_stamp()
+        key = os.path.abspath(self.mesh_directory)
+        if key in PolyMeshReader.__summaries and PolyMeshReader.__summaries[key][0] == stamp:
+            PolyMeshReader.__summary_statistics['memory_hits'] += 1
+            return PolyMeshReader.__summaries[key][1]
+
+        summary = self.__load_summary(stamp)
+        if summary is not None:
+            PolyMeshReader.__summary_statistics['file_hits'] += 1
+        else:
+            PolyMeshReader.__summary_statistics['misses'] += 1
+            summary = self.__calculate_summary()
+            self.__save_summary(stamp, summary)
+        PolyMeshReader.__summaries[key] = (stamp, summary)
+        return summary
+
+    def __calculate_summary(self):
+        points = self.read_points()
+        owner = self.read_owner()
+        neighbour = self.read_neighbour()
+        patches = self.read_boundary()
+
+        summary = {
+            'n_points': len(points),
+            'n_faces': len(owner),
+            'n_internal_faces': len(neighbour),
+            'n_cells': int(max(owner.max(initial=-1), neighbour.max(initial=-1))) + 1,
+            'bounding_box_min': points.min(axis=0).tolist() if len(points) > 0 else [0.0, 0.0, 0.0],
+            'bounding_box_max': points.max(axis=0).tolist() if len(points) > 0 else [0.0, 0.0, 0.0],
+            'patch_names': [patch['name'] for patch in patches],
+            'patch_types': [patch['type'] for patch in patches],
+            'patch_n_faces': [patch['n_faces'] for patch in patches],
+            'patch_start_faces': [patch['start_face'] for patch in patches],
+            'min_cell_size': None,
+            'max_cell_size': None,
+            'structured_cells': None,
+        }
+
+        # number of cells in x, y and z if the mesh is a structured box, i.e. the points form a tensor product grid
+        if len(points) > 0:
+            unique = [len(np.unique(np.round(points[:, direction], 12))) for direction in range(3)]
+            if (unique[0] * unique[1] * unique[2] == len(points) and
+                    (unique[0] - 1) * (unique[1] - 1) * (unique[2] - 1) == summary['n_cells']):
+                summary['structured_cells'] = [unique[0] - 1, unique[1] - 1, unique[2] - 1]
+
+        # cell sizes (cube root of the cell volume) require the faces, which are not always provided with the mesh
+        if self.has_faces():
+            _, cell_volumes = self.get_cell_centres_and_volumes()
+            if len(cell_volumes) > 0:
+                cell_sizes = np.cbrt(np.abs(cell_volumes))
+                summary['min_cell_size'] = float(cell_sizes.min())
+                summary['max_cell_size'] = float(cell_sizes.max())
+        return summary
+
+    def __load_summary(self, stamp):
+        summary_path = os.path.join(self.polymesh_directory, PolyMeshReader.summary_name)
+        try:
+            with np.load(summary_path) as cached_summary:
+                if str(cached_summary['stamp']) != stamp:
+                    return None
+                return json.loads(str(cached_summary['summary']))
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def __save_summary(self, stamp, summary):
+        # the mesh directory may not be writable, in which case the summary is simply not cached
+        try:
+            descriptor, temporary_path = tempfile.mkstemp(prefix='.polyMeshSummary-', suffix='.npz',
+                                                          dir=self.polymesh_directory)
+            with open(descriptor, 'wb') as npz_file:
+                np.savez(npz_file, stamp=np.array(stamp), summary=np.array(json.dumps(summary)))
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, os.path.join(self.polymesh_directory, PolyMeshReader.summary_name))
+        except OSError:
+            pass
+
+    def __get_stamp(self):
+        stamp = [SUMMARY_VERSION]
+        for file_name in sorted(os.listdir(self.mesh_directory)):
+            file_stat = os.stat(os.path.join(self.mesh_directory, file_name))
+            stamp.append([file_name, file_stat.st_size, file_stat.st_mtime_ns])
+        return json.dumps(stamp)
+
+    def __find_file(self, name):
+        for file_name in [name, name + '.gz']:
+            path = os.path.join(self.mesh_directory, file_name)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def __open(self, name):
+        # returns the FoamFile header entries, the content of the file and the position after the header
+        path = self.__find_file(name)
+        if path is None:
+            raise FileNotFoundError('Could not find ' + name + ' in ' + self.mesh_directory)
+
+        if path.endswith('.gz'):
+            with gzip.open(path, 'rb') as compressed_file:
+                content = compressed_file.read()
+        elif os.path.getsize(path) == 0:
+            content = b''
+        else:
+            with open(path, 'rb') as file:
+                content = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = FOAM_FILE_HEADER.search(content, 0, 4096)
+        if header is None:
+            raise Exception('Could not find FoamFile header in ' + path)
+        return header.group(1), content, header.end()
+
+    def __read_list(self, name, value_type, components):
+        header, content, start = self.__open(name)
+        dtype = self.__get_dtype(header, value_type)
+        match = LIST_START.search(content, start)
+        count = int(match.group(1)) * components
+
+        if self.__is_binary(header):
+            values = np.frombuffer(content, dtype, count, match.end()).astype(np.int64 if value_type == 'label'
+                                                                              else np.float64)
+        else:
+            # vector entries are bracketed, i.e. (x y z), so brackets are removed before parsing the numbers
+            body = content[match.end():]
+            if components > 1:
+                body = body.translate(BRACKETS_TO_SPACES)
+            values = np.fromstring(body, dtype=np.int64 if value_type == 'label' else np.float64, count=count,
+                                   sep=' ')
+        if components > 1:
+            values = values.reshape(-1, components)
+        return values
+
+    def __is_binary(self, header):
+        match = re.search(rb'\bformat\s+(\w+)\s*;', header)
+        return match is not None and match.group(1) == b'binary'
+
+    def __get_dtype(self, header, value_type):
+        # the size of labels and scalars in binary files is given by the arch entry, e.g. "LSB;label=32;scalar=64"
+        arch = re.search(rb'\barch\s+"([^"]*)"', header)
+        arch = arch.group(1).decode('utf-8') if arch is not None else ''
+        size = re.search(value_type + r'=(\d+)', arch)
+        if size is not None:
+            bits = int(size.group(1))
+        else:
+            bits = 32 if value_type == 'label' else 64
+        byte_order = '>' if 'MSB' in arch else '<'
+        kind = 'i' if value_type == 'label' else 'f'
+        return np.dtype(byte_order + kind + str(bits // 8))
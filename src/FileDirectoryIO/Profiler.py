@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import contextlib
+
+
+class Profiler:
+    # records the wall time of each stage of the case generation, together with the number of files and bytes written
+    # by the file manager during the stage. Stages recorded in other processes (e.g. the workers of a parameter sweep)
+    # can be added to the profile, so that the time spent in each stage is summed over all cases. The profile can be
+    # printed as a table, sorted by the time spent in each stage, or written as a timeline in the Chrome trace event
+    # format (which can be opened with chrome://tracing or https://ui.perfetto.dev)
+    def __init__(self, import_start_time=None):
+        self.__stages = []
+        if import_start_time is not None:
+            # time spent before the first line of the application was executed and while importing its modules
+            now = time.perf_counter()
+            process_start_time = self.__get_process_start_time(now)
+            if process_start_time is not None and process_start_time < import_start_time:
+                self.__add_stage('interpreter startup', process_start_time, import_start_time, 0, 0)
+            self.__add_stage('imports', import_start_time, now, 0, 0)
+
+    @contextlib.contextmanager
+    def stage(self, name, file_manager=None):
+        statistics = file_manager.get_statistics() if file_manager is not None else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            files, bytes_written = 0, 0
+            if statistics is not None:
+                files = file_manager.get_statistics()['files'] - statistics['files']
+                bytes_written = file_manager.get_statistics()['bytes'] - statistics['bytes']
+            self.__add_stage(name, start, end, files, bytes_written)
+
+    def get_stages(self):
+        return self.__stages
+
+    def add_stages(self, stages, case_name):
+        for stage in stages:
+            stage = dict(stage)
+            stage['case'] = case_name
+            self.__stages.append(stage)
+
+    def print_summary(self):
+        if len(self.__stages) == 0:
+            return
+        total_time = (max(stage['start'] + stage['duration'] for stage in self.__stages) -
+                      min(stage['start'] for stage in self.__stages))
+
+        # stages of the same name (e.g. of different cases of a parameter sweep) are summed up
+        rows = {}
+        for stage in self.__stages:
+            row = rows.setdefault(stage['name'], {'calls': 0, 'duration': 0.0, 'files': 0, 'bytes': 0})
+            row['calls'] += 1
+            row['duration'] += stage['duration']
+            row['files'] += stage['files']
+            row['bytes'] += stage['bytes']
+
+        width = max(len(name) for name in rows)
+        print('\nProfile of case generation (wall time: ' + '{:.3f}'.format(total_time) + ' s):')
+        print('  ' + 'stage'.ljust(width) + '  calls   time [ms]        %   files        bytes')
+        for name, row in sorted(rows.items(), key=lambda item: item[1]['duration'], reverse=True):
+            percentage = 100 * row['duration'] / total_time if total_time > 0 else 0
+            print('  ' + name.ljust(width) + '  ' + str(row['calls']).rjust(5) + '  ' +
+                  '{:10.3f}'.format(1000 * row['duration']) + '  ' + '{:6.1f}'.format(percentage) + '  ' +
+                  str(row['files']).rjust(6) + '  ' + str(row['bytes']).rjust(11))
+
+    def write_trace(self, path):
+        # complete events ('X') in microseconds relative to the first stage. Stages of different processes are shown
+        # on separate rows (one per process id)
+        origin = min((stage['start'] for stage in self.__stages), default=0)
+        events = []
+        for stage in self.__stages:
+            arguments = {'files': stage['files'], 'bytes': stage['bytes']}
+            if 'case' in stage:
+                arguments['case'] = stage['case']
+            events.append({
+                'name': stage['name'],
+                'cat': 'generation',
+                'ph': 'X',
+                'ts': round(1e6 * (stage['start'] - origin), 3),
+                'dur': round(1e6 * stage['duration'], 3),
+                'pid': os.getpid(),
+                'tid': stage['pid'],
+                'args': arguments,
+            })
+        directory = os.path.dirname(path)
+        if directory != '' and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(path, 'w') as json_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, json_file, indent=1)
+
+    def __add_stage(self, name, start, end, files, bytes_written):
+        self.__stages.append({
+            'name': name,
+            'start': start,
+            'duration': end - start,
+            'files': files,
+            'bytes': bytes_written,
+            'pid': os.getpid(),
+        })
+
+    def __get_process_start_time(self, now):
+        # start time of the current process (on the clock of time.perf_counter), only available on linux
+        try:
+            with open('/proc/self/stat', 'r') as stat_file:
+                start_ticks = int(stat_file.read().rsplit(')', 1)[1].split()[19])
+            with open('/proc/uptime', 'r') as uptime_file:
+                uptime = float(uptime_file.read().split()[0])
+            return now - (uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+        except (OSError, ValueError, IndexError):
+            return None
@@ -1,4 +1,5 @@
 from input import GlobalVariables as Parameters
+from src.FileDirectoryIO.DiskFootprint import DiskFootprint
 
 
 class ScreenOutput:
@@ -16,8 +17,53 @@ class ScreenOutput:
         if self.properties['flow_properties']['flow_type'] == Parameters.compressible:
             print('Mach number    : ' + str(self.properties['flow_properties']['non_dimensional_properties']['Ma']))
 
+        from src.WriteZeroDirectoryFiles.FieldDependencies import FieldDependencies
+        print('Fields in 0/   : ' + ' '.join(FieldDependencies(self.properties).get_required_fields()))
+
+        estimate = DiskFootprint(self.properties).get_estimate()
+        if estimate is not None:
+            print('Disk footprint : ' + self.__format_size(estimate['total_bytes']) + ' (' +
+                  str(estimate['number_of_writes']) + ' writes of ' + self.__format_size(estimate['bytes_per_write']) +
+                  ', estimated)')
+
+        if self.properties['parallel_properties']['run_in_parallel']:
+            method = self.properties['parallel_properties'].get('decomposition_method', Parameters.SCOTCH)
+            method_name = {Parameters.SCOTCH: 'scotch', Parameters.HIERARCHICAL: 'hierarchical',
+                           Parameters.SIMPLE: 'simple'}.get(method, 'scotch')
+            if 'decomposition_subdomains' in self.properties['parallel_properties']:
+                method_name += ' (' + ' '.join(
+                    str(n) for n in self.properties['parallel_properties']['decomposition_subdomains']) + ')'
+            print('Processors     : ' + str(self.properties['parallel_properties']['number_of_processors']) +
+                  ', ' + method_name + ' decomposition')
+
         if self.properties['file_properties']['mesh_treatment'] == Parameters.NO_MESH:
             print('\nNo mesh was specified during the generation of case directory.'
                   '\nEnsure you copy a mesh manually before running your case')
 
+    def print_mesh_summary(self, summary):
+        print('\nMesh summary:')
+        print('  points        : ' + str(summary['n_points']))
+        print('  faces         : ' + str(summary['n_faces']) + ' (' + str(summary['n_internal_faces']) + ' internal)')
+        print('  cells         : ' + str(summary['n_cells']))
+        print('  bounding box  : (' + ' '.join(str(x) for x in summary['bounding_box_min']) + ') (' +
+              ' '.join(str(x) for x in summary['bounding_box_max']) + ')')
+        if summary['min_cell_size'] is not None:
+            print('  cell size     : ' + str(summary['min_cell_size']) + ' - ' + str(summary['max_cell_size']))
+        for name, patch_type, n_faces in zip(summary['patch_names'], summary['patch_types'],
+                                             summary['patch_n_faces']):
+            print('  patch ' + name.ljust(8) + ': ' + str(n_faces) + ' faces (' + patch_type + ')')
+
+    def print_incremental_generation_summary(self, report):
+        print('\nIncremental generation of case directory:')
+        for status in ['added', 'changed', 'unchanged', 'removed']:
+            print('  ' + status.ljust(10) + ': ' + str(len(report[status])) + ' files')
+        for status in ['added', 'changed', 'removed']:
+            for relative_path in report[status]:
+                print('    ' + status.ljust(8) + ' ' + relative_path)
 
+    def __format_size(self, size):
+        for unit in ['bytes', 'kB', 'MB', 'GB']:
+            if size < 1000:
+                return ('%.3g' % size) + ' ' + unit
+            size /= 1000
+        return ('%.3g' % size) + ' TB'
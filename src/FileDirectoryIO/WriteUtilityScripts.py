@@ -1,7 +1,10 @@
 import os
-import distutils.file_util
 from input import GlobalVariables as Parameters
 
+# post-processing scripts shipped with the case generator, located relative to it (and not to the working directory)
+POST_PROCESSING_SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                       'examples', 'scripts', 'userDefined', 'postProcessing')
+
 
 class WriteUtilityScripts:
     def __init__(self, properties, file_manager):
@@ -9,7 +12,7 @@ class WriteUtilityScripts:
         self.file_manager = file_manager
 
     def write_all_run_file(self):
-        file_id = self.file_manager.create_file('', 'Allrun')
+        file_id = self.file_manager.create_file('', 'Allrun', executable=True)
         self.file_manager.write(file_id, '# !/bin/sh\n')
         self.file_manager.write(file_id, 'cd "${0%/*}" || exit  # Run from this directory\n')
         self.file_manager.write(file_id, '. ${WM_PROJECT_DIR:?}/bin/tools/RunFunctions  # Tutorial run functions\n')
@@ -26,6 +29,11 @@ class WriteUtilityScripts:
         pre_solver_flag = ''
         post_solver_flag = ''
         if self.properties['parallel_properties']['run_in_parallel']:
+            io_properties = self.properties.get('io_properties', {})
+            if (io_properties.get('file_handler', Parameters.UNCOLLATED) == Parameters.COLLATED and
+                    len(io_properties.get('io_ranks', [])) > 0):
+                self.file_manager.write(file_id, 'export FOAM_IORANKS=\'(' +
+                                        ' '.join(str(rank) for rank in io_properties['io_ranks']) + ')\'\n')
             self.file_manager.write(file_id, 'decomposePar\n')
             pre_solver_flag = 'mpirun -np ' + str(self.properties['parallel_properties']['number_of_processors']) + ' '
             post_solver_flag = ' -parallel'
@@ -52,17 +60,43 @@ class WriteUtilityScripts:
 
         self.file_manager.write(file_id, 'python3 postProcessing/plotResiduals.py\n')
 
+        # the output of the probes is packed before any other post-processing, which can then use the packed output
+        point_probes = self.properties['point_probes']
+        if point_probes['write_point_probes'] and point_probes.get('pack_output', False):
+            self.file_manager.write(file_id, 'python3 postProcessing/packProbes.py point_probes' +
+                                    (' --delete' if point_probes.get('delete_packed_output', False) else '') + '\n')
+        line_probes = self.properties['line_probes']
+        if line_probes['write_line_probes'] and line_probes.get('pack_output', False):
+            from src.WriteSystemDirectoryFiles.WriteLineProbes import WriteLineProbes
+            for function_object_name, _, lines in WriteLineProbes(self.properties, self.file_manager) \
+                    .get_function_objects():
+                self.file_manager.write(file_id, 'python3 postProcessing/packProbes.py ' + function_object_name +
+                                        ' --lines ' + ' '.join(line['name'] for line in lines) +
+                                        (' --delete' if line_probes.get('delete_packed_output', False) else '') + '\n')
+
         if ((self.properties['cutting_planes']['write_cutting_planes'] is True) or
                 (self.properties['iso_surfaces']['write_iso_surfaces'] is True)):
             self.copy_PVD_loader_script()
 
-        if self.properties['cutting_planes']['write_cutting_planes'] is True:
+        if self.properties['cutting_planes'].get('group_surfaces', False):
+            # surfaces sampled by a shared function object are given as <function object>/<surface name>
+            from src.WriteSystemDirectoryFiles.WriteSurfaces import WriteSurfaces
+            function_objects = WriteSurfaces(self.properties, self.file_manager).get_function_objects()
+            if len(function_objects) > 0:
+                self.file_manager.write(file_id, 'python3 postProcessing/addVTPLoader.py ')
+                for function_object_name, _, surfaces in function_objects:
+                    for surface_name, _, _, _ in surfaces:
+                        self.file_manager.write(file_id, function_object_name + '/' + surface_name + ' ')
+                self.file_manager.write(file_id, '\n')
+
+        elif self.properties['cutting_planes']['write_cutting_planes'] is True:
             self.file_manager.write(file_id, 'python3 postProcessing/addVTPLoader.py ')
             for plane in self.properties['cutting_planes']['location']:
                 self.file_manager.write(file_id, plane['name'] + ' ')
             self.file_manager.write(file_id, '\n')
 
-        if self.properties['iso_surfaces']['write_iso_surfaces'] is True:
+        if (self.properties['iso_surfaces']['write_iso_surfaces'] is True and
+                not self.properties['cutting_planes'].get('group_surfaces', False)):
             self.file_manager.write(file_id, 'python3 postProcessing/addVTPLoader.py ')
             for field in self.properties['iso_surfaces']['flow_variable']:
                 self.file_manager.write(file_id, 'isoSurface_' + field + ' ')
@@ -72,11 +106,12 @@ class WriteUtilityScripts:
             for item in self.properties['post_processing']['python_script']:
                 src = item['script']
                 dst = os.path.join(self.properties['file_properties']['path'], 'postProcessing')
-                distutils.file_util.copy_file(src, dst)
+                self.file_manager.create_directory('postProcessing')
+                self.file_manager.copy_file(src, os.path.join(dst, os.path.basename(src)))
                 self.file_manager.write(file_id, 'python3 postProcessing/' + os.path.basename(src) + '\n')
                 for requires in item['requires']:
                     src = requires
-                    distutils.file_util.copy_file(src, dst)
+                    self.file_manager.copy_file(src, os.path.join(dst, os.path.basename(src)))
 
 
         self.file_manager.write(file_id, '\n')
@@ -85,7 +120,7 @@ class WriteUtilityScripts:
         self.file_manager.close_file(file_id)
 
     def write_all_clean_file(self):
-        file_id = self.file_manager.create_file('', 'Allclean')
+        file_id = self.file_manager.create_file('', 'Allclean', executable=True)
         self.file_manager.write(file_id, '# !/bin/sh\n')
         self.file_manager.write(file_id, 'cd "${0%/*}" || exit  # Run from this directory\n')
         self.file_manager.write(file_id,
@@ -102,15 +137,37 @@ class WriteUtilityScripts:
         self.file_manager.close_file(file_id)
 
     def copy_residual_plotting_script(self):
-        if not os.path.exists(os.path.join(self.properties['file_properties']['path'], 'postProcessing')):
-            os.makedirs(os.path.join(self.properties['file_properties']['path'], 'postProcessing'))
-        src = os.path.join('examples', 'scripts', 'userDefined', 'postProcessing', 'plotResiduals.py')
-        dst = os.path.join(self.properties['file_properties']['path'], 'postProcessing')
-        distutils.file_util.copy_file(src, dst)
+        self.file_manager.create_directory('postProcessing')
+        src = os.path.join(POST_PROCESSING_SCRIPTS, 'plotResiduals.py')
+        dst = os.path.join(self.properties['file_properties']['path'], 'postProcessing', 'plotResiduals.py')
+        self.file_manager.copy_file(src, dst)
+
+    def copy_monitoring_script(self):
+        # not called by the Allrun script, but run alongside the solver to follow the residuals and coefficients
+        self.file_manager.create_directory('postProcessing')
+        src = os.path.join(POST_PROCESSING_SCRIPTS, 'monitorCase.py')
+        dst = os.path.join(self.properties['file_properties']['path'], 'postProcessing', 'monitorCase.py')
+        self.file_manager.copy_file(src, dst)
+
+    def copy_results_loader_script(self):
+        # python module used by post-processing scripts to load (and cache) the output of the function objects
+        self.file_manager.create_directory('postProcessing')
+        src = os.path.join(POST_PROCESSING_SCRIPTS, 'loadResults.py')
+        dst = os.path.join(self.properties['file_properties']['path'], 'postProcessing', 'loadResults.py')
+        self.file_manager.copy_file(src, dst)
+
+    def copy_probe_packing_script(self):
+        # packs the output of the probes, copied whenever probes are written so that it can also be run by hand
+        if not (self.properties['point_probes']['write_point_probes'] or
+                self.properties['line_probes']['write_line_probes']):
+            return
+        self.file_manager.create_directory('postProcessing')
+        src = os.path.join(POST_PROCESSING_SCRIPTS, 'packProbes.py')
+        dst = os.path.join(self.properties['file_properties']['path'], 'postProcessing', 'packProbes.py')
+        self.file_manager.copy_file(src, dst)
 
     def copy_PVD_loader_script(self):
-        if not os.path.exists(os.path.join(self.properties['file_properties']['path'], 'postProcessing')):
-            os.makedirs(os.path.join(self.properties['file_properties']['path'], 'postProcessing'))
-        src = os.path.join('examples', 'scripts', 'userDefined', 'postProcessing', 'addVTPLoader.py')
-        dst = os.path.join(self.properties['file_properties']['path'], 'postProcessing')
-        distutils.file_util.copy_file(src, dst)
+        self.file_manager.create_directory('postProcessing')
+        src = os.path.join(POST_PROCESSING_SCRIPTS, 'addVTPLoader.py')
+        dst = os.path.join(self.properties['file_properties']['path'], 'postProcessing', 'addVTPLoader.py')
+        self.file_manager.copy_file(src, dst)
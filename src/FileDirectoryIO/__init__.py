@@ -1,3 +1,26 @@
-from .FileManager import FileManager
-from .ScreenOutput import ScreenOutput
-from .WriteUtilityScripts import WriteUtilityScripts
+# the classes of this package are imported when they are first used (PEP 562), so that importing a single module
+# (e.g. the Profiler at start-up) does not import the file manager, the mesh store and the archive backends. The values
+# are the modules defining the classes. Once a module of the same name as its class (e.g. FileManager) has been
+# imported, the package refers to the module, so the case generator imports the classes from their modules
+__exports = {
+    'FileManager': 'FileManager',
+    'ScreenOutput': 'ScreenOutput',
+    'WriteUtilityScripts': 'WriteUtilityScripts',
+    'Profiler': 'Profiler',
+    'DiskBackend': 'OutputBackend',
+    'MemoryBackend': 'OutputBackend',
+    'ArchiveBackend': 'OutputBackend',
+    'DiskFootprint': 'DiskFootprint',
+}
+
+__all__ = list(__exports)
+
+
+def __getattr__(name):
+    if name not in __exports:
+        raise AttributeError('module ' + __name__ + ' has no attribute ' + name)
+    import importlib
+    value = getattr(importlib.import_module('.' + __exports[name], __name__), name)
+    globals()[name] = value
+    return value
+
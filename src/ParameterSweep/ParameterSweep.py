@@ -0,0 +1,176 @@
+import os
+import copy
+import json
+import time
+import random
+import itertools
+import concurrent.futures
+import input.CaseProperties as CaseProperties
+import src.Checker as Checker
+from src.FileDirectoryIO.Profiler import Profiler
+
+
+class ParameterSweep:
+    def __init__(self, path_to_sweep_file, number_of_workers=None):
+        with open(path_to_sweep_file, 'r') as json_file:
+            self.sweep = json.load(json_file)
+
+        # the base case is either read from a json file (written with the --output option) or taken from the
+        # properties specified in input/CaseProperties.py
+        if 'base_case' in self.sweep:
+            with open(self.sweep['base_case'], 'r') as json_file:
+                self.base_properties = json.load(json_file)
+        else:
+            self.base_properties = CaseProperties.CaseProperties().properties
+
+        if 'run_directory' in self.sweep:
+            self.base_properties['file_properties']['run_directory'] = self.sweep['run_directory']
+
+        if number_of_workers is None:
+            number_of_workers = self.sweep.get('workers', os.cpu_count())
+        self.number_of_workers = max(1, number_of_workers)
+
+    def expand(self):
+        sweep_type = self.sweep.get('type', 'cartesian')
+        axes = self.sweep['axes']
+        if sweep_type == 'cartesian':
+            samples = list(itertools.product(*[self.__get_axis_values(axis) for axis in axes]))
+        elif sweep_type == 'list':
+            samples = self.__zip_axis_values(axes)
+        elif sweep_type == 'latin_hypercube':
+            samples = self.__latin_hypercube_samples(axes)
+        else:
+            raise Exception(f'Unknown sweep type {sweep_type}, use either cartesian, list or latin_hypercube')
+
+        base_name = self.base_properties['file_properties']['case_name']
+        default_name = base_name + '_{index:0' + str(len(str(len(samples) - 1))) + 'd}'
+        name_template = self.sweep.get('case_name', default_name)
+
+        cases = []
+        for index, sample in enumerate(samples):
+            properties = copy.deepcopy(self.base_properties)
+            parameters = {}
+            for axis, value in zip(axes, sample):
+                self.__set_property(properties, axis['path'], value)
+                parameters[axis.get('name', axis['path'])] = value
+
+            name_arguments = {key: value for key, value in parameters.items() if key.isidentifier()}
+            properties['file_properties']['case_name'] = name_template.format(index=index, **name_arguments)
+
+            case_properties_handler = CaseProperties.CaseProperties()
+            properties = case_properties_handler.get_case_properties_from_dictionary(properties)
+            cases.append({'index': index, 'parameters': parameters, 'properties': properties})
+        return cases
+
+    def run(self, generate_case, profiler=None):
+        # if a profiler is given, the stages of all cases are profiled and added to it
+        cases = self.expand()
+        number_of_cases = len(cases)
+        width = len(str(number_of_cases))
+        print('Generating ' + str(number_of_cases) + ' cases using ' + str(self.number_of_workers) + ' processes\n')
+
+        start = time.perf_counter()
+        results = []
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.number_of_workers) as executor:
+            futures = [executor.submit(_generate_single_case, generate_case, case, profiler is not None)
+                       for case in cases]
+            for count, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+                result = future.result()
+                if profiler is not None:
+                    profiler.add_stages(result.pop('profile'), result['case_name'])
+                results.append(result)
+                status = 'ok    ' if result['success'] else 'FAILED'
+                print('[' + str(count).rjust(width) + '/' + str(number_of_cases) + '] ' + status + ' ' +
+                      result['case_name'] + ' (' + '{:.3f}'.format(result['elapsed']) + ' s)')
+                if not result['success']:
+                    print('    ' + result['message'].strip().replace('\n', '\n    '))
+        elapsed = time.perf_counter() - start
+
+        results.sort(key=lambda r: r['index'])
+        for result, case in zip(results, cases):
+            result['parameters'] = case['parameters']
+        self.__write_summary(results)
+
+        number_of_failures = sum(1 for result in results if not result['success'])
+        print('\nGenerated ' + str(number_of_cases - number_of_failures) + ' of ' + str(number_of_cases) +
+              ' cases in ' + '{:.2f}'.format(elapsed) + ' s (' + str(number_of_failures) + ' failed)')
+        return number_of_failures == 0
+
+    def __write_summary(self, results):
+        run_directory = self.base_properties['file_properties']['run_directory']
+        if run_directory != '' and not os.path.exists(run_directory):
+            os.makedirs(run_directory)
+        with open(os.path.join(run_directory, 'sweep_summary.json'), 'w') as json_file:
+            json.dump(results, json_file, indent=4)
+
+    def __get_axis_values(self, axis):
+        if 'values' in axis:
+            return axis['values']
+        elif 'linspace' in axis:
+            start, stop, number_of_samples = axis['linspace']
+            if number_of_samples == 1:
+                return [start]
+            step = (stop - start) / (number_of_samples - 1)
+            return [start + i * step for i in range(0, number_of_samples)]
+        else:
+            raise Exception(f'Axis {axis["path"]} needs to specify either values or linspace')
+
+    def __zip_axis_values(self, axes):
+        values = [self.__get_axis_values(axis) for axis in axes]
+        if len(set(len(v) for v in values)) != 1:
+            raise Exception('All axes of a list sweep need to have the same number of values')
+        return list(zip(*values))
+
+    def __latin_hypercube_samples(self, axes):
+        # divide each axis into equally sized strata, draw one sample per stratum and shuffle the strata
+        # independently for each axis so that every stratum is sampled exactly once per axis
+        number_of_samples = self.sweep['samples']
+        generator = random.Random(self.sweep.get('seed', None))
+        columns = []
+        for axis in axes:
+            lower, upper = axis['bounds']
+            strata = list(range(0, number_of_samples))
+            generator.shuffle(strata)
+            columns.append([lower + (upper - lower) * (stratum + generator.random()) / number_of_samples
+                            for stratum in strata])
+        return list(zip(*columns))
+
+    def __set_property(self, properties, path, value):
+        # only existing properties can be swept, so that a misspelt path fails instead of being added unused
+        keys = [int(key) if key.isdigit() else key for key in path.split('/')]
+        entry = properties
+        try:
+            for key in keys[:-1]:
+                entry = entry[key]
+            entry[keys[-1]]
+        except (KeyError, IndexError, TypeError):
+            raise Exception(f'Property path {path} does not exist in the base case properties')
+        entry[keys[-1]] = value
+
+
+def _generate_single_case(generate_case, case, profile=False):
+    properties = case['properties']
+    result = {
+        'index': case['index'],
+        'case_name': properties['file_properties']['case_name'],
+        'path': properties['file_properties']['path'],
+        'success': True,
+        'message': '',
+    }
+    profiler = Profiler()
+    start = time.perf_counter()
+    try:
+        with profiler.stage('checks'):
+            check_case = Checker.CheckCase(properties)
+            check_case.run_all_checks()
+        generate_case(properties, profiler)
+    except SystemExit as error:
+        result['success'] = False
+        result['message'] = str(error.code)
+    except Exception as error:
+        result['success'] = False
+        result['message'] = type(error).__name__ + ': ' + str(error)
+    result['elapsed'] = time.perf_counter() - start
+    if profile:
+        result['profile'] = profiler.get_stages()
+    return result
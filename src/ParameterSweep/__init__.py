@@ -0,0 +1 @@
+from .ParameterSweep import ParameterSweep
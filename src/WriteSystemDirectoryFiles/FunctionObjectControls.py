@@ -0,0 +1,160 @@
+from functools import reduce
+from math import gcd
+from input import GlobalVariables as Parameters
+
+
+class FunctionObjectControls:
+    # central scheduling policy of the function objects written by the case generator. Each function object has its own
+    # default write schedule (e.g. every time step for the force coefficients, every write time for yPlus), which can be
+    # overwritten for all function objects (default) or for individual ones (function_objects, keyed by the name of the
+    # function object) in the function_object_controls. Function objects are only executed when they write, unless an
+    # execute control is given. Derived fields (e.g. Q or vorticity) are computed whenever they are written or sampled
+    # by probes or surfaces, instead of at every time step
+
+    keywords = {
+        Parameters.TIME_STEP: 'timeStep',
+        Parameters.RUN_TIME: 'runTime',
+        Parameters.ADJUSTABLE_RUN_TIME: 'adjustableRunTime',
+        Parameters.CPU_TIME: 'cpuTime',
+        Parameters.CLOCK_TIME: 'clockTime',
+        Parameters.WRITE_TIME: 'writeTime',
+    }
+
+    # names of the function objects (and the fields they compute) of the additional fields
+    additional_fields = {Parameters.Q: 'Q', Parameters.LAMBDA_2: 'Lambda2', Parameters.VORTICITY: 'vorticity',
+                         Parameters.ENSTROPHY: 'enstrophy'}
+
+    def __init__(self, properties):
+        self.properties = properties
+        function_object_controls = properties.get('function_object_controls', {})
+        self.default_controls = function_object_controls.get('default', {})
+        self.function_object_controls = function_object_controls.get('function_objects', {})
+
+    def get_controls(self, name, write_control=Parameters.WRITE_TIME, write_interval=None):
+        # returns the controls of the function object as a dictionary with the keys of the function_object_controls,
+        # where the write control and interval given here are the defaults of the function object
+        controls = {'execute_control': None, 'execute_interval': None, 'write_control': write_control,
+                    'write_interval': write_interval, 'time_start': None, 'time_end': None}
+        for user_controls in [self.default_controls, self.function_object_controls.get(name, {})]:
+            # an interval belongs to the control it was given for
+            if 'write_control' in user_controls:
+                controls['write_interval'] = None
+            if 'execute_control' in user_controls:
+                controls['execute_interval'] = None
+            controls.update(user_controls)
+
+        if controls['execute_control'] is None:
+            controls['execute_control'] = controls['write_control']
+            controls['execute_interval'] = controls['write_interval']
+        for control, interval in [('execute_control', 'execute_interval'), ('write_control', 'write_interval')]:
+            if controls[control] == Parameters.TIME_STEP and controls[interval] is None:
+                controls[interval] = 1
+        return controls
+
+    def get_sampling_controls(self, name, write_interval):
+        # controls of probes and surfaces, which are written every write_interval time steps or at every write time if
+        # write_interval is None
+        if write_interval is None:
+            return self.get_controls(name)
+        return self.get_controls(name, Parameters.TIME_STEP, write_interval)
+
+    def get_derived_field_controls(self, name, field):
+        # derived fields are written at every write time by default. Unless an execute control is given, they are
+        # computed whenever they are written or sampled, combining the schedules into a single execute control
+        controls = self.get_controls(name)
+        if 'execute_control' in dict(self.default_controls, **self.function_object_controls.get(name, {})):
+            return controls
+
+        schedules = {(controls['write_control'], controls['write_interval'])}
+        for sampler_name, fields, write_interval in self.get_samplers():
+            if field in fields:
+                sampler_controls = self.get_sampling_controls(sampler_name, write_interval)
+                schedules.add((sampler_controls['write_control'], sampler_controls['write_interval']))
+        controls['execute_control'], controls['execute_interval'] = self.__combine_schedules(schedules)
+        return controls
+
+    def get_derived_fields(self):
+        # returns the function objects computing a field as a list of (name, field)
+        derived_fields = []
+        if self.properties['additional_fields']['write_additional_fields']:
+            for field in self.properties['additional_fields']['fields']:
+                if field in self.additional_fields:
+                    derived_fields.append((self.additional_fields[field], self.additional_fields[field]))
+        if self.properties['dimensionless_coefficients']['write_pressure_coefficient']:
+            derived_fields.append(('pressureCoefficient', 'cp'))
+        derived_fields.append(('yPlus', 'yPlus'))
+        if self.properties['flow_properties']['flow_type'] == Parameters.compressible:
+            derived_fields.append(('MachNo', 'Ma'))
+        return derived_fields
+
+    def get_samplers(self):
+        # returns the function objects sampling fields as a list of (name, fields, write interval), where a write
+        # interval of None samples the fields at every write time
+        from src.WriteSystemDirectoryFiles.WriteLineProbes import WriteLineProbes
+        from src.WriteSystemDirectoryFiles.WriteSurfaces import WriteSurfaces
+        samplers = []
+        point_probes = self.properties['point_probes']
+        if point_probes['write_point_probes']:
+            samplers.append(('point_probes', point_probes['variables_to_monitor'],
+                             1 if point_probes['output_probe_at_every_timestep'] else None))
+        if self.properties['line_probes']['write_line_probes']:
+            for name, write_interval, _ in WriteLineProbes(self.properties, None).get_function_objects():
+                samplers.append((name, self.properties['line_probes']['variables_to_monitor'], write_interval))
+
+        surfaces = WriteSurfaces(self.properties, None)
+        if self.properties['cutting_planes'].get('group_surfaces', False):
+            for name, write_interval, grouped_surfaces in surfaces.get_function_objects():
+                samplers.append((name, [field for _, fields, _, _ in grouped_surfaces for field in fields],
+                                 write_interval))
+            return samplers
+        if self.properties['cutting_planes']['write_cutting_planes']:
+            for plane in self.properties['cutting_planes']['location']:
+                samplers.append((plane['name'], surfaces.cutting_planes.get_fields(),
+                                 surfaces.cutting_planes.get_write_interval()))
+        if self.properties['iso_surfaces']['write_iso_surfaces']:
+            for index in range(0, len(self.properties['iso_surfaces']['flow_variable'])):
+                samplers.append((surfaces.iso_surfaces.get_surface_name(index), surfaces.iso_surfaces.get_fields(index),
+                                 surfaces.iso_surfaces.get_write_interval()))
+        return samplers
+
+    def get_function_object_names(self):
+        names = [name for name, _ in self.get_derived_fields()]
+        if self.properties['dimensionless_coefficients']['write_force_coefficients']:
+            names.append('forceCoeffs')
+        names.append('residuals')
+        names.extend(name for name, _, _ in self.get_samplers())
+        return names
+
+    def format_controls(self, controls, width=16):
+        # returns the controls as entries of the function object's dictionary, with the values aligned at width. The
+        # execute control is only written if it differs from the default of OpenFOAM (executing at every time step)
+        entries = []
+        if (controls['execute_control'], controls['execute_interval']) != (Parameters.TIME_STEP, 1):
+            entries.append(('executeControl', self.keywords[controls['execute_control']]))
+            if controls['execute_control'] != Parameters.WRITE_TIME:
+                entries.append(('executeInterval', str(controls['execute_interval'])))
+        entries.append(('writeControl', self.keywords[controls['write_control']]))
+        if controls['write_control'] != Parameters.WRITE_TIME:
+            entries.append(('writeInterval', str(controls['write_interval'])))
+        if controls['time_start'] is not None:
+            entries.append(('timeStart', str(controls['time_start'])))
+        if controls['time_end'] is not None:
+            entries.append(('timeEnd', str(controls['time_end'])))
+        return ''.join('    ' + keyword.ljust(width) + value + ';\n' for keyword, value in entries)
+
+    def __combine_schedules(self, schedules):
+        # returns a single (control, interval) which executes at least at each of the schedules. Write times coincide
+        # with time steps if the fields are written every write_frequency time steps, otherwise schedules based on time
+        # can only be combined by executing at every time step
+        if len(schedules) == 1:
+            return schedules.pop()
+        solver_properties = self.properties['solver_properties']
+        intervals = []
+        for control, interval in schedules:
+            if control == Parameters.TIME_STEP:
+                intervals.append(int(interval))
+            elif control == Parameters.WRITE_TIME and solver_properties['write_control'] == Parameters.TIME_STEP:
+                intervals.append(int(solver_properties['write_frequency']))
+            else:
+                return Parameters.TIME_STEP, 1
+        return Parameters.TIME_STEP, reduce(gcd, intervals)
@@ -53,11 +53,7 @@ class ControlDictFile:
                                 str(self.properties['solver_properties']['write_frequency']) + ';\n\n')
         self.file_manager.write(file_id, 'purgeWrite        ' +
                                 str(self.properties['solver_properties']['purge_write']) + ';\n\n')
-        self.file_manager.write(file_id, 'writeFormat       ascii;\n\n')
-        self.file_manager.write(file_id, 'writePrecision    6;\n\n')
-        self.file_manager.write(file_id, 'writeCompression  off;\n\n')
-        self.file_manager.write(file_id, 'timeFormat        general;\n\n')
-        self.file_manager.write(file_id, 'timePrecision     6;\n\n')
+        self.__write_io_settings(file_id)
         self.file_manager.write(file_id, 'runTimeModifiable true;\n\n')
         self.file_manager.write(file_id, 'functions\n')
         self.file_manager.write(file_id, '{\n')
@@ -73,7 +69,12 @@ class ControlDictFile:
             self.file_manager.write(file_id, '    #include "include/pointProbes"\n')
         if self.properties['line_probes']['write_line_probes']:
             self.file_manager.write(file_id, '    #include "include/lineProbes"\n')
-        if self.properties['cutting_planes']['write_cutting_planes']:
+        if self.properties['cutting_planes'].get('group_surfaces', False):
+            if (self.properties['cutting_planes']['write_cutting_planes'] or
+                    self.properties['iso_surfaces']['write_iso_surfaces']):
+                # included after the additional fields, which may be used for the iso-surfaces
+                self.file_manager.write(file_id, '    #include "include/surfaces"\n')
+        elif self.properties['cutting_planes']['write_cutting_planes']:
             self.file_manager.write(file_id, '    #include "include/cuttingPlanes"\n')
         self.file_manager.write(file_id, '    #include "include/yPlus"\n')
         self.file_manager.write(file_id, '    #include "include/residuals"\n')
@@ -89,11 +90,33 @@ class ControlDictFile:
                 self.file_manager.write_header(fo_id, 'dictionary', 'system', key)
                 self.file_manager.write(fo_id, '\n')
                 with open(value, 'r') as fo_to_copy:
-                    for line in fo_to_copy:
-                        self.file_manager.write(fo_id, line)
+                    self.file_manager.write(fo_id, fo_to_copy.read())
+                self.file_manager.close_file(fo_id)
 
         self.file_manager.write(file_id, '}\n')
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id,
                                 '// ************************************************************************* //\n')
         self.file_manager.close_file(file_id)
+
+    def __write_io_settings(self, file_id):
+        # io_properties may be missing in properties written by earlier versions, which always wrote ascii fields
+        io_properties = self.properties.get('io_properties', {})
+        if io_properties.get('write_format', Parameters.ASCII) == Parameters.BINARY:
+            self.file_manager.write(file_id, 'writeFormat       binary;\n\n')
+        else:
+            self.file_manager.write(file_id, 'writeFormat       ascii;\n\n')
+        self.file_manager.write(file_id, 'writePrecision    ' + str(io_properties.get('write_precision', 6)) + ';\n\n')
+        if io_properties.get('write_compression', False):
+            self.file_manager.write(file_id, 'writeCompression  on;\n\n')
+        else:
+            self.file_manager.write(file_id, 'writeCompression  off;\n\n')
+        self.file_manager.write(file_id, 'timeFormat        general;\n\n')
+        self.file_manager.write(file_id, 'timePrecision     ' + str(io_properties.get('time_precision', 6)) + ';\n\n')
+
+        # the file handler is read from the case's controlDict by all utilities (e.g. decomposePar) and the solver
+        file_handler = io_properties.get('file_handler', Parameters.UNCOLLATED)
+        if file_handler == Parameters.COLLATED:
+            self.file_manager.write(file_id, 'OptimisationSwitches\n{\n    fileHandler collated;\n}\n\n')
+        elif file_handler == Parameters.MASTER_UNCOLLATED:
+            self.file_manager.write(file_id, 'OptimisationSwitches\n{\n    fileHandler masterUncollated;\n}\n\n')
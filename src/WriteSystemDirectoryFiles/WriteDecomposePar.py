@@ -1,16 +1,116 @@
+import os
+from input import GlobalVariables as Parameters
+
+
 class WriteDecomposeParDictionary:
     def __init__(self, properties, file_manager):
         self.properties = properties
         self.file_manager = file_manager
 
+    def resolve_decomposition(self):
+        # determine the number of processors and the decomposition method before any file is written, so that all
+        # files depending on them (e.g. the Allrun script) are consistent with the decomposeParDict
+        parallel_properties = self.properties['parallel_properties']
+        number_of_processors = parallel_properties['number_of_processors']
+        method = parallel_properties.get('decomposition_method', Parameters.SCOTCH)
+        if number_of_processors != Parameters.AUTO and method == Parameters.SCOTCH:
+            return
+
+        number_of_cells, structured_cells, bounding_box_min, bounding_box_max = self.__get_mesh_size()
+
+        if number_of_processors == Parameters.AUTO:
+            cells_per_processor = parallel_properties.get('cells_per_processor', 50000)
+            number_of_processors = max(1, int(round(number_of_cells / cells_per_processor)))
+            parallel_properties['number_of_processors'] = number_of_processors
+            if number_of_processors == 1:
+                # not worth decomposing the mesh, run the case in serial instead
+                parallel_properties['run_in_parallel'] = False
+
+        if method == Parameters.AUTO:
+            method = Parameters.HIERARCHICAL if structured_cells is not None else Parameters.SCOTCH
+
+        if method == Parameters.HIERARCHICAL or method == Parameters.SIMPLE:
+            # subdivide the domain according to its number of cells (or extent, if the mesh is not structured) in
+            # each direction, so that the number of faces on processor boundaries is minimised
+            if structured_cells is not None:
+                size = structured_cells
+            else:
+                size = [bounding_box_max[i] - bounding_box_min[i] for i in range(3)]
+            subdomains = self.__get_subdomains(number_of_processors, size, structured_cells is not None)
+            if subdomains is None:
+                method = Parameters.SCOTCH
+            else:
+                parallel_properties['decomposition_subdomains'] = subdomains
+
+        parallel_properties['decomposition_method'] = method
+
     def write_decompose_par_dict(self):
+        method = self.properties['parallel_properties'].get('decomposition_method', Parameters.SCOTCH)
         file_id = self.file_manager.create_file('system', 'decomposeParDict')
         self.file_manager.write_header(file_id, 'dictionary', 'system', 'decomposeParDict')
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id, 'numberOfSubdomains ' +
                                 str(self.properties['parallel_properties']['number_of_processors']) + ';\n')
         self.file_manager.write(file_id, '\n')
-        self.file_manager.write(file_id, 'method          scotch;\n')
+        if method == Parameters.HIERARCHICAL or method == Parameters.SIMPLE:
+            method_name = 'hierarchical' if method == Parameters.HIERARCHICAL else 'simple'
+            subdomains = self.properties['parallel_properties']['decomposition_subdomains']
+            self.file_manager.write(file_id, 'method          ' + method_name + ';\n')
+            self.file_manager.write(file_id, '\n')
+            self.file_manager.write(file_id, method_name + 'Coeffs\n')
+            self.file_manager.write(file_id, '{\n')
+            self.file_manager.write(file_id, '    n               (' + ' '.join(str(n) for n in subdomains) + ');\n')
+            self.file_manager.write(file_id, '    delta           0.001;\n')
+            if method == Parameters.HIERARCHICAL:
+                self.file_manager.write(file_id, '    order           xyz;\n')
+            self.file_manager.write(file_id, '}\n')
+        else:
+            self.file_manager.write(file_id, 'method          scotch;\n')
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id,
                                 '// ************************************************************************* //\n')
+        self.file_manager.close_file(file_id)
+
+    def __get_mesh_size(self):
+        # returns the number of cells, the number of cells in each direction (if the mesh is a structured box, None
+        # otherwise) and the bounding box of the mesh
+        file_properties = self.properties['file_properties']
+        if file_properties['mesh_treatment'] == Parameters.POLY_MESH:
+            from src.FileDirectoryIO.PolyMeshReader import PolyMeshReader
+            summary = PolyMeshReader(file_properties['polymesh_directory']).get_summary()
+            return (summary['n_cells'], summary.get('structured_cells'), summary['bounding_box_min'],
+                    summary['bounding_box_max'])
+        else:
+            from src.FileDirectoryIO.BlockMeshDictReader import BlockMeshDictReader
+            block_mesh_dict = BlockMeshDictReader(os.path.join(file_properties['blockmeshdict_directory'],
+                                                               'blockMeshDict'))
+            bounding_box_min, bounding_box_max = block_mesh_dict.get_bounding_box()
+            structured_cells = block_mesh_dict.get_structured_cells()
+            if file_properties['mesh_treatment'] == Parameters.BLOCK_MESH_AND_SNAPPY_HEX_MESH_DICT:
+                # the background mesh is refined by snappyHexMesh, so it is no longer a structured box
+                structured_cells = None
+            return block_mesh_dict.get_number_of_cells(), structured_cells, bounding_box_min, bounding_box_max
+
+    def __get_subdomains(self, number_of_processors, size, structured):
+        # find the split n = (nx, ny, nz) with nx * ny * nz = number of processors which results in the smallest
+        # processor boundaries. For structured meshes, size is the number of cells, otherwise the extent of the domain
+        best_subdomains = None
+        best_interface = None
+        for nx in range(1, number_of_processors + 1):
+            if number_of_processors % nx != 0:
+                continue
+            for ny in range(1, number_of_processors // nx + 1):
+                if (number_of_processors // nx) % ny != 0:
+                    continue
+                nz = number_of_processors // (nx * ny)
+                subdomains = [nx, ny, nz]
+                if structured and any(subdomains[i] > size[i] for i in range(3)):
+                    continue
+                if any(size[i] <= 0 and subdomains[i] > 1 for i in range(3)):
+                    continue
+                interface = ((nx - 1) * size[1] * size[2] + (ny - 1) * size[0] * size[2] +
+                             (nz - 1) * size[0] * size[1])
+                if best_interface is None or interface < best_interface:
+                    best_subdomains = subdomains
+                    best_interface = interface
+        return best_subdomains
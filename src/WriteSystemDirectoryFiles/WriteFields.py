@@ -1,10 +1,12 @@
 from input import GlobalVariables as Parameters
+from src.WriteSystemDirectoryFiles.FunctionObjectControls import FunctionObjectControls
 
 
 class WriteFields:
     def __init__(self, properties, file_manager):
         self.file_manager = file_manager
         self.properties = properties
+        self.controls = FunctionObjectControls(properties)
 
     def write_field(self):
         file_id = self.file_manager.create_file('system/include', 'fields')
@@ -22,7 +24,8 @@ class WriteFields:
                 elif field == Parameters.ENSTROPHY:
                     name = 'enstrophy'
                 self.__write_custom_fields(file_id, name)
-        if self.properties['iso_surfaces']['write_iso_surfaces']:
+        if (self.properties['iso_surfaces']['write_iso_surfaces'] and
+                not self.properties['cutting_planes'].get('group_surfaces', False)):
             self.file_manager.write(file_id, '// include iso-surface writing here (instead of in the controlDict)\n')
             self.file_manager.write(file_id, '// in case any of the additional computed fields above (if any)\n')
             self.file_manager.write(file_id, '// are used to generate iso-surfaces\n')
@@ -30,6 +33,7 @@ class WriteFields:
             self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id,
                                 '// ************************************************************************* //\n')
+        self.file_manager.close_file(file_id)
 
     def __write_custom_fields(self, file_id, field_name):
 
@@ -38,7 +42,8 @@ class WriteFields:
         self.file_manager.write(file_id, '    type            ' + field_name + ';\n')
         self.file_manager.write(file_id, '    libs            (fieldFunctionObjects);\n')
         self.file_manager.write(file_id, '\n')
-        self.file_manager.write(file_id, '    writeControl    writeTime;\n')
+        controls = self.controls.get_derived_field_controls(field_name, field_name)
+        self.file_manager.write(file_id, self.controls.format_controls(controls))
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id, '    log             no;\n')
         self.file_manager.write(file_id, '}\n')
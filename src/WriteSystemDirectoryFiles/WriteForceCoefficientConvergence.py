@@ -60,6 +60,7 @@ class WriteForceCoefficientConvergence:
         self.file_manager.write(file_id, '}\n')
         self.file_manager.write(file_id,
                                 '// ************************************************************************* //\n')
+        self.file_manager.close_file(file_id)
 
     def __quantity_ID_to_string(self, quantity):
         if quantity == Parameters.C_L:
@@ -1,11 +1,13 @@
 from input import GlobalVariables as Parameters
 from math import sin, cos, pi
+from src.WriteSystemDirectoryFiles.FunctionObjectControls import FunctionObjectControls
 
 
 class WriteForceCoefficients:
     def __init__(self, properties, file_manager):
         self.file_manager = file_manager
         self.properties = properties
+        self.controls = FunctionObjectControls(properties)
 
     def write_force_coefficients(self):
         RAD_TO_DEG = pi / 180
@@ -45,8 +47,8 @@ class WriteForceCoefficients:
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id, '    libs            (forces);\n')
         self.file_manager.write(file_id, '\n')
-        self.file_manager.write(file_id, '    writeControl    timeStep;\n')
-        self.file_manager.write(file_id, '    timeInterval    1;\n')
+        controls = self.controls.get_controls('forceCoeffs', Parameters.TIME_STEP, 1)
+        self.file_manager.write(file_id, self.controls.format_controls(controls))
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id, '    log             yes;\n')
         self.file_manager.write(file_id, '\n')
@@ -80,3 +82,4 @@ class WriteForceCoefficients:
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id,
                                 '// ************************************************************************* //\n')
+        self.file_manager.close_file(file_id)
@@ -1,7 +1,11 @@
+from src.WriteSystemDirectoryFiles.FunctionObjectControls import FunctionObjectControls
+
+
 class WriteIsoSurfaces:
     def __init__(self, properties, file_manager):
         self.file_manager = file_manager
         self.properties = properties
+        self.controls = FunctionObjectControls(properties)
 
     def write_iso_surfaces(self):
         file_id = self.file_manager.create_file('system/include', 'isoSurfaces')
@@ -11,12 +15,33 @@ class WriteIsoSurfaces:
             self.__write_iso_surfaces_for_field_at_index(file_id, index)
         self.file_manager.write(file_id,
                                 '// ************************************************************************* //\n')
+        self.file_manager.close_file(file_id)
 
-    def __write_iso_surfaces_for_field_at_index(self, file_id, index):
+    def get_fields(self, index):
+        return ([self.properties['iso_surfaces']['flow_variable'][index]] +
+                self.properties['iso_surfaces']['additional_field_to_write'])
+
+    def get_write_interval(self):
+        # number of time steps between two outputs, None to write the iso-surfaces at every write time
+        return 1 if self.properties['iso_surfaces']['output_iso_surfaces_at_every_timestep'] else None
+
+    def get_surface_name(self, index):
+        return 'isoSurface_' + self.properties['iso_surfaces']['flow_variable'][index]
+
+    def write_surface(self, file_id, index):
+        # writes the iso-surface of the field at index as an entry of the surfaces of a surfaces function object
         field = self.properties['iso_surfaces']['flow_variable'][index]
         value = self.properties['iso_surfaces']['iso_value'][index]
+        self.file_manager.write(file_id, '        ' + self.get_surface_name(index) + '\n')
+        self.file_manager.write(file_id, '        {\n')
+        self.file_manager.write(file_id, '            type          isoSurface;\n')
+        self.file_manager.write(file_id, '            isoField      ' + field + ';\n')
+        self.file_manager.write(file_id, '            isoValue      ' + str(value) + ';\n')
+        self.file_manager.write(file_id, '            interpolate   true;\n')
+        self.file_manager.write(file_id, '        }\n')
 
-        self.file_manager.write(file_id, 'isoSurface_' + field + '\n')
+    def __write_iso_surfaces_for_field_at_index(self, file_id, index):
+        self.file_manager.write(file_id, self.get_surface_name(index) + '\n')
         self.file_manager.write(file_id, '{\n')
         self.file_manager.write(file_id, '    type                  surfaces;\n')
         self.file_manager.write(file_id, '    libs                  (sampling);\n')
@@ -25,30 +50,20 @@ class WriteIsoSurfaces:
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id, '    surfaceFormat         vtk;\n')
         self.file_manager.write(file_id, '\n')
-        if self.properties['iso_surfaces']['output_iso_surfaces_at_every_timestep']:
-            self.file_manager.write(file_id, '    writeControl          timeStep;\n')
-            self.file_manager.write(file_id, '    writeInterval         1;\n')
-        else:
-            self.file_manager.write(file_id, '    writeControl          writeTime;\n')
+        controls = self.controls.get_sampling_controls(self.get_surface_name(index), self.get_write_interval())
+        self.file_manager.write(file_id, self.controls.format_controls(controls, width=22))
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id, '    log                   no;\n')
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id, '    surfaces\n')
         self.file_manager.write(file_id, '    {\n')
-        self.file_manager.write(file_id, '        isoSurface_' + field + '\n')
-        self.file_manager.write(file_id, '        {\n')
-        self.file_manager.write(file_id, '            type          isoSurface;\n')
-        self.file_manager.write(file_id, '            isoField      ' + field + ';\n')
-        self.file_manager.write(file_id, '            isoValue      ' + str(value) + ';\n')
-        self.file_manager.write(file_id, '            interpolate   true;\n')
-        self.file_manager.write(file_id, '        }\n')
+        self.write_surface(file_id, index)
         self.file_manager.write(file_id, '    }\n')
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id, '    fields\n')
         self.file_manager.write(file_id, '    (\n')
-        self.file_manager.write(file_id, '        ' + field + '\n')
-        for additional_field in self.properties['iso_surfaces']['additional_field_to_write']:
-            self.file_manager.write(file_id, '        ' + additional_field + '\n')
+        for field in self.get_fields(index):
+            self.file_manager.write(file_id, '        ' + field + '\n')
         self.file_manager.write(file_id, '    );\n')
         self.file_manager.write(file_id, '}\n')
         self.file_manager.write(file_id, '\n')
@@ -1,53 +1,86 @@
+from input import GlobalVariables as Parameters
+from src.WriteSystemDirectoryFiles.FunctionObjectControls import FunctionObjectControls
+
+
 class WriteLineProbes:
     def __init__(self, properties, file_manager):
         self.file_manager = file_manager
         self.properties = properties
+        self.controls = FunctionObjectControls(properties)
 
     def write_line_probes(self):
         file_id = self.file_manager.create_file('system/include', 'lineProbes')
         self.file_manager.write_header(file_id, 'dictionary', 'system', 'sampling')
         self.file_manager.write(file_id, '\n')
-        for line in self.properties['line_probes']['location']:
-            self.file_manager.write(file_id, line['name'] + '\n')
-            self.file_manager.write(file_id, '{\n')
-            self.file_manager.write(file_id, '    type                  sets;\n')
-            self.file_manager.write(file_id, '    libs                  (sampling);\n')
-            self.file_manager.write(file_id, '\n')
-            self.file_manager.write(file_id, '    interpolationScheme   cellPoint;\n')
-            self.file_manager.write(file_id, '\n')
-            self.file_manager.write(file_id, '    setFormat             raw;\n')
-            self.file_manager.write(file_id, '\n')
-            if self.properties['line_probes']['output_probe_at_every_timestep']:
-                self.file_manager.write(file_id, '    writeControl    timeStep;\n')
-                self.file_manager.write(file_id, '    writeInterval   1;\n')
-            else:
-                self.file_manager.write(file_id, '    writeControl    writeTime;\n')
-            self.file_manager.write(file_id, '\n')
-            self.file_manager.write(file_id, '    log                   no;\n')
-            self.file_manager.write(file_id, '\n')
-            self.file_manager.write(file_id, '    sets\n')
-            self.file_manager.write(file_id, '    (\n')
-            self.file_manager.write(file_id, '        ' + line['name'] + '\n')
-            self.file_manager.write(file_id, '        {\n')
-            self.file_manager.write(file_id, '            type          uniform;\n')
-            self.file_manager.write(file_id, '            axis          xyz;\n')
-            self.file_manager.write(file_id, '            start         (' +
-                                    str(line['start'][0]) + ' ' + str(line['start'][1]) + ' ' + str(line['start'][2]) +
-                                    ');\n')
-            self.file_manager.write(file_id, '            end           (' +
-                                    str(line['end'][0]) + ' ' + str(line['end'][1]) + ' ' + str(line['end'][2]) +
-                                    ');\n')
-            self.file_manager.write(file_id, '            nPoints       ' +
-                                    str(self.properties['line_probes']['number_of_samples_on_line']) + ';\n')
-            self.file_manager.write(file_id, '        }\n')
-            self.file_manager.write(file_id, '    );\n')
-            self.file_manager.write(file_id, '\n')
-            self.file_manager.write(file_id, '    fields\n')
-            self.file_manager.write(file_id, '    (\n')
-            for variable in self.properties['line_probes']['variables_to_monitor']:
-                self.file_manager.write(file_id, '        ' + variable + '\n')
-            self.file_manager.write(file_id, '    );\n')
-            self.file_manager.write(file_id, '}\n')
-            self.file_manager.write(file_id, '\n')
+        for name, write_interval, lines in self.get_function_objects():
+            self.__write_function_object(file_id, name, write_interval, lines)
         self.file_manager.write(file_id,
                                 '// ************************************************************************* //\n')
+        self.file_manager.close_file(file_id)
+
+    def get_function_objects(self):
+        # returns the sampling function objects as a list of (name, write interval, lines), where a write interval of
+        # None writes the lines at every write time. Lines without write_interval are written according to
+        # output_probe_at_every_timestep
+        line_probes = self.properties['line_probes']
+        grouping = line_probes.get('grouping', Parameters.ONE_PER_LOCATION)
+        if grouping == Parameters.ONE_PER_LOCATION:
+            return [(line['name'], self.__get_write_interval(line.get('write_interval')), [line])
+                    for line in line_probes['location']]
+        elif grouping == Parameters.BY_FREQUENCY:
+            groups = {}
+            for line in line_probes['location']:
+                groups.setdefault(line.get('write_interval'), []).append(line)
+            return [('lineProbes' if write_interval is None else 'lineProbes_interval_' + str(write_interval),
+                     self.__get_write_interval(write_interval), lines) for write_interval, lines in groups.items()]
+        return [('lineProbes', self.__get_write_interval(None), line_probes['location'])]
+
+    def __get_write_interval(self, write_interval):
+        if write_interval is None and self.properties['line_probes']['output_probe_at_every_timestep']:
+            return 1
+        return write_interval
+
+    def __write_function_object(self, file_id, name, write_interval, lines):
+        self.file_manager.write(file_id, name + '\n')
+        self.file_manager.write(file_id, '{\n')
+        self.file_manager.write(file_id, '    type                  sets;\n')
+        self.file_manager.write(file_id, '    libs                  (sampling);\n')
+        self.file_manager.write(file_id, '\n')
+        self.file_manager.write(file_id, '    interpolationScheme   cellPoint;\n')
+        self.file_manager.write(file_id, '\n')
+        self.file_manager.write(file_id, '    setFormat             raw;\n')
+        self.file_manager.write(file_id, '\n')
+        controls = self.controls.get_sampling_controls(name, write_interval)
+        self.file_manager.write(file_id, self.controls.format_controls(controls))
+        self.file_manager.write(file_id, '\n')
+        self.file_manager.write(file_id, '    log                   no;\n')
+        self.file_manager.write(file_id, '\n')
+        self.file_manager.write(file_id, '    sets\n')
+        self.file_manager.write(file_id, '    (\n')
+        for line in lines:
+            self.__write_line(file_id, line)
+        self.file_manager.write(file_id, '    );\n')
+        self.file_manager.write(file_id, '\n')
+        self.file_manager.write(file_id, '    fields\n')
+        self.file_manager.write(file_id, '    (\n')
+        for variable in self.properties['line_probes']['variables_to_monitor']:
+            self.file_manager.write(file_id, '        ' + variable + '\n')
+        self.file_manager.write(file_id, '    );\n')
+        self.file_manager.write(file_id, '}\n')
+        self.file_manager.write(file_id, '\n')
+
+    def __write_line(self, file_id, line):
+        # the set is named after the line, so its output is named after the line regardless of the function object
+        self.file_manager.write(file_id, '        ' + line['name'] + '\n')
+        self.file_manager.write(file_id, '        {\n')
+        self.file_manager.write(file_id, '            type          uniform;\n')
+        self.file_manager.write(file_id, '            axis          xyz;\n')
+        self.file_manager.write(file_id, '            start         (' +
+                                str(line['start'][0]) + ' ' + str(line['start'][1]) + ' ' + str(line['start'][2]) +
+                                ');\n')
+        self.file_manager.write(file_id, '            end           (' +
+                                str(line['end'][0]) + ' ' + str(line['end'][1]) + ' ' + str(line['end'][2]) +
+                                ');\n')
+        self.file_manager.write(file_id, '            nPoints       ' +
+                                str(self.properties['line_probes']['number_of_samples_on_line']) + ';\n')
+        self.file_manager.write(file_id, '        }\n')
@@ -1,7 +1,11 @@
+from src.WriteSystemDirectoryFiles.FunctionObjectControls import FunctionObjectControls
+
+
 class WriteMachNumber:
     def __init__(self, properties, file_manager):
         self.properties = properties
         self.file_manager = file_manager
+        self.controls = FunctionObjectControls(properties)
 
     def write_mach_number(self):
         file_id = self.file_manager.create_file('system/include', 'MachNo')
@@ -11,8 +15,10 @@ class WriteMachNumber:
         self.file_manager.write(file_id, '{\n')
         self.file_manager.write(file_id, '    type            MachNo;\n')
         self.file_manager.write(file_id, '    libs            (fieldFunctionObjects);\n')
-        self.file_manager.write(file_id, '    writeControl    writeTime;\n')
+        controls = self.controls.get_derived_field_controls('MachNo', 'Ma')
+        self.file_manager.write(file_id, self.controls.format_controls(controls))
         self.file_manager.write(file_id, '}\n')
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id,
                                 '// ************************************************************************* //\n')
+        self.file_manager.close_file(file_id)
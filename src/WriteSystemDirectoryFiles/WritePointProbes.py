@@ -1,7 +1,11 @@
+from src.WriteSystemDirectoryFiles.FunctionObjectControls import FunctionObjectControls
+
+
 class WritePointProbes:
     def __init__(self, properties, file_manager):
         self.file_manager = file_manager
         self.properties = properties
+        self.controls = FunctionObjectControls(properties)
 
     def write_point_probes(self):
         file_id = self.file_manager.create_file('system/include', 'pointProbes')
@@ -12,11 +16,9 @@ class WritePointProbes:
         self.file_manager.write(file_id, '    type            probes;\n')
         self.file_manager.write(file_id, '    libs            (fieldFunctionObjects);\n')
         self.file_manager.write(file_id, '\n')
-        if self.properties['point_probes']['output_probe_at_every_timestep']:
-            self.file_manager.write(file_id, '    writeControl    timeStep;\n')
-            self.file_manager.write(file_id, '    writeInterval   1;\n')
-        else:
-            self.file_manager.write(file_id, '    writeControl    writeTime;\n')
+        write_interval = 1 if self.properties['point_probes']['output_probe_at_every_timestep'] else None
+        controls = self.controls.get_sampling_controls('point_probes', write_interval)
+        self.file_manager.write(file_id, self.controls.format_controls(controls))
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id, '    log             no;\n')
         self.file_manager.write(file_id, '\n')
@@ -36,3 +38,4 @@ class WritePointProbes:
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id,
                                 '// ************************************************************************* //\n')
+        self.file_manager.close_file(file_id)
@@ -1,7 +1,11 @@
+from src.WriteSystemDirectoryFiles.FunctionObjectControls import FunctionObjectControls
+
+
 class WritePressureCoefficient:
     def __init__(self, properties, file_manager):
         self.properties = properties
         self.file_manager = file_manager
+        self.controls = FunctionObjectControls(properties)
 
     def write_force_coefficients(self):
         velocity = ('(' + str(self.properties['flow_properties']['inlet_velocity'][0]) + ' ' +
@@ -15,7 +19,8 @@ class WritePressureCoefficient:
         self.file_manager.write(file_id, '    type            pressure;\n')
         self.file_manager.write(file_id, '    libs            (fieldFunctionObjects);\n')
         self.file_manager.write(file_id, '\n')
-        self.file_manager.write(file_id, '    writeControl    writeTime;\n')
+        controls = self.controls.get_derived_field_controls('pressureCoefficient', 'cp')
+        self.file_manager.write(file_id, self.controls.format_controls(controls))
         self.file_manager.write(file_id, '    mode            staticCoeff;\n')
         self.file_manager.write(file_id, '    result          cp;\n')
         self.file_manager.write(file_id, '\n')
@@ -27,3 +32,4 @@ class WritePressureCoefficient:
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id,
                                 '// ************************************************************************* //\n')
+        self.file_manager.close_file(file_id)
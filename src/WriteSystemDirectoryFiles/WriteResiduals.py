@@ -1,6 +1,12 @@
+from input import GlobalVariables as Parameters
+from src.WriteSystemDirectoryFiles.FunctionObjectControls import FunctionObjectControls
+
+
 class WriteResiduals:
-    def __init__(self, file_manager):
+    def __init__(self, properties, file_manager):
+        self.properties = properties
         self.file_manager = file_manager
+        self.controls = FunctionObjectControls(properties)
 
     def write_residuals(self):
         file_id = self.file_manager.create_file('system/include', 'residuals')
@@ -11,7 +17,11 @@ class WriteResiduals:
         self.file_manager.write(file_id, '    type            solverInfo;\n')
         self.file_manager.write(file_id, '    libs            (utilityFunctionObjects);\n')
         self.file_manager.write(file_id, '    fields          (".*");\n')
+        self.file_manager.write(file_id, '\n')
+        controls = self.controls.get_controls('residuals', Parameters.TIME_STEP, 1)
+        self.file_manager.write(file_id, self.controls.format_controls(controls))
         self.file_manager.write(file_id, '}\n')
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id,
                                 '// ************************************************************************* //\n')
+        self.file_manager.close_file(file_id)
@@ -0,0 +1,80 @@
+from src.WriteSystemDirectoryFiles.WriteCuttingPlanes import WriteCuttingPlanes
+from src.WriteSystemDirectoryFiles.WriteIsoSurfaces import WriteIsoSurfaces
+from src.WriteSystemDirectoryFiles.FunctionObjectControls import FunctionObjectControls
+
+
+class WriteSurfaces:
+    # samples all cutting planes and iso-surfaces with the same write schedule by a single surfaces function object
+    # (used if group_surfaces is set in the cutting_planes), so the interpolation of the fields is set up once per time
+    # step instead of once per surface. Each surface keeps its name, i.e. it is written into
+    # postProcessing/<function object>/<time>/<surface name>.vtp. All fields requested for any of the grouped surfaces
+    # are written on each of them, as a surfaces function object samples the same fields on all of its surfaces
+    def __init__(self, properties, file_manager):
+        self.file_manager = file_manager
+        self.properties = properties
+        self.controls = FunctionObjectControls(properties)
+        self.cutting_planes = WriteCuttingPlanes(properties, file_manager)
+        self.iso_surfaces = WriteIsoSurfaces(properties, file_manager)
+
+    @staticmethod
+    def get_function_object_name(write_interval):
+        return 'surfaces' if write_interval is None else 'surfaces_interval_' + str(write_interval)
+
+    def write_surfaces(self):
+        file_id = self.file_manager.create_file('system/include', 'surfaces')
+        self.file_manager.write_header(file_id, 'dictionary', 'system', 'sampling')
+        self.file_manager.write(file_id, '\n')
+        for name, write_interval, surfaces in self.get_function_objects():
+            self.__write_function_object(file_id, name, write_interval, surfaces)
+        self.file_manager.write(file_id,
+                                '// ************************************************************************* //\n')
+        self.file_manager.close_file(file_id)
+
+    def get_function_objects(self):
+        # returns the surfaces function objects as a list of (name, write interval, surfaces), where each surface is
+        # given as (surface name, fields, writer, argument of the writer's write_surface)
+        groups = {}
+        if self.properties['cutting_planes']['write_cutting_planes']:
+            for plane in self.properties['cutting_planes']['location']:
+                groups.setdefault(self.cutting_planes.get_write_interval(), []).append(
+                    (plane['name'], self.cutting_planes.get_fields(), self.cutting_planes, plane))
+        if self.properties['iso_surfaces']['write_iso_surfaces']:
+            for index in range(0, len(self.properties['iso_surfaces']['flow_variable'])):
+                groups.setdefault(self.iso_surfaces.get_write_interval(), []).append(
+                    (self.iso_surfaces.get_surface_name(index), self.iso_surfaces.get_fields(index),
+                     self.iso_surfaces, index))
+        return [(self.get_function_object_name(write_interval), write_interval, surfaces)
+                for write_interval, surfaces in groups.items()]
+
+    def __write_function_object(self, file_id, name, write_interval, surfaces):
+        self.file_manager.write(file_id, name + '\n')
+        self.file_manager.write(file_id, '{\n')
+        self.file_manager.write(file_id, '    type                  surfaces;\n')
+        self.file_manager.write(file_id, '    libs                  (sampling);\n')
+        self.file_manager.write(file_id, '\n')
+        self.file_manager.write(file_id, '    interpolationScheme   cellPoint;\n')
+        self.file_manager.write(file_id, '\n')
+        self.file_manager.write(file_id, '    surfaceFormat         vtk;\n')
+        self.file_manager.write(file_id, '\n')
+        controls = self.controls.get_sampling_controls(name, write_interval)
+        self.file_manager.write(file_id, self.controls.format_controls(controls))
+        self.file_manager.write(file_id, '\n')
+        self.file_manager.write(file_id, '    log                   no;\n')
+        self.file_manager.write(file_id, '\n')
+        self.file_manager.write(file_id, '    surfaces\n')
+        self.file_manager.write(file_id, '    {\n')
+        for _, _, writer, surface in surfaces:
+            writer.write_surface(file_id, surface)
+        self.file_manager.write(file_id, '    }\n')
+        self.file_manager.write(file_id, '\n')
+        self.file_manager.write(file_id, '    fields\n')
+        self.file_manager.write(file_id, '    (\n')
+        fields = []
+        for _, surface_fields, _, _ in surfaces:
+            for field in surface_fields:
+                if field not in fields:
+                    fields.append(field)
+                    self.file_manager.write(file_id, '        ' + field + '\n')
+        self.file_manager.write(file_id, '    );\n')
+        self.file_manager.write(file_id, '}\n')
+        self.file_manager.write(file_id, '\n')
@@ -1,7 +1,11 @@
+from src.WriteSystemDirectoryFiles.FunctionObjectControls import FunctionObjectControls
+
+
 class WriteYPlus:
     def __init__(self, properties, file_manager):
         self.properties = properties
         self.file_manager = file_manager
+        self.controls = FunctionObjectControls(properties)
 
     def write_y_plus(self):
         file_id = self.file_manager.create_file('system/include', 'yPlus')
@@ -11,7 +15,8 @@ class WriteYPlus:
         self.file_manager.write(file_id, '{\n')
         self.file_manager.write(file_id, '    type            yPlus;\n')
         self.file_manager.write(file_id, '    libs            (fieldFunctionObjects);\n')
-        self.file_manager.write(file_id, '    writeControl    writeTime;\n')
+        controls = self.controls.get_derived_field_controls('yPlus', 'yPlus')
+        self.file_manager.write(file_id, self.controls.format_controls(controls))
         if len(self.properties['dimensionless_coefficients']['wall_boundaries']) == 1:
             self.file_manager.write(file_id, '    patches         (' +
                                     self.properties['dimensionless_coefficients']['wall_boundaries'][0] + ');\n')
@@ -25,3 +30,4 @@ class WriteYPlus:
         self.file_manager.write(file_id, '\n')
         self.file_manager.write(file_id,
                                 '// ************************************************************************* //\n')
+        self.file_manager.close_file(file_id)
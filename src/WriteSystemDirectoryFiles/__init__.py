@@ -1,3 +1,4 @@
+from .FunctionObjectControls import FunctionObjectControls
 from .WriteControlDictFile import ControlDictFile
 from .WriteCuttingPlanes import WriteCuttingPlanes
 from .WriteDecomposePar import WriteDecomposeParDictionary
@@ -12,4 +13,5 @@ from .WriteMachNumber import WriteMachNumber
 from .WritePointProbes import WritePointProbes
 from .WritePressureCoefficient import WritePressureCoefficient
 from .WriteResiduals import WriteResiduals
+from .WriteSurfaces import WriteSurfaces
 from .WriteYPlus import WriteYPlus
@@ -0,0 +1,85 @@
+from input import GlobalVariables as Parameters
+
+
+class FieldDependencies:
+    # resolves which fields have to be written into the 0/ directory for the selected flow type and turbulence model.
+    # Fields which are not read by the solver are not written, so they neither have to be read nor decomposed
+    # (including their potentially large nonuniform initial conditions) before the case can be run
+
+    # all fields which may be written, in the order in which they are written
+    all_fields = ['U', 'p', 'T', 'k', 'omega', 'epsilon', 'nuTilda', 'nut', 'alphat', 'kt', 'kl', 'ReThetat',
+                  'gammaInt', 'R']
+
+    # fields read by each RANS model in addition to the velocity and pressure (kt/kl: laminar and turbulent kinetic
+    # energy of the k-kl-omega transition model, ReThetat/gammaInt: transition quantities of the k-omega SST LM model,
+    # R: reynolds stress tensor)
+    RANS_fields = {
+        Parameters.kEpsilon:            ['k', 'epsilon', 'nut'],
+        Parameters.realizableKE:        ['k', 'epsilon', 'nut'],
+        Parameters.RNGkEpsilon:         ['k', 'epsilon', 'nut'],
+        Parameters.LienLeschziner:      ['k', 'epsilon', 'nut'],
+        Parameters.LamBremhorstKE:      ['k', 'epsilon', 'nut'],
+        Parameters.LaunderSharmaKE:     ['k', 'epsilon', 'nut'],
+        Parameters.kOmega:              ['k', 'omega', 'nut'],
+        Parameters.kOmegaSST:           ['k', 'omega', 'nut'],
+        Parameters.kOmegaSSTLM:         ['k', 'omega', 'nut', 'ReThetat', 'gammaInt'],
+        Parameters.kkLOmega:            ['kt', 'kl', 'omega', 'nut'],
+        Parameters.kOmegaSSTSAS:        ['k', 'omega', 'nut'],
+        Parameters.qZeta:               ['k', 'epsilon', 'nut'],
+        Parameters.SpalartAllmaras:     ['nuTilda', 'nut'],
+        Parameters.LienCubicKE:         ['k', 'epsilon', 'nut'],
+        Parameters.ShihQuadraticKE:     ['k', 'epsilon', 'nut'],
+        Parameters.LRR:                 ['R', 'epsilon', 'nut'],
+        Parameters.SSG:                 ['R', 'epsilon', 'nut'],
+    }
+
+    # fields read by each LES model in addition to the velocity and pressure. The subgrid-scale kinetic energy of
+    # algebraic models (e.g. Smagorinsky and WALE) is calculated from the velocity and does not have to be written
+    LES_fields = {
+        Parameters.Smagorinsky:             ['nut'],
+        Parameters.kEqn:                    ['k', 'nut'],
+        Parameters.dynamicKEqn:             ['k', 'nut'],
+        Parameters.dynamicLagrangian:       ['nut'],
+        Parameters.DeardorffDiffStress:     ['R', 'nut'],
+        Parameters.WALE:                    ['nut'],
+        Parameters.SpalartAllmarasDES:      ['nuTilda', 'nut'],
+        Parameters.SpalartAllmarasDDES:     ['nuTilda', 'nut'],
+        Parameters.SpalartAllmarasIDDES:    ['nuTilda', 'nut'],
+        Parameters.kOmegaSSTDES:            ['k', 'omega', 'nut'],
+        Parameters.kOmegaSSTDDES:           ['k', 'omega', 'nut'],
+        Parameters.kOmegaSSTIDDES:          ['k', 'omega', 'nut'],
+    }
+
+    def __init__(self, properties):
+        self.properties = properties
+
+    def get_required_fields(self):
+        # returns the fields required by the current set-up (in the order of all_fields). If the turbulence model is
+        # unknown, all fields are returned, so that the case can still be run
+        flow_type = self.properties['flow_properties']['flow_type']
+        turbulence_type = self.properties['turbulence_properties']['turbulence_type']
+        if not self.is_turbulence_model_known():
+            return list(self.all_fields)
+
+        required = ['U', 'p']
+        if flow_type == Parameters.compressible:
+            required.append('T')
+
+        if turbulence_type == Parameters.RANS:
+            required.extend(self.RANS_fields[self.properties['turbulence_properties']['RANS_model']])
+        elif turbulence_type == Parameters.LES:
+            required.extend(self.LES_fields[self.properties['turbulence_properties']['LES_model']])
+
+        # the turbulent thermal diffusivity is read by all compressible solvers once a turbulence model is used
+        if flow_type == Parameters.compressible and turbulence_type != Parameters.LAMINAR:
+            required.append('alphat')
+
+        return [field for field in self.all_fields if field in required]
+
+    def is_turbulence_model_known(self):
+        turbulence_type = self.properties['turbulence_properties']['turbulence_type']
+        if turbulence_type == Parameters.RANS:
+            return self.properties['turbulence_properties']['RANS_model'] in self.RANS_fields
+        elif turbulence_type == Parameters.LES:
+            return self.properties['turbulence_properties']['LES_model'] in self.LES_fields
+        return True
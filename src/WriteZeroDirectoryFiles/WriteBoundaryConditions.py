@@ -1,4 +1,7 @@
 from input import GlobalVariables as Parameters
+from src.WriteZeroDirectoryFiles.WritePythonInitialConditions import WritePythonInitialConditions
+from src.WriteZeroDirectoryFiles.WriteInletProfiles import WriteInletProfiles
+from src.WriteZeroDirectoryFiles.FieldDependencies import FieldDependencies
 from math import pow, sqrt
 import copy
 
@@ -8,6 +11,7 @@ class WriteBoundaryConditions:
         # assign private variables
         self.properties = properties
         self.file_manager = file_manager
+        self.inlet_profiles = WriteInletProfiles(properties, file_manager)
 
         # list of all variables managed by this class. Each variable is mapped to a list of properties that contains
         # the following information
@@ -34,6 +38,10 @@ class WriteBoundaryConditions:
         if self.properties['flow_properties']['flow_type'] == Parameters.compressible:
             self.variables['p'] = ['volScalarField',      '[1 -1 -2 0 0 0 0]']
 
+        # only write the fields which are read by the solver and turbulence model
+        required_fields = FieldDependencies(properties).get_required_fields()
+        self.variables = {var: props for var, props in self.variables.items() if var in required_fields}
+
         # list of all wall function types used for RANS turbulence modelling. Not all wall modelling approaches have
         # wall functions applied and appropriate dirichlet or neumann boundary conditions are set here instead. These
         # are left blank in the list below.
@@ -172,7 +180,16 @@ class WriteBoundaryConditions:
 
     def __write_headers_to_file(self, file_id):
         for var, bc_props in self.variables.items():
-            self.file_manager.write_header(file_id[var], bc_props[Parameters.BC_TYPE], '0', var)
+            self.file_manager.write_header(file_id[var], bc_props[Parameters.BC_TYPE], '0', var,
+                                           self.__has_binary_initial_conditions(var))
+
+    def __has_binary_initial_conditions(self, var):
+        # initial conditions evaluated in python may be written in binary format, which is set in the file header
+        flow_properties = self.properties['flow_properties']
+        return (flow_properties['custom_initial_conditions'] and
+                var in flow_properties['custom_initial_conditions_setup'] and
+                WritePythonInitialConditions.is_python_script(flow_properties['custom_initial_conditions_setup'][var])
+                and flow_properties.get('custom_initial_conditions_format', Parameters.ASCII) == Parameters.BINARY)
 
     def __write_dimensions_to_file(self, file_id):
         for var, bc_props in self.variables.items():
@@ -186,7 +203,12 @@ class WriteBoundaryConditions:
             if custom_initial_conditions_flag:
                 if var in custom_initial_conditions_setup:
                     path_to_script = custom_initial_conditions_setup[var]
-                    self.__write_custom_initial_conditions(file_id[var], path_to_script)
+                    if WritePythonInitialConditions.is_python_script(path_to_script):
+                        python_initial_conditions = WritePythonInitialConditions(self.properties, self.file_manager)
+                        field_type = self.variables[var][Parameters.BC_TYPE]
+                        python_initial_conditions.write_internal_field(file_id[var], field_type, path_to_script)
+                    else:
+                        self.__write_custom_initial_conditions(file_id[var], path_to_script)
             if (custom_initial_conditions_flag is False) or (var not in custom_initial_conditions_setup):
                 if initial_conditions_type == Parameters.BOUNDARY_CONDITIONED_BASED:
                     self.file_manager.write(file_id[var], 'internalField   ' + bc_freestream_conditions[var] + ';\n\n')
@@ -283,7 +305,11 @@ class WriteBoundaryConditions:
         if custom_inlet:
             if var in custom_inlet_setup:
                 path_to_script = custom_inlet_setup[var]
-                self.__write_custom_inlet_profile(file_id[var], 8, path_to_script)
+                if WriteInletProfiles.is_precomputed_profile(path_to_script):
+                    self.inlet_profiles.write_boundary_condition(file_id[var], var, self.variables[var][
+                        Parameters.BC_TYPE], name, path_to_script, self.__has_binary_initial_conditions(var))
+                else:
+                    self.__write_custom_inlet_profile(file_id[var], 8, path_to_script)
         if (custom_inlet is False) or (var not in custom_inlet_setup):
             if var == 'U':
                 if bc_type == Parameters.INLET:
@@ -501,69 +527,59 @@ class WriteBoundaryConditions:
         file_id.write('        value           uniform (0 0 0);\n')
 
     def __write_custom_initial_conditions(self, file_id, path_to_script):
-        file_id.write('internalField   #codeStream\n')
-        file_id.write('{\n')
-        file_id.write('    codeInclude\n')
-        file_id.write('    #{\n')
-        file_id.write('        #include "fvCFD.H"\n')
-        file_id.write('    #};\n')
-        file_id.write('\n')
-        file_id.write('    codeOptions\n')
-        file_id.write('    #{\n')
-        file_id.write('        -I$(LIB_SRC)/finiteVolume/lnInclude \\\n')
-        file_id.write('        -I$(LIB_SRC)/meshTools/lnInclude\n')
-        file_id.write('    #};\n')
-        file_id.write('\n')
-        file_id.write('    codeLibs\n')
-        file_id.write('    #{\n')
-        file_id.write('        -lmeshTools \\\n')
-        file_id.write('        -lfiniteVolume\n')
-        file_id.write('    #};\n')
-        file_id.write('\n')
-        file_id.write('    code\n')
-        file_id.write('    #{\n')
-
-        custom_initial_condition_script = open(path_to_script, 'r')
-        all_lines = custom_initial_condition_script.readlines()
-        spaces = '        '
-        for line in all_lines:
-            file_id.write(spaces + line)
-
-        file_id.write('\n')
-        file_id.write('    #};\n')
-        file_id.write('};\n')
+        code_stream = self.__get_code_stream(0, path_to_script)
+        self.__place_compiled_code_stream(code_stream)
+        file_id.write('internalField   ' + code_stream)
         file_id.write('\n')
 
     def __write_custom_inlet_profile(self, file_id, leading_spaces, path_to_script):
-        spaces = ' ' * leading_spaces
-        file_id.write(spaces + '#codeStream\n')
-        file_id.write(spaces + '{\n')
-        file_id.write(spaces + '    codeInclude\n')
-        file_id.write(spaces + '    #{\n')
-        file_id.write(spaces + '        #include "fvCFD.H"\n')
-        file_id.write(spaces + '    #};\n')
-        file_id.write('\n')
-        file_id.write(spaces + '    codeOptions\n')
-        file_id.write(spaces + '    #{\n')
-        file_id.write(spaces + '        -I$(LIB_SRC)/finiteVolume/lnInclude \\\n')
-        file_id.write(spaces + '        -I$(LIB_SRC)/meshTools/lnInclude\n')
-        file_id.write(spaces + '    #};\n')
-        file_id.write('\n')
-        file_id.write(spaces + '    codeLibs\n')
-        file_id.write(spaces + '    #{\n')
-        file_id.write(spaces + '        -lmeshTools \\\n')
-        file_id.write(spaces + '        -lfiniteVolume\n')
-        file_id.write(spaces + '    #};\n')
-        file_id.write('\n')
-        file_id.write(spaces + '    code\n')
-        file_id.write(spaces + '    #{\n')
-
-        custom_inlet_script = open(path_to_script, 'r')
-        all_lines = custom_inlet_script.readlines()
-        code_spaces = ' ' * 8
-        for line in all_lines:
-            file_id.write(spaces + code_spaces + line)
+        code_stream = self.__get_code_stream(leading_spaces, path_to_script)
+        self.__place_compiled_code_stream(code_stream)
+        file_id.write(' ' * leading_spaces + code_stream)
 
-        file_id.write('\n')
-        file_id.write(spaces + '    #};\n')
-        file_id.write(spaces + '};\n')
+    def __get_code_stream(self, leading_spaces, path_to_script):
+        spaces = ' ' * leading_spaces
+        code_stream = ['#codeStream\n']
+        code_stream.append(spaces + '{\n')
+        code_stream.append(spaces + '    codeInclude\n')
+        code_stream.append(spaces + '    #{\n')
+        code_stream.append(spaces + '        #include "fvCFD.H"\n')
+        code_stream.append(spaces + '    #};\n')
+        code_stream.append('\n')
+        code_stream.append(spaces + '    codeOptions\n')
+        code_stream.append(spaces + '    #{\n')
+        code_stream.append(spaces + '        -I$(LIB_SRC)/finiteVolume/lnInclude \\\n')
+        code_stream.append(spaces + '        -I$(LIB_SRC)/meshTools/lnInclude\n')
+        code_stream.append(spaces + '    #};\n')
+        code_stream.append('\n')
+        code_stream.append(spaces + '    codeLibs\n')
+        code_stream.append(spaces + '    #{\n')
+        code_stream.append(spaces + '        -lmeshTools \\\n')
+        code_stream.append(spaces + '        -lfiniteVolume\n')
+        code_stream.append(spaces + '    #};\n')
+        code_stream.append('\n')
+        code_stream.append(spaces + '    code\n')
+        code_stream.append(spaces + '    #{\n')
+
+        with open(path_to_script, 'r') as custom_script:
+            code_spaces = ' ' * 8
+            for line in custom_script.readlines():
+                code_stream.append(spaces + code_spaces + line)
+
+        code_stream.append('\n')
+        code_stream.append(spaces + '    #};\n')
+        code_stream.append(spaces + '};\n')
+        return ''.join(code_stream)
+
+    def __place_compiled_code_stream(self, code_stream):
+        # place the library compiled from this code stream into the case, so that OpenFOAM does not need to compile it
+        file_properties = self.properties['file_properties']
+        if file_properties.get('dynamic_code_cache_directory', '') != '':
+            from src.FileDirectoryIO.DynamicCodeCache import DynamicCodeCache
+            dynamic_code_cache = DynamicCodeCache(file_properties['dynamic_code_cache_directory'],
+                                                  file_properties['version'],
+                                                  file_properties.get('dynamic_code_compile_command',
+                                                                      'foamDictionary -expand system/codeDict'))
+            entry_directory = dynamic_code_cache.add_code(code_stream)
+            if entry_directory is not None:
+                dynamic_code_cache.place_libraries(entry_directory, self.file_manager)
@@ -0,0 +1,117 @@
+import os
+from input import GlobalVariables as Parameters
+from src.WriteZeroDirectoryFiles.WritePythonInitialConditions import WritePythonInitialConditions
+
+
+class WriteInletProfiles:
+    # writes custom inlet profiles which are evaluated by the case generator, instead of c++ code compiled by OpenFOAM.
+    # Profiles are either given as a python script, providing a vectorised function inlet_profile(x, y, z) of the inlet
+    # face centre coordinates, or as tabulated data (.csv or .dat files), where each row contains the coordinates (x, y,
+    # z) followed by the value(s) of the field at that location.
+    #
+    # Python profiles are written either as a non-uniform fixedValue condition or as boundaryData for the
+    # timeVaryingMappedFixedValue condition, tabulated data always as boundaryData (which OpenFOAM interpolates onto the
+    # inlet faces). If the python script defines a list of times, the profile is evaluated at each time by calling
+    # inlet_profile(x, y, z, t) and written as time-varying boundaryData.
+    def __init__(self, properties, file_manager):
+        self.properties = properties
+        self.file_manager = file_manager
+        self.__boundary_data_points = {}
+
+    @staticmethod
+    def is_precomputed_profile(path_to_script):
+        return os.path.splitext(path_to_script)[1] in ['.py', '.csv', '.dat']
+
+    def write_boundary_condition(self, file_id, var, field_type, patch_name, path_to_script, binary):
+        profile_type = self.properties['boundary_properties'].get('custom_inlet_profile_type',
+                                                                  Parameters.TIME_VARYING_MAPPED)
+        if WritePythonInitialConditions.is_python_script(path_to_script):
+            script = WritePythonInitialConditions.load_script(path_to_script)
+            if profile_type == Parameters.NON_UNIFORM_FIXED_VALUE and not hasattr(script, 'times'):
+                self.__write_non_uniform_fixed_value(file_id, field_type, patch_name, path_to_script, script, binary)
+                return
+            self.__write_python_boundary_data(var, field_type, patch_name, path_to_script, script)
+        else:
+            self.__write_tabulated_boundary_data(var, field_type, patch_name, path_to_script)
+
+        file_id.write('        type            timeVaryingMappedFixedValue;\n')
+        file_id.write('        setAverage      false;\n')
+
+    def __write_non_uniform_fixed_value(self, file_id, field_type, patch_name, path_to_script, script, binary):
+        list_type, components = WritePythonInitialConditions.field_types[field_type]
+        face_centres = self.__get_patch_face_centres(patch_name, True)
+        values = script.inlet_profile(face_centres[:, 0], face_centres[:, 1], face_centres[:, 2])
+        values = WritePythonInitialConditions.to_array(values, len(face_centres), components, path_to_script)
+
+        file_id.write('        type            fixedValue;\n')
+        file_id.write('        value           nonuniform List<' + list_type + '> \n' + str(len(values)) +
+                      ('\n(' if binary else '\n(\n'))
+        file_id.write(WritePythonInitialConditions.format_values(values, binary))
+        file_id.write(')\n;\n')
+
+    def __write_python_boundary_data(self, var, field_type, patch_name, path_to_script, script):
+        _, components = WritePythonInitialConditions.field_types[field_type]
+        face_centres = self.__get_patch_face_centres(patch_name, False)
+        self.__write_boundary_data_points(patch_name, face_centres)
+        if hasattr(script, 'times'):
+            for time in script.times:
+                values = script.inlet_profile(face_centres[:, 0], face_centres[:, 1], face_centres[:, 2], time)
+                values = WritePythonInitialConditions.to_array(values, len(face_centres), components, path_to_script)
+                self.__write_boundary_data_values(var, field_type, patch_name, str(time), values)
+        else:
+            values = script.inlet_profile(face_centres[:, 0], face_centres[:, 1], face_centres[:, 2])
+            values = WritePythonInitialConditions.to_array(values, len(face_centres), components, path_to_script)
+            self.__write_boundary_data_values(var, field_type, patch_name, '0', values)
+
+    def __write_tabulated_boundary_data(self, var, field_type, patch_name, path_to_table):
+        import numpy as np
+        _, components = WritePythonInitialConditions.field_types[field_type]
+        with open(path_to_table, 'r') as table:
+            data = np.loadtxt((line.replace(',', ' ') for line in table), comments='#', ndmin=2)
+        if data.shape[1] != 3 + components:
+            raise Exception(path_to_table + ' needs to contain ' + str(3 + components) + ' columns (x, y, z and ' +
+                            str(components) + ' value(s)) for ' + var)
+        self.__write_boundary_data_points(patch_name, data[:, 0:3])
+        self.__write_boundary_data_values(var, field_type, patch_name, '0', data[:, 3:])
+
+    def __write_boundary_data_points(self, patch_name, points):
+        # boundary data is shared by all fields on the same patch, so all fields of a patch need to use the same points
+        if patch_name in self.__boundary_data_points:
+            if not (self.__boundary_data_points[patch_name].shape == points.shape and
+                    (self.__boundary_data_points[patch_name] == points).all()):
+                raise Exception('All custom inlet profiles of patch ' + patch_name + ' need to use the same points')
+            return
+        self.__boundary_data_points[patch_name] = points
+        location = os.path.join('constant', 'boundaryData', patch_name)
+        self.file_manager.create_directory(location)
+        file_id = self.file_manager.create_file(location, 'points')
+        self.file_manager.write_header(file_id, 'vectorField', location, 'points')
+        self.file_manager.write(file_id, '\n' + str(len(points)) + '\n(\n')
+        self.file_manager.write(file_id, WritePythonInitialConditions.format_values(points, False))
+        self.file_manager.write(file_id, ')\n')
+        self.file_manager.close_file(file_id)
+
+    def __write_boundary_data_values(self, var, field_type, patch_name, time, values):
+        list_type, _ = WritePythonInitialConditions.field_types[field_type]
+        location = os.path.join('constant', 'boundaryData', patch_name, time)
+        self.file_manager.create_directory(location)
+        file_id = self.file_manager.create_file(location, var)
+        self.file_manager.write_header(file_id, list_type + 'Field', location, var)
+        self.file_manager.write(file_id, '\n' + str(len(values)) + '\n(\n')
+        self.file_manager.write(file_id, WritePythonInitialConditions.format_values(values, False))
+        self.file_manager.write(file_id, ')\n')
+        self.file_manager.close_file(file_id)
+
+    def __get_patch_face_centres(self, patch_name, ordered):
+        # face centres in the order of the faces of the patch are only available from a polyMesh, boundaryData does not
+        # depend on the order of the points, so these may also be calculated from the blockMeshDict
+        file_properties = self.properties['file_properties']
+        if file_properties['mesh_treatment'] == Parameters.POLY_MESH:
+            from src.FileDirectoryIO.PolyMeshReader import PolyMeshReader
+            return PolyMeshReader(file_properties['polymesh_directory']).get_patch_face_centres(patch_name)
+        elif not ordered and file_properties['mesh_treatment'] == Parameters.BLOCK_MESH_DICT:
+            from src.FileDirectoryIO.BlockMeshDictReader import BlockMeshDictReader
+            block_mesh_dict = BlockMeshDictReader(os.path.join(file_properties['blockmeshdict_directory'],
+                                                               'blockMeshDict'))
+            return block_mesh_dict.get_patch_face_centres(patch_name)
+        raise Exception('Could not determine the face centres of patch ' + patch_name + ' for the custom inlet profile')
@@ -0,0 +1,111 @@
+import os
+import importlib.util
+from input import GlobalVariables as Parameters
+
+# number of cells for which the initial conditions are evaluated and written at once
+CHUNK_SIZE = 1024 * 1024
+
+# number of cells of a polyMesh for which the cell centres are calculated at once, which needs several hundred bytes
+# per cell for the geometry of the faces of the cells
+POLY_MESH_CHUNK_SIZE = 128 * 1024
+
+
+class WritePythonInitialConditions:
+    # evaluates initial conditions given as a python script on the cell centres of the mesh and writes them as a
+    # non-uniform internal field, so that no code needs to be compiled by OpenFOAM before the solver starts. The script
+    # needs to provide a vectorised function initial_condition(x, y, z), receiving numpy arrays of the cell centre
+    # coordinates and returning the value(s) of the field at these locations, i.e. a single array for scalar fields, a
+    # tuple of 3 arrays for vector fields (x, y, z) and a tuple of 6 arrays for symmetric tensor fields (xx, xy, xz, yy,
+    # yz, zz). Constant values are broadcast to all cells.
+    __modules = {}
+
+    # field types written by the case generator and the corresponding list type and number of components
+    field_types = {
+        'volScalarField': ['scalar', 1],
+        'volVectorField': ['vector', 3],
+        'volSymmTensorField': ['symmTensor', 6],
+    }
+
+    def __init__(self, properties, file_manager):
+        self.properties = properties
+        self.file_manager = file_manager
+
+    @staticmethod
+    def is_python_script(path_to_script):
+        return path_to_script.endswith('.py')
+
+    @staticmethod
+    def load_script(path_to_script):
+        # load each script only once, as the same script is typically used for all cases of a parameter sweep
+        key = os.path.abspath(path_to_script)
+        if key not in WritePythonInitialConditions.__modules:
+            specification = importlib.util.spec_from_file_location('custom_script_' + str(len(
+                WritePythonInitialConditions.__modules)), path_to_script)
+            module = importlib.util.module_from_spec(specification)
+            specification.loader.exec_module(module)
+            WritePythonInitialConditions.__modules[key] = module
+        return WritePythonInitialConditions.__modules[key]
+
+    @staticmethod
+    def to_array(values, number_of_entries, components, path_to_script):
+        # convert the values returned by a script into an array of shape (number_of_entries, components)
+        import numpy as np
+        if components == 1:
+            values = [values]
+        elif len(values) != components:
+            values = np.asarray(values, dtype=np.float64)
+            if values.shape != (number_of_entries, components):
+                raise Exception(path_to_script + ' needs to return ' + str(components) + ' components')
+            return values
+        return np.column_stack([np.broadcast_to(np.asarray(value, dtype=np.float64), (number_of_entries,))
+                                for value in values])
+
+    @staticmethod
+    def format_values(values, binary):
+        # format the entries of a non-uniform list, values is an array of shape (number of entries, components)
+        import numpy as np
+        if binary:
+            return np.ascontiguousarray(values, dtype='<f8').tobytes()
+        elif values.shape[1] == 1:
+            return '\n'.join(map(repr, values[:, 0].tolist())) + '\n'
+        else:
+            entry = '(' + ' '.join(['%r'] * values.shape[1]) + ')\n'
+            return (entry * len(values)) % tuple(values.ravel().tolist())
+
+    def write_internal_field(self, file_id, field_type, path_to_script):
+        binary = self.properties['flow_properties'].get('custom_initial_conditions_format',
+                                                        Parameters.ASCII) == Parameters.BINARY
+        list_type, components = WritePythonInitialConditions.field_types[field_type]
+        initial_condition = WritePythonInitialConditions.load_script(path_to_script).initial_condition
+
+        file_id.write('internalField   nonuniform List<' + list_type + '> \n' + str(self.__get_number_of_cells()) +
+                      ('\n(' if binary else '\n(\n'))
+        for centres in self.__iterate_cell_centres():
+            values = initial_condition(centres[:, 0], centres[:, 1], centres[:, 2])
+            values = WritePythonInitialConditions.to_array(values, len(centres), components, path_to_script)
+            file_id.write(WritePythonInitialConditions.format_values(values, binary))
+        file_id.write(')\n;\n\n')
+
+    def __get_number_of_cells(self):
+        file_properties = self.properties['file_properties']
+        if file_properties['mesh_treatment'] == Parameters.POLY_MESH:
+            from src.FileDirectoryIO.PolyMeshReader import PolyMeshReader
+            return PolyMeshReader(file_properties['polymesh_directory']).get_summary()['n_cells']
+        else:
+            from src.FileDirectoryIO.BlockMeshDictReader import BlockMeshDictReader
+            return BlockMeshDictReader(os.path.join(file_properties['blockmeshdict_directory'],
+                                                    'blockMeshDict')).get_number_of_cells()
+
+    def __iterate_cell_centres(self):
+        file_properties = self.properties['file_properties']
+        if file_properties['mesh_treatment'] == Parameters.POLY_MESH:
+            from src.FileDirectoryIO.PolyMeshReader import PolyMeshReader
+            poly_mesh = PolyMeshReader(file_properties['polymesh_directory'])
+            for cell_centres in poly_mesh.iterate_cell_centres(POLY_MESH_CHUNK_SIZE):
+                yield cell_centres
+        else:
+            from src.FileDirectoryIO.BlockMeshDictReader import BlockMeshDictReader
+            block_mesh_dict = BlockMeshDictReader(os.path.join(file_properties['blockmeshdict_directory'],
+                                                               'blockMeshDict'))
+            for cell_centres in block_mesh_dict.iterate_cell_centres(CHUNK_SIZE):
+                yield cell_centres
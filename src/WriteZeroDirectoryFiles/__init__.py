@@ -1 +1,2 @@
 from .WriteBoundaryConditions import WriteBoundaryConditions
+from .FieldDependencies import FieldDependencies
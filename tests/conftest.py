@@ -0,0 +1,11 @@
+import os
+import sys
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POST_PROCESSING_DIRECTORY = os.path.join(ROOT_DIRECTORY, 'examples', 'scripts', 'userDefined', 'postProcessing')
+
+# the case generator is imported from the root directory, the post-processing scripts (which are copied into the cases)
+# from their own directory
+for directory in [ROOT_DIRECTORY, POST_PROCESSING_DIRECTORY]:
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
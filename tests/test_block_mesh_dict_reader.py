@@ -0,0 +1,151 @@
+import pytest
+from src.FileDirectoryIO.BlockMeshDictReader import BlockMeshDictReader
+
+BLOCK_MESH_DICT = '''
+length  2;
+cells   4;
+
+vertices
+(
+    (0 0 0) (X 0 0) (X 1 1) (0 1 1)
+    (0 0 0) (X 0 0) (X 1 1) (0 1 1)
+);
+
+blocks
+(
+    hex (0 1 2 3 4 5 6 7) ($cells 2 2) simpleGrading (1 1 1)
+);
+'''
+
+
+def read(tmp_path, x):
+    # single block, whose vertices 1, 2, 5 and 6 are at x
+    path = tmp_path / 'blockMeshDict'
+    path.write_text(BLOCK_MESH_DICT.replace('X', x))
+    return BlockMeshDictReader(str(path))
+
+
+@pytest.mark.parametrize('expression, x', [
+    ('3', 3),
+    ('#calc "$length * 2 - 1"', 3),
+    ('#calc "-$length / 4 + 2 ** 2"', 3.5),
+    ('#calc "pow($length, 3) % 5"', 3),
+    ('#eval "sqrt(16) * cos(0) + max(1, $cells)"', 8),
+    ('#calc "2 * pi"', 6.283185307179586),
+])
+def test_calc_expressions(tmp_path, expression, x):
+    reader = read(tmp_path, expression)
+    assert reader.vertices[1] == [pytest.approx(x), 0, 0]
+    assert reader.get_number_of_cells() == 16
+
+
+@pytest.mark.parametrize('expression', [
+    '().__class__.__base__.__subclasses__()',
+    '(1).__class__',
+    '__import__(0)',
+    'open(0)',
+    'lambda: 0',
+    '[1][0]',
+    'pi.real',
+    'sqrt(x=1)',
+    '"a" * 2',
+    '1 if 1 else 0',
+    '1 < 2',
+])
+def test_calc_rejects_everything_but_arithmetic(tmp_path, expression):
+    with pytest.raises(Exception, match='Could not evaluate expression'):
+        read(tmp_path, '#calc "' + expression + '"')
+
+
+def test_calc_large_powers_are_not_computed_as_integers(tmp_path):
+    with pytest.raises(Exception, match='Could not evaluate expression'):
+        read(tmp_path, '#calc "9 ** 9 ** 9"')
+
+
+def write(tmp_path, content):
+    path = tmp_path / 'blockMeshDict'
+    path.write_text(content)
+    return BlockMeshDictReader(str(path))
+
+
+def test_variables_are_looked_up_from_the_scope_outwards(tmp_path):
+    reader = write(tmp_path, '''
+scale   0.5;
+geometry { width 4; depth 2; }
+cells   3;
+vertices
+(
+    (0 0 0) ($:geometry.width 0 0) ($geometry.width $geometry.depth 0) (0 $geometry.depth 0)
+    (0 0 1) ($:geometry.width 0 1) ($geometry.width $geometry.depth 1) (0 $geometry.depth 1)
+);
+blocks ( hex (0 1 2 3 4 5 6 7) ($cells $cells 1) simpleGrading (1 1 1) );
+''')
+    # vertices are scaled, the number of cells is not
+    assert reader.vertices[6] == [2.0, 1.0, 0.5]
+    assert reader.get_bounding_box() == ([0, 0, 0], [2.0, 1.0, 0.5])
+    assert reader.get_number_of_cells() == 9
+
+
+def test_unknown_variables_are_reported(tmp_path):
+    with pytest.raises(Exception, match=r'Could not evaluate \$:width'):
+        read(tmp_path, '$:width')
+
+
+def test_convert_to_meters(tmp_path):
+    reader = write(tmp_path, BLOCK_MESH_DICT.replace('X', '3') + 'convertToMeters 0.001;\n')
+    assert reader.vertices[2] == [pytest.approx(0.003), 0.001, 0.001]
+
+
+# two blocks side by side in x, sharing the face of the vertices 1, 2, 5 and 6. The second block is rotated, its local
+# directions run along y, x and -z
+TWO_BLOCKS = '''
+vertices
+(
+    (0 0 0) (1 0 0) (1 1 0) (0 1 0) (0 0 1) (1 0 1) (1 1 1) (0 1 1)
+    (3 0 0) (3 1 0) (3 0 1) (3 1 1)
+);
+blocks
+(
+    hex (0 1 2 3 4 5 6 7) (2 3 1) simpleGrading (1 1 1)
+    hex (5 6 11 10 1 2 9 8) (3 GRADED 1) simpleGrading (1 GRADING 1)
+);
+'''
+
+
+def test_structured_cells_of_blocks_tiling_a_box(tmp_path):
+    assert write(tmp_path, TWO_BLOCKS.replace('GRADED', '4').replace('GRADING', '1')).get_structured_cells() == \
+           [6, 3, 1]
+    # different numbers of cells along the shared face
+    assert write(tmp_path, TWO_BLOCKS.replace('(3 GRADED 1)', '(2 4 1)').replace('GRADING', '1')) \
+        .get_structured_cells() is None
+
+
+def test_cell_centres_with_grading(tmp_path):
+    import numpy as np
+    # the last cell of the second block is 3 times as large as the first one
+    reader = write(tmp_path, TWO_BLOCKS.replace('GRADED', '2').replace('GRADING', '3'))
+    chunks = list(reader.iterate_cell_centres(4))
+
+    assert [len(chunk) for chunk in chunks] == [4, 2, 4, 2]
+    centres = np.concatenate(chunks)
+    np.testing.assert_allclose(centres[:6], [[0.25, 1 / 6, 0.5], [0.75, 1 / 6, 0.5], [0.25, 0.5, 0.5],
+                                             [0.75, 0.5, 0.5], [0.25, 5 / 6, 0.5], [0.75, 5 / 6, 0.5]])
+    # cells of 0.5 and 1.5 along x, with y running fastest in the rotated block
+    np.testing.assert_allclose(centres[6:, 0], np.repeat([1.25, 2.25], 3))
+    np.testing.assert_allclose(centres[6:, 1], [1 / 6, 0.5, 5 / 6] * 2)
+    np.testing.assert_allclose(centres[6:, 2], np.full(6, 0.5))
+
+
+def test_patch_face_centres(tmp_path):
+    reader = write(tmp_path, BLOCK_MESH_DICT.replace('X', '1') + '''
+boundary
+(
+    inlet { type patch; faces ((0 3 7 4)); }
+    outlet { type patch; faces ((1 2 6 5)); }
+);
+''')
+    centres = reader.get_patch_face_centres('outlet')
+    assert centres.shape == (4, 3)
+    assert set(centres[:, 0]) == {1.0}
+    with pytest.raises(Exception, match='Could not find patch wall'):
+        reader.get_patch_face_centres('wall')
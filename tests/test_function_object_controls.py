@@ -0,0 +1,95 @@
+import copy
+import pytest
+import input.CaseProperties as CaseProperties
+from input import GlobalVariables as Parameters
+from src.WriteSystemDirectoryFiles.FunctionObjectControls import FunctionObjectControls
+
+
+@pytest.fixture
+def properties():
+    # processed default properties, i.e. with the cutting planes (sampling U, p and vorticity) and the iso-surface of Q
+    # written at every write time, and the fields written every 100 time steps
+    case_properties = CaseProperties.CaseProperties()
+    return case_properties.get_case_properties_from_dictionary(copy.deepcopy(case_properties.properties))
+
+
+def get_controls(properties, default=None, function_objects=None):
+    properties['function_object_controls'] = {'default': default or {}, 'function_objects': function_objects or {}}
+    return FunctionObjectControls(properties)
+
+
+def test_default_controls_of_the_function_object(properties):
+    controls = get_controls(properties)
+    assert controls.get_controls('yPlus') == {'execute_control': Parameters.WRITE_TIME, 'execute_interval': None,
+                                              'write_control': Parameters.WRITE_TIME, 'write_interval': None,
+                                              'time_start': None, 'time_end': None}
+    # time step based controls execute at every time step unless an interval is given
+    forces = controls.get_controls('forceCoeffs', Parameters.TIME_STEP)
+    assert (forces['write_control'], forces['write_interval']) == (Parameters.TIME_STEP, 1)
+    assert (forces['execute_control'], forces['execute_interval']) == (Parameters.TIME_STEP, 1)
+
+
+def test_controls_of_individual_function_objects_overwrite_the_default(properties):
+    controls = get_controls(properties, default={'write_control': Parameters.TIME_STEP, 'write_interval': 10},
+                            function_objects={'Q': {'time_start': 2},
+                                              'yPlus': {'write_control': Parameters.ADJUSTABLE_RUN_TIME,
+                                                        'write_interval': 0.5},
+                                              'forceCoeffs': {'write_control': Parameters.TIME_STEP}})
+    q = controls.get_controls('Q')
+    assert (q['write_control'], q['write_interval'], q['time_start']) == (Parameters.TIME_STEP, 10, 2)
+    y_plus = controls.get_controls('yPlus')
+    assert (y_plus['execute_control'], y_plus['execute_interval']) == (Parameters.ADJUSTABLE_RUN_TIME, 0.5)
+    # the interval of the default belongs to its control, a control given without interval starts from its default
+    forces = controls.get_controls('forceCoeffs', Parameters.TIME_STEP, 5)
+    assert forces['write_interval'] == 1
+
+
+def test_derived_fields_are_computed_when_written_or_sampled(properties):
+    # vorticity is written and sampled by the cutting planes at every write time
+    controls = get_controls(properties)
+    vorticity = controls.get_derived_field_controls('vorticity', 'vorticity')
+    assert (vorticity['execute_control'], vorticity['execute_interval']) == (Parameters.WRITE_TIME, None)
+
+    # write times are every 100 time steps, so a plane written every 30 time steps needs vorticity every 10 time steps
+    controls = get_controls(properties, function_objects={
+        'plane_y=0': {'write_control': Parameters.TIME_STEP, 'write_interval': 30}})
+    vorticity = controls.get_derived_field_controls('vorticity', 'vorticity')
+    assert (vorticity['execute_control'], vorticity['execute_interval']) == (Parameters.TIME_STEP, 10)
+    assert (vorticity['write_control'], vorticity['write_interval']) == (Parameters.WRITE_TIME, None)
+    # Q is not sampled by the planes
+    q = controls.get_derived_field_controls('Q', 'Q')
+    assert (q['execute_control'], q['execute_interval']) == (Parameters.WRITE_TIME, None)
+
+
+def test_schedules_based_on_time_are_combined_into_every_time_step(properties):
+    properties['solver_properties']['write_control'] = Parameters.RUN_TIME
+    controls = get_controls(properties, function_objects={
+        'plane_y=0': {'write_control': Parameters.TIME_STEP, 'write_interval': 30}})
+    vorticity = controls.get_derived_field_controls('vorticity', 'vorticity')
+    assert (vorticity['execute_control'], vorticity['execute_interval']) == (Parameters.TIME_STEP, 1)
+
+
+def test_execute_controls_given_by_the_user_are_kept(properties):
+    controls = get_controls(properties, default={'execute_control': Parameters.TIME_STEP, 'execute_interval': 50},
+                            function_objects={'plane_y=0': {'write_control': Parameters.TIME_STEP,
+                                                            'write_interval': 30}})
+    vorticity = controls.get_derived_field_controls('vorticity', 'vorticity')
+    assert (vorticity['execute_control'], vorticity['execute_interval']) == (Parameters.TIME_STEP, 50)
+
+
+def test_format_controls(properties):
+    controls = get_controls(properties, function_objects={'Q': {'time_start': 2, 'time_end': 5}})
+    assert controls.format_controls(controls.get_controls('Q')) == (
+        '    executeControl  writeTime;\n'
+        '    writeControl    writeTime;\n'
+        '    timeStart       2;\n'
+        '    timeEnd         5;\n')
+    # executing at every time step is the default of OpenFOAM and not written
+    assert controls.format_controls(controls.get_controls('forceCoeffs', Parameters.TIME_STEP), width=14) == (
+        '    writeControl  timeStep;\n'
+        '    writeInterval 1;\n')
+    assert controls.format_controls(controls.get_sampling_controls('point_probes', 20)) == (
+        '    executeControl  timeStep;\n'
+        '    executeInterval 20;\n'
+        '    writeControl    timeStep;\n'
+        '    writeInterval   20;\n')
@@ -0,0 +1,96 @@
+import os
+import numpy as np
+import pytest
+import loadResults
+
+FORCE_COEFFICIENTS_HEADER = '# Force coefficients\n# Time    Cd    Cl\n'
+SOLVER_INFO_HEADER = '# Solver information\n# Time    U_solver    U_initial    p_solver    p_initial\n'
+
+
+def write(case, function_object, start_time, file_name, content):
+    directory = os.path.join(case, 'postProcessing', function_object, start_time)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, file_name), 'w') as output_file:
+        output_file.write(content)
+    return os.path.join(directory, file_name)
+
+
+def coefficients(times, offset=0):
+    return ''.join(str(t) + ' ' + str(t + offset) + ' ' + str(-t - offset) + '\n' for t in times)
+
+
+def test_restart_replaces_the_output_after_its_start_time(tmp_path):
+    write(str(tmp_path), 'forceCoeffs', '0', 'coefficient.dat', FORCE_COEFFICIENTS_HEADER + coefficients(range(1, 6)))
+    write(str(tmp_path), 'forceCoeffs', '3', 'coefficient.dat',
+          FORCE_COEFFICIENTS_HEADER + coefficients(range(3, 7), offset=100))
+    results = loadResults.load(str(tmp_path), 'forceCoeffs')
+
+    assert results['Time'].tolist() == [1, 2, 3, 4, 5, 6]
+    assert results['Cd'].tolist() == [1, 2, 103, 104, 105, 106]
+    assert results['Cl'].tolist() == [-1, -2, -103, -104, -105, -106]
+
+
+def test_restarts_into_the_same_directory_append_their_start_time(tmp_path):
+    rows = '{} smoothSolver ({} {} {}) GAMG {}\n'
+    write(str(tmp_path), 'solverInfo', '0', 'solverInfo.dat',
+          SOLVER_INFO_HEADER + ''.join(rows.format(t, t, 0, 0, 0.5) for t in [1, 2, 3]))
+    write(str(tmp_path), 'solverInfo', '0', 'solverInfo_2.5.dat',
+          SOLVER_INFO_HEADER + ''.join(rows.format(t, 10 * t, 0, 0, 0.25) for t in [2.5, 3.5]))
+    assert list(loadResults.get_sources(str(tmp_path / 'postProcessing' / 'solverInfo'))) == ['solverInfo.dat']
+
+    results = loadResults.load(str(tmp_path), 'solverInfo')
+    # the names of the solvers are skipped and the vector of initial residuals split into its components
+    assert sorted(results) == ['Time', 'U_initial_x', 'U_initial_y', 'U_initial_z', 'p_initial']
+    assert results['Time'].tolist() == [1, 2, 2.5, 3.5]
+    assert results['U_initial_x'].tolist() == [1, 2, 25, 35]
+    assert results['p_initial'].tolist() == [0.5, 0.5, 0.25, 0.25]
+
+
+def test_only_the_appended_part_is_parsed(tmp_path, monkeypatch):
+    path = write(str(tmp_path), 'forceCoeffs', '0', 'coefficient.dat',
+                 FORCE_COEFFICIENTS_HEADER + coefficients([1, 2]))
+    assert loadResults.load(str(tmp_path), 'forceCoeffs')['Time'].tolist() == [1, 2]
+
+    offsets = []
+    parse_time_series = loadResults.parse_time_series
+    monkeypatch.setattr(loadResults, 'parse_time_series',
+                        lambda path, offset, layout: offsets.append(offset) or parse_time_series(path, offset, layout))
+    # a line which is still being written is parsed once it is complete
+    size = os.path.getsize(path)
+    with open(path, 'a') as output_file:
+        output_file.write(coefficients([3]) + '4 4')
+    assert loadResults.load(str(tmp_path), 'forceCoeffs')['Time'].tolist() == [1, 2, 3]
+    with open(path, 'a') as output_file:
+        output_file.write(' -4\n')
+    assert loadResults.load(str(tmp_path), 'forceCoeffs')['Cl'].tolist() == [-1, -2, -3, -4]
+    assert offsets == [size, size + len(coefficients([3]))]
+
+    # unchanged output is loaded from the cache
+    assert loadResults.load(str(tmp_path), 'forceCoeffs')['Cd'].tolist() == [1, 2, 3, 4]
+    assert len(offsets) == 2
+
+
+def test_probes_are_named_after_their_field_and_number(tmp_path):
+    write(str(tmp_path), 'probes', '0', 'U', '# Probe 0 (1 0 0)\n# Probe 1 (2 0.5 0)\n#   Probe    0    1\n'
+                                             '#    Time\n1 (1 2 3) (4 5 6)\n2 (7 8 9) (10 11 12)\n')
+    write(str(tmp_path), 'probes', '0', 'p', '# Probe 0 (1 0 0)\n# Probe 1 (2 0.5 0)\n#   Probe    0    1\n'
+                                             '#    Time\n1 0.1 0.2\n2 0.3 0.4\n')
+    with pytest.raises(ValueError, match='select one of U, p'):
+        loadResults.load(str(tmp_path), 'probes')
+
+    results = loadResults.load(str(tmp_path), 'probes', 'U')
+    assert results['U_1_y'].tolist() == [5, 11]
+    assert results['locations'].tolist() == [[1, 0, 0], [2, 0.5, 0]]
+    assert loadResults.load(str(tmp_path), 'probes', 'p')['p_0'].tolist() == [0.1, 0.3]
+
+
+def test_sets_are_stacked_by_write_time(tmp_path):
+    for write_time in [1, 2]:
+        write(str(tmp_path), 'lineProbes', str(write_time), 'l1_p.xy',
+              ''.join(str(sample) + ' 0 0 ' + str(10 * write_time + sample) + '\n' for sample in range(3)))
+    results = loadResults.load(str(tmp_path), 'lineProbes')
+
+    assert results['Time'].tolist() == [1, 2]
+    assert results['coordinates'].tolist() == [[0, 0, 0], [1, 0, 0], [2, 0, 0]]
+    assert results['values'].shape == (2, 3, 1)
+    np.testing.assert_array_equal(results['values'][:, :, 0], [[10, 11, 12], [20, 21, 22]])
@@ -0,0 +1,21 @@
+import os
+from src.FileDirectoryIO.OutputBackend import DiskBackend
+
+
+def test_copy_replaces_hard_link_into_the_store(tmp_path):
+    # a mesh placed from the mesh store (read-only and shared between cases) is replaced, not written through
+    store_file = tmp_path / 'store' / 'points'
+    store_file.parent.mkdir()
+    store_file.write_bytes(b'stored mesh')
+    os.chmod(store_file, 0o444)
+    case_directory = tmp_path / 'case'
+    case_directory.mkdir()
+    os.link(store_file, case_directory / 'points')
+    new_mesh = tmp_path / 'points'
+    new_mesh.write_bytes(b'new mesh')
+
+    DiskBackend(str(case_directory)).copy_file(str(new_mesh), 'points')
+
+    assert (case_directory / 'points').read_bytes() == b'new mesh'
+    assert store_file.read_bytes() == b'stored mesh'
+    assert os.listdir(case_directory) == ['points']
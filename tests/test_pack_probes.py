@@ -0,0 +1,110 @@
+import os
+import time
+import numpy as np
+import pytest
+import packProbes
+
+
+def write_line(directory, write_time, value, number_of_samples=4):
+    # line l1 of the scalar p, the value of sample s is value + s
+    time_directory = os.path.join(directory, format(write_time, 'g'))
+    os.makedirs(time_directory, exist_ok=True)
+    with open(os.path.join(time_directory, 'l1_p.xy'), 'w') as set_file:
+        for sample in range(number_of_samples):
+            set_file.write(str(sample / 10) + ' 0 0 ' + str(value + sample) + '\n')
+
+
+def pack(case, delete=False):
+    directory = os.path.join(case, 'postProcessing', 'lineProbes')
+    pack_directory = os.path.join(case, 'postProcessing', packProbes.PACK_DIRECTORY, 'lineProbes')
+    packed_files = packProbes.pack_sets(packProbes.get_write_times(directory), pack_directory, None, 1, 'float64')
+    if delete:
+        packProbes.delete_files(packed_files, directory)
+    return packProbes.open_pack(case, 'lineProbes', 'p')
+
+
+def first_samples(probe_pack):
+    return probe_pack.values[:, 0, 0, 0].tolist()
+
+
+@pytest.fixture
+def case(tmp_path):
+    for write_time in range(1, 6):
+        write_line(tmp_path / 'postProcessing' / 'lineProbes', write_time, 10 * write_time)
+    return str(tmp_path)
+
+
+def touch_later(path):
+    # the modification time has to be after the last packing, independent of the resolution of the file system
+    later = time.time() + 10
+    os.utime(path, (later, later))
+
+
+def test_all_write_times_are_packed(case):
+    probe_pack = pack(case)
+    assert probe_pack.times.tolist() == [1, 2, 3, 4, 5]
+    assert probe_pack.components == ['p']
+    assert first_samples(probe_pack) == [10, 20, 30, 40, 50]
+    assert probe_pack.values[2, 0, :, 0].tolist() == [30, 31, 32, 33]
+
+
+def test_modified_write_time_keeps_later_times(case):
+    pack(case)
+    directory = os.path.join(case, 'postProcessing', 'lineProbes')
+    write_line(directory, 2, 200)
+    touch_later(os.path.join(directory, '2', 'l1_p.xy'))
+    probe_pack = pack(case)
+    assert probe_pack.times.tolist() == [1, 2, 3, 4, 5]
+    assert first_samples(probe_pack) == [10, 200, 30, 40, 50]
+
+
+def test_restart_after_deleting_packed_files_keeps_later_times(case):
+    pack(case, delete=True)
+    directory = os.path.join(case, 'postProcessing', 'lineProbes')
+    assert packProbes.get_write_times(directory) == []
+    write_line(directory, 2, 200)
+    write_line(directory, 2.5, 250)
+    probe_pack = pack(case, delete=True)
+    assert probe_pack.times.tolist() == [1, 2, 2.5, 3, 4, 5]
+    assert first_samples(probe_pack) == [10, 200, 250, 30, 40, 50]
+
+
+def test_new_write_times_are_appended(case):
+    pack(case)
+    write_line(os.path.join(case, 'postProcessing', 'lineProbes'), 6, 60)
+    probe_pack = pack(case)
+    assert probe_pack.times.tolist() == [1, 2, 3, 4, 5, 6]
+    assert first_samples(probe_pack) == [10, 20, 30, 40, 50, 60]
+
+
+def test_changed_layout_packs_all_write_times_again(case):
+    pack(case)
+    write_line(os.path.join(case, 'postProcessing', 'lineProbes'), 6, 60, number_of_samples=6)
+    probe_pack = pack(case)
+    assert probe_pack.times.tolist() == [1, 2, 3, 4, 5, 6]
+    assert probe_pack.values.shape == (6, 1, 6, 1)
+    assert first_samples(probe_pack) == [10, 20, 30, 40, 50, 60]
+    assert np.isnan(probe_pack.values[0, 0, 4:, 0]).all()
+
+
+def write_probes(directory, start_time, times, offset=0):
+    # point probes p at two locations, the values at time t are 10 * t + offset and 10 * t + offset + 1
+    os.makedirs(os.path.join(directory, format(start_time, 'g')), exist_ok=True)
+    with open(os.path.join(directory, format(start_time, 'g'), 'p'), 'w') as probe_file:
+        probe_file.write('# Probe 0 (0 0 0)\n# Probe 1 (1 0 0)\n#  Time p0 p1\n')
+        for write_time in times:
+            value = 10 * write_time + offset
+            probe_file.write(format(write_time, 'g') + ' ' + str(value) + ' ' + str(value + 1) + '\n')
+
+
+def test_point_probes_keep_deleted_times(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    directory = os.path.join('postProcessing', 'probes')
+    pack_directory = os.path.join('postProcessing', packProbes.PACK_DIRECTORY, 'probes')
+    write_probes(directory, 0, [1, 2, 3, 4, 5])
+    packProbes.delete_files(packProbes.pack_probes('probes', pack_directory, 'float64'), directory)
+    write_probes(directory, 2, [2, 3], offset=100)
+    packProbes.pack_probes('probes', pack_directory, 'float64')
+    probe_pack = packProbes.open_pack('.', 'probes', 'p')
+    assert probe_pack.times.tolist() == [1, 2, 3, 4, 5]
+    assert probe_pack.values[:, 0, 1, 0].tolist() == [11, 121, 131, 41, 51]
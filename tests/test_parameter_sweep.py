@@ -0,0 +1,114 @@
+import json
+import pytest
+import input.CaseProperties as CaseProperties
+from src.ParameterSweep.ParameterSweep import ParameterSweep
+
+
+def write_sweep(tmp_path, sweep):
+    path = tmp_path / 'sweep.json'
+    path.write_text(json.dumps(sweep))
+    return ParameterSweep(str(path), 1)
+
+
+def test_sweep_sets_existing_properties(tmp_path):
+    sweep = write_sweep(tmp_path, {'axes': [{'path': 'solver_properties/endTime', 'values': [5, 10]}]})
+    cases = sweep.expand()
+    assert [case['properties']['solver_properties']['endTime'] for case in cases] == [5, 10]
+
+
+def test_sweep_sets_list_entries(tmp_path):
+    sweep = write_sweep(tmp_path, {'axes': [{'path': 'dimensionless_coefficients/center_of_rotation/1',
+                                             'values': [0.5]}]})
+    assert sweep.expand()[0]['properties']['dimensionless_coefficients']['center_of_rotation'] == [0.25, 0.5, 0]
+
+
+@pytest.mark.parametrize('path', ['solver_properties/endtime', 'solver_propertys/endTime',
+                                  'dimensionless_coefficients/center_of_rotation/3'])
+def test_sweep_rejects_missing_properties(tmp_path, path):
+    # a misspelt leaf would otherwise be added to the properties and generate identical cases
+    sweep = write_sweep(tmp_path, {'axes': [{'path': path, 'values': [1, 2]}]})
+    with pytest.raises(Exception, match='does not exist'):
+        sweep.expand()
+
+
+def get_values(cases, *keys):
+    values = []
+    for case in cases:
+        entry = case['properties']
+        for key in keys:
+            entry = entry[key]
+        values.append(entry)
+    return values
+
+
+def test_cartesian_sweep_combines_all_values(tmp_path):
+    sweep = write_sweep(tmp_path, {'run_directory': str(tmp_path / 'runs'), 'axes': [
+        {'path': 'solver_properties/endTime', 'name': 'end', 'values': [5, 10, 20]},
+        {'path': 'solver_properties/CFL', 'linspace': [0.5, 1.0, 2]},
+    ]})
+    cases = sweep.expand()
+
+    assert [case['index'] for case in cases] == list(range(6))
+    assert [case['parameters'] for case in cases] == [{'end': end, 'solver_properties/CFL': cfl}
+                                                      for end in [5, 10, 20] for cfl in [0.5, 1.0]]
+    assert get_values(cases, 'solver_properties', 'CFL') == [0.5, 1.0] * 3
+    # the default case name numbers the cases, padded to the same width
+    assert get_values(cases, 'file_properties', 'case_name') == ['taylor_green_vortex20_' + str(i) for i in range(6)]
+    assert get_values(cases, 'file_properties', 'path')[0] == str(tmp_path / 'runs' / 'taylor_green_vortex20_0')
+
+
+def test_list_sweep_pairs_values(tmp_path):
+    sweep = write_sweep(tmp_path, {'type': 'list', 'case_name': 'tgv_{end}_{index:02d}', 'axes': [
+        {'path': 'solver_properties/endTime', 'name': 'end', 'values': [5, 10]},
+        {'path': 'solver_properties/CFL', 'values': [0.5, 1.0]},
+    ]})
+    cases = sweep.expand()
+
+    assert get_values(cases, 'solver_properties', 'endTime') == [5, 10]
+    assert get_values(cases, 'solver_properties', 'CFL') == [0.5, 1.0]
+    # only parameter names which are identifiers can be used in the case name
+    assert get_values(cases, 'file_properties', 'case_name') == ['tgv_5_00', 'tgv_10_01']
+
+
+def test_list_sweep_needs_axes_of_the_same_length(tmp_path):
+    sweep = write_sweep(tmp_path, {'type': 'list', 'axes': [
+        {'path': 'solver_properties/endTime', 'values': [5, 10]},
+        {'path': 'solver_properties/CFL', 'values': [0.5]},
+    ]})
+    with pytest.raises(Exception, match='same number of values'):
+        sweep.expand()
+
+
+def test_latin_hypercube_samples_each_stratum_once(tmp_path):
+    sweep = {'type': 'latin_hypercube', 'samples': 8, 'seed': 3, 'axes': [
+        {'path': 'solver_properties/endTime', 'bounds': [0, 8]},
+        {'path': 'solver_properties/CFL', 'bounds': [1, 2]},
+    ]}
+    cases = write_sweep(tmp_path, sweep).expand()
+
+    end_times = get_values(cases, 'solver_properties', 'endTime')
+    cfl = get_values(cases, 'solver_properties', 'CFL')
+    assert sorted(int(value) for value in end_times) == list(range(8))
+    assert sorted(int((value - 1) * 8) for value in cfl) == list(range(8))
+    # the same seed draws the same samples
+    assert get_values(write_sweep(tmp_path, sweep).expand(), 'solver_properties', 'CFL') == cfl
+
+
+def test_sweep_starts_from_the_base_case_file(tmp_path):
+    properties = CaseProperties.CaseProperties().properties
+    properties['file_properties']['case_name'] = 'base'
+    properties['solver_properties']['endTime'] = 7
+    (tmp_path / 'base.json').write_text(json.dumps(properties))
+
+    sweep = write_sweep(tmp_path, {'base_case': str(tmp_path / 'base.json'), 'axes': [
+        {'path': 'solver_properties/CFL', 'values': [0.5]},
+    ]})
+    cases = sweep.expand()
+    assert get_values(cases, 'file_properties', 'case_name') == ['base_0']
+    assert get_values(cases, 'solver_properties', 'endTime') == [7]
+
+
+def test_unknown_sweep_type(tmp_path):
+    sweep = write_sweep(tmp_path, {'type': 'random', 'axes': []})
+    with pytest.raises(Exception, match='Unknown sweep type random'):
+        sweep.expand()
@@ -0,0 +1,68 @@
+import os
+import numpy as np
+import pytest
+
+# the residuals are plotted with matplotlib, which is imported with the script
+pytest.importorskip('matplotlib')
+import plotResiduals
+from plotResiduals import MinMaxDecimator
+
+HEADER = '# Solver information\n# Time    U_solver    Ux_initial    Ux_final    p_solver    p_initial    p_final\n'
+
+
+def decimate(y, max_points, chunk_size):
+    decimator = MinMaxDecimator(max_points)
+    x = np.arange(len(y), dtype=float)
+    for start in range(0, len(y), chunk_size):
+        decimator.add(x[start:start + chunk_size], y[start:start + chunk_size])
+    return decimator.get_points()
+
+
+def test_short_series_are_kept():
+    x, y = decimate(np.array([3.0, 1.0, 2.0]), 10, 2)
+    assert x.tolist() == [0, 0, 1, 1, 2, 2]
+    assert y.tolist() == [3, 3, 1, 1, 2, 2]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1000, 5000])
+def test_decimation_keeps_the_peaks_in_order(chunk_size):
+    y = np.random.default_rng(1).random(5000)
+    y[1234] = 5
+    y[4321] = -5
+    x, decimated = decimate(y, 100, chunk_size)
+
+    assert len(x) <= 100
+    assert np.all(np.diff(x) >= 0)
+    assert decimated.max() == 5 and x[np.argmax(decimated)] == 1234
+    assert decimated.min() == -5 and x[np.argmin(decimated)] == 4321
+    # every point is a sample of the series, and the result does not depend on how the series is read
+    assert np.array_equal(decimated, y[x.astype(int)])
+    assert np.array_equal(decimated, decimate(y, 100, 5000)[1])
+
+
+def write_residuals(directory, file_name, times, scale, complete=True):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, file_name), 'w') as residual_file:
+        residual_file.write(HEADER)
+        for t in times:
+            residual_file.write(str(t) + ' smoothSolver ' + str(scale * t) + ' 0 GAMG ' + str(-scale * t) + ' 0\n')
+        if not complete:
+            residual_file.write('99 smoothSolver 1')
+
+
+def test_restarts_supersede_the_residuals_after_their_start(tmp_path):
+    residuals = str(tmp_path / 'residuals')
+    write_residuals(os.path.join(residuals, '0'), 'solverInfo.dat', [1, 2, 3, 4, 5], 1)
+    write_residuals(os.path.join(residuals, '0'), 'solverInfo_4.dat', [4, 5, 6], 10, complete=False)
+    write_residuals(os.path.join(residuals, '2'), 'solverInfo.dat', [2, 3, 4, 5], 100)
+    segments = plotResiduals.get_segments(residuals)
+    assert [(os.path.relpath(path, residuals), end_time) for path, end_time in segments] == [
+        (os.path.join('0', 'solverInfo.dat'), 2), (os.path.join('2', 'solverInfo.dat'), 4),
+        (os.path.join('0', 'solverInfo_4.dat'), None)]
+
+    results = plotResiduals.read_residuals(segments, 100)
+    assert sorted(results) == ['Ux', 'p']
+    x, y = results['Ux']
+    assert x[0::2].tolist() == [1, 2, 3, 4, 5, 6]
+    assert y[0::2].tolist() == [1, 200, 300, 40, 50, 60]
+    assert results['p'][1][0::2].tolist() == [-1, -200, -300, -40, -50, -60]
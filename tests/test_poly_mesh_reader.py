@@ -0,0 +1,103 @@
+import os
+import sys
+import numpy as np
+from conftest import ROOT_DIRECTORY
+from src.FileDirectoryIO import PolyMeshReader as poly_mesh_reader_module
+from src.FileDirectoryIO.PolyMeshReader import PolyMeshReader
+
+sys.path.insert(0, os.path.join(ROOT_DIRECTORY, 'benchmarks'))
+from synthetic_poly_mesh import write_box_mesh
+
+# right triangular prism (legs of length 1 in x and y, height 2 in z), written as an ascii faceList, so that faces of
+# different sizes take the general (non-uniform) path of the face geometry
+PRISM = {
+    'points': ('vectorField', '6\n(\n(0 0 0)\n(1 0 0)\n(0 1 0)\n(0 0 2)\n(1 0 2)\n(0 1 2)\n)\n'),
+    'faces': ('faceList', '5\n(\n3(0 2 1)\n3(3 4 5)\n4(0 1 4 3)\n4(0 3 5 2)\n4(1 2 5 4)\n)\n'),
+    'owner': ('labelList', '5\n(\n0\n0\n0\n0\n0\n)\n'),
+    'neighbour': ('labelList', '0\n(\n)\n'),
+    'boundary': ('polyBoundaryMesh', '1\n(\n    walls\n    {\n        type wall;\n        nFaces 5;\n'
+                                     '        startFace 0;\n    }\n)\n'),
+}
+
+
+def write_prism(directory):
+    mesh_directory = os.path.join(directory, 'polyMesh')
+    os.makedirs(mesh_directory)
+    for name, (class_type, content) in PRISM.items():
+        with open(os.path.join(mesh_directory, name), 'w') as file:
+            file.write('FoamFile\n{\n    version 2.0;\n    format ascii;\n    class ' + class_type + ';\n'
+                       '    location "constant/polyMesh";\n    object ' + name + ';\n}\n\n' + content)
+    return PolyMeshReader(str(directory))
+
+
+def get_box_cell_centres(nx, ny, nz, length):
+    x, y, z = [(np.arange(n) + 0.5) * size / n for n, size in zip((nx, ny, nz), length)]
+    return np.stack(np.meshgrid(x, y, z, indexing='ij'), -1).reshape(-1, 3)
+
+
+def sort_rows(array):
+    return array[np.lexsort(array.T[::-1])]
+
+
+def test_box_cell_centres_and_volumes(tmp_path):
+    write_box_mesh(str(tmp_path), 3, 4, 2, length=(3.0, 2.0, 1.0))
+    centres, volumes = PolyMeshReader(str(tmp_path)).get_cell_centres_and_volumes()
+
+    assert centres.shape == (24, 3)
+    np.testing.assert_allclose(sort_rows(centres), get_box_cell_centres(3, 4, 2, (3.0, 2.0, 1.0)))
+    np.testing.assert_allclose(volumes, np.full(24, 1.0 * 0.5 * 0.5))
+
+
+def test_box_face_centres_and_areas(tmp_path):
+    write_box_mesh(str(tmp_path), 2, 2, 2)
+    reader = PolyMeshReader(str(tmp_path))
+    centres, areas = reader.get_face_centres_and_areas()
+
+    # 12 internal faces and 24 boundary faces, all of them squares of 0.5 x 0.5
+    assert centres.shape == (36, 3)
+    np.testing.assert_allclose(np.linalg.norm(areas, axis=1), np.full(36, 0.25))
+    # boundary faces point out of the domain
+    for patch in reader.read_boundary():
+        start, end = patch['start_face'], patch['start_face'] + patch['n_faces']
+        axis = 'xyz'.index(patch['name'][0])
+        sign = 1 if patch['name'].endswith('max') else -1
+        np.testing.assert_allclose(areas[start:end, axis], np.full(end - start, sign * 0.25))
+        np.testing.assert_allclose(centres[start:end, axis], np.full(end - start, 0.5 + sign * 0.5))
+
+
+def test_patch_face_centres(tmp_path):
+    write_box_mesh(str(tmp_path), 2, 3, 1)
+    centres = PolyMeshReader(str(tmp_path)).get_patch_face_centres('zmax')
+
+    expected = get_box_cell_centres(2, 3, 1, (1.0, 1.0, 1.0))
+    expected[:, 2] = 1.0
+    np.testing.assert_allclose(sort_rows(centres), expected)
+
+
+def test_iterate_cell_centres_matches_all_cells(tmp_path, monkeypatch):
+    # small face chunks, so that the cells of a chunk have their faces spread over several chunks of faces
+    monkeypatch.setattr(poly_mesh_reader_module, 'FACE_CHUNK_SIZE', 7)
+    write_box_mesh(str(tmp_path), 3, 3, 3)
+    reader = PolyMeshReader(str(tmp_path))
+    centres, _ = reader.get_cell_centres_and_volumes()
+
+    chunks = list(reader.iterate_cell_centres(5))
+    assert [len(chunk) for chunk in chunks] == [5, 5, 5, 5, 5, 2]
+    np.testing.assert_allclose(np.concatenate(chunks), centres)
+
+
+def test_prism_with_mixed_face_sizes(tmp_path):
+    reader = write_prism(tmp_path)
+    offsets, labels = reader.read_faces()
+    np.testing.assert_array_equal(offsets, [0, 3, 6, 10, 14, 18])
+    np.testing.assert_array_equal(labels[:6], [0, 2, 1, 3, 4, 5])
+
+    face_centres, face_areas = reader.get_face_centres_and_areas()
+    np.testing.assert_allclose(face_centres[0], [1 / 3, 1 / 3, 0])
+    np.testing.assert_allclose(face_areas[0], [0, 0, -0.5])
+    np.testing.assert_allclose(face_areas[4], [2, 2, 0])
+
+    centres, volumes = reader.get_cell_centres_and_volumes()
+    np.testing.assert_allclose(centres, [[1 / 3, 1 / 3, 1]])
+    np.testing.assert_allclose(volumes, [1.0])
+    np.testing.assert_allclose(np.concatenate(list(reader.iterate_cell_centres(1))), centres)